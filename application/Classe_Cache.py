@@ -0,0 +1,295 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheHTTP:
+    """
+    Classe représentant un cache disque des réponses des API interrogées (arXiv, Reddit).
+
+    Chaque réponse est identifiée par sa source, la requête normalisée et la page demandée.
+    Les réponses expirent après une durée de vie configurable, et les moins récemment utilisées
+    sont supprimées lorsque la taille totale du cache dépasse la taille maximale. La date de dernière utilisation
+    d'une réponse est la date de modification de son fichier : une lecture ne réécrit pas l'index.
+
+    En mode hors ligne, les réponses sont rejouées quelle que soit leur ancienneté et une requête
+    absente du cache lève une erreur au lieu d'accéder au réseau : un corpus peut ainsi être
+    reconstruit à l'identique sans connexion.
+    """
+
+    # un verrou par répertoire, partagé par toutes les instances (les sources tournent dans des threads)
+    _verrous = {}
+    _verrou_verrous = threading.Lock()
+
+    def __init__(self, repertoire="data/cache", duree_de_vie=24 * 3600, taille_max=100 * 1024 * 1024,
+                 hors_ligne=False):
+        self.repertoire = repertoire
+        self.duree_de_vie = duree_de_vie  # en secondes, None pour ne jamais expirer
+        self.taille_max = taille_max  # en octets
+        self.hors_ligne = hors_ligne
+        os.makedirs(repertoire, exist_ok=True)
+        with CacheHTTP._verrou_verrous:
+            self._verrou = CacheHTTP._verrous.setdefault(os.path.abspath(repertoire), threading.Lock())
+
+    @classmethod
+    def depuis_config(cls, config):
+        """
+        Crée un cache à partir de la section 'CACHE' de la configuration.
+
+        :param config: Dictionnaire de configuration (voir config.json).
+        :return: Une instance de CacheHTTP, ou None si la configuration ne prévoit pas de cache.
+        """
+        parametres = config.get('CACHE')
+        if not parametres:
+            return None
+        return cls(**parametres)
+
+    def cle(self, source, requete, page):
+        """
+        Calcule la clé d'une réponse, utilisée comme nom de fichier.
+        """
+        identifiant = f"{source}|{normaliser_requete(requete)}|{page}"
+        return hashlib.sha256(identifiant.encode('utf-8')).hexdigest()
+
+    def _chemin(self, cle):
+        return os.path.join(self.repertoire, f"{cle}.bin")
+
+    def _chemin_index(self):
+        return os.path.join(self.repertoire, "index.json")
+
+    def _lire_index(self):
+        try:
+            with open(self._chemin_index(), 'r') as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _ecrire_index(self, index):
+        chemin_temporaire = self._chemin_index() + ".tmp"
+        with open(chemin_temporaire, 'w') as file:
+            json.dump(index, file)
+        os.replace(chemin_temporaire, self._chemin_index())
+
+    def _utilise_le(self, cle):
+        try:
+            return os.path.getmtime(self._chemin(cle))
+        except FileNotFoundError:
+            return 0.0
+
+    def _supprimer(self, index, cle):
+        index.pop(cle, None)
+        try:
+            os.remove(self._chemin(cle))
+        except FileNotFoundError:
+            pass
+
+    def lire(self, source, requete, page):
+        """
+        Renvoie la réponse enregistrée pour cette requête.
+
+        :param source: Le nom de la source ('arxiv', 'reddit').
+        :param requete: La requête (mot-clé de recherche).
+        :param page: L'identifiant de la page demandée.
+        :return: Le contenu enregistré (bytes), ou None s'il est absent ou expiré.
+        """
+        cle = self.cle(source, requete, page)
+        with self._verrou:
+            index = self._lire_index()
+            entree = index.get(cle)
+            if entree is None:
+                return None
+            maintenant = time.time()
+            expiree = self.duree_de_vie is not None and maintenant - entree['cree_le'] > self.duree_de_vie
+            if expiree and not self.hors_ligne:
+                self._supprimer(index, cle)
+                self._ecrire_index(index)
+                return None
+            try:
+                with open(self._chemin(cle), 'rb') as file:
+                    contenu = file.read()
+            except FileNotFoundError:
+                self._supprimer(index, cle)
+                self._ecrire_index(index)
+                return None
+            os.utime(self._chemin(cle), (maintenant, maintenant))
+            return contenu
+
+    def ecrire(self, source, requete, page, contenu):
+        """
+        Enregistre une réponse, puis supprime les moins récemment utilisées si la taille maximale est dépassée.
+
+        :param source: Le nom de la source ('arxiv', 'reddit').
+        :param requete: La requête (mot-clé de recherche).
+        :param page: L'identifiant de la page demandée.
+        :param contenu: Le contenu de la réponse (bytes).
+        """
+        cle = self.cle(source, requete, page)
+        with self._verrou:
+            with open(self._chemin(cle), 'wb') as file:
+                file.write(contenu)
+            index = self._lire_index()
+            maintenant = time.time()
+            os.utime(self._chemin(cle), (maintenant, maintenant))
+            index[cle] = {'taille': len(contenu), 'cree_le': maintenant}
+
+            taille_totale = sum(entree['taille'] for entree in index.values())
+            if taille_totale <= self.taille_max:
+                self._ecrire_index(index)
+                return
+            for ancienne_cle in sorted(index, key=self._utilise_le):
+                if taille_totale <= self.taille_max:
+                    break
+                taille_totale -= index[ancienne_cle]['taille']
+                self._supprimer(index, ancienne_cle)
+            self._ecrire_index(index)
+
+    def obtenir(self, source, requete, page, telecharger):
+        """
+        Renvoie la réponse depuis le cache, ou la télécharge et l'enregistre si elle est absente.
+
+        :param source: Le nom de la source ('arxiv', 'reddit').
+        :param requete: La requête (mot-clé de recherche).
+        :param page: L'identifiant de la page demandée.
+        :param telecharger: Fonction sans argument renvoyant le contenu (bytes) depuis le réseau.
+        :return: Le contenu de la réponse (bytes).
+        """
+        contenu = self.lire(source, requete, page)
+        if contenu is not None:
+            return contenu
+        if self.hors_ligne:
+            raise LookupError(f"Mode hors ligne : aucune réponse en cache pour {source} '{requete}' (page {page})")
+        contenu = telecharger()
+        self.ecrire(source, requete, page, contenu)
+        return contenu
+
+    def vider(self):
+        """
+        Supprime toutes les réponses du cache.
+        """
+        with self._verrou:
+            index = self._lire_index()
+            for cle in list(index):
+                self._supprimer(index, cle)
+            self._ecrire_index(index)
+
+
+class CacheTextes:
+    """
+    Classe représentant un cache mémoire des textes de documents, borné par un budget en octets.
+
+    Les corpus chargés paresseusement (voir Corpus.load) lisent le texte d'un document sur le disque
+    à la première demande et le conservent ici : les textes les moins récemment lus sont oubliés
+    lorsque le budget est dépassé. Un même cache peut être partagé par plusieurs corpus ouverts,
+    dont la mémoire occupée par les textes reste ainsi bornée.
+    """
+
+    def __init__(self, budget=64 * 1024 * 1024):
+        self.budget = budget  # en octets
+        self.taille = 0
+        self._textes = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._textes)
+
+    def obtenir(self, cle, lire):
+        """
+        Renvoie le texte associé à la clé, en le lisant et en l'enregistrant s'il est absent.
+
+        :param cle: L'identifiant du texte (par exemple le fichier et la position du texte).
+        :param lire: Fonction sans argument renvoyant le texte.
+        :return: Le texte.
+        """
+        with self._verrou:
+            texte = self._textes.get(cle)
+            if texte is not None:
+                self._textes.move_to_end(cle)
+                return texte
+
+        texte = lire()
+        with self._verrou:
+            if cle not in self._textes:
+                self._textes[cle] = texte
+                self.taille += sys.getsizeof(texte)
+                # le texte demandé est conservé même s'il dépasse à lui seul le budget
+                while self.taille > self.budget and len(self._textes) > 1:
+                    _, ancien = self._textes.popitem(last=False)
+                    self.taille -= sys.getsizeof(ancien)
+        return texte
+
+    def vider(self):
+        """
+        Oublie tous les textes.
+        """
+        with self._verrou:
+            self._textes.clear()
+            self.taille = 0
+
+
+def normaliser_requete(requete):
+    """
+    Normalise une requête : casse et espaces n'ont d'influence ni sur les résultats des API,
+    ni sur ceux des recherches dans un corpus.
+    """
+    return ' '.join(str(requete).lower().split())
+
+
+class CacheResultats:
+    """
+    Classe représentant un cache mémoire des résultats de recherche, borné en nombre de résultats.
+
+    Les résultats les moins récemment demandés sont oubliés lorsque le cache est plein. Les clés incluent
+    la version du corpus interrogé (voir Corpus.rechercher_documents) : un résultat calculé avant une modification
+    du corpus n'est plus jamais servi. Les nombres de succès et d'échecs permettent de juger de son utilité.
+    """
+
+    def __init__(self, taille_max=256):
+        self.taille_max = taille_max  # en nombre de résultats
+        self.succes = 0
+        self.echecs = 0
+        self._resultats = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._resultats)
+
+    def __getstate__(self):
+        # les résultats ne sont ni enregistrés ni copiés avec leur propriétaire
+        return {'taille_max': self.taille_max}
+
+    def __setstate__(self, etat):
+        self.__init__(**etat)
+
+    def obtenir(self, cle, calculer):
+        """
+        Renvoie le résultat associé à la clé, en le calculant et en l'enregistrant s'il est absent.
+
+        :param cle: L'identifiant du résultat (hachable).
+        :param calculer: Fonction sans argument renvoyant le résultat.
+        :return: Le résultat.
+        """
+        with self._verrou:
+            if cle in self._resultats:
+                self._resultats.move_to_end(cle)
+                self.succes += 1
+                return self._resultats[cle]
+            self.echecs += 1
+
+        resultat = calculer()
+        with self._verrou:
+            self._resultats[cle] = resultat
+            self._resultats.move_to_end(cle)
+            while len(self._resultats) > self.taille_max:
+                self._resultats.popitem(last=False)
+        return resultat
+
+    def vider(self):
+        """
+        Oublie tous les résultats (les compteurs sont conservés).
+        """
+        with self._verrou:
+            self._resultats.clear()
@@ -2,7 +2,6 @@ import ipywidgets as widgets
 from IPython.display import display, clear_output
 from Fonctions_Acquisition_Donnees import *
 import os
-from collections import Counter
 import itertools
 import seaborn as sns
 
@@ -21,7 +20,9 @@ class Interface:
         # sortie moteur recherche
         self.output_mr = widgets.Output()
 
-        self.concordances = None
+        # occurrences du concordancier déjà obtenues, et le générateur fournissant les suivantes
+        self.concordances = []
+        self.iterateur_concordances = None
         self.current_page_concordancier = 1
         self.output_concordances = widgets.Output()
         self.bouton_page_suivante_concordances = widgets.Button(description='Page Suivante', button_style='success')
@@ -31,11 +32,11 @@ class Interface:
 
     def charger_corpus(self, fichier):
         """
-        Charge un corpus depuis un fichier.
+        Charge un corpus depuis un fichier. Les textes d'un corpus au format en colonnes ne sont lus qu'à la demande.
         :param fichier: Chemin du fichier contenant le corpus.
         :return: Un objet Corpus chargé.
         """
-        return Corpus.load(fichier)
+        return Corpus.load(fichier, paresseux=True)
 
     @property
     def corpus_courant(self):
@@ -59,7 +60,7 @@ class Interface:
         :param directory: Chemin du répertoire contenant les corpus, par défaut 'data'.
         :return: Une liste de noms de corpus.
         """
-        return [f for f in os.listdir(directory) if f.endswith('.pkl')]
+        return [f for f in os.listdir(directory) if f.endswith(('.pkl', EXTENSION_COLONNES))]
 
 
 
@@ -87,7 +88,7 @@ class Interface:
 
         nom_corpus_widget = widgets.Text(description='Nom de la recherche:', style=style, layout=layout)
         mot_cle_widget = widgets.Text(description='Séquence de recherche:', style=style, layout=layout)
-        nombre_articles_widget = widgets.IntSlider(description='Volume extraction:', min=0, max=200, value=100, step=10, style=style, layout=layout)
+        nombre_articles_widget = widgets.IntSlider(description='Volume extraction:', min=0, max=2000, value=100, step=10, style=style, layout=layout)
         bouton_executer = widgets.Button(description='Exécuter', button_style='info', tooltip='Cliquer ici pour lancer la recherche', icon='search')
         output = widgets.Output()
 
@@ -107,7 +108,7 @@ class Interface:
                 clear_output(wait=True)
                 try:
                     nom_corpus = liste_corpus_widget.value
-                    self.nom_corpus_courant = nom_corpus[:-4]
+                    self.nom_corpus_courant = os.path.splitext(nom_corpus)[0]
                     chemin_complet = os.path.join("data", nom_corpus)
                     self.corpus_courant = self.charger_corpus(chemin_complet)
                     print(f"Corpus '{nom_corpus}' chargé avec succès.")
@@ -196,6 +197,9 @@ class Interface:
         sequence_recherche_widget = widgets.Text(description='Séquence de recherche:', style=style, layout=layout)
         nombre_resultats_widget = widgets.IntSlider(value=5, min=1, max=20, step=1, description='Nombre de résultats:',
                                                     style=style, layout=layout)
+        classement_widget = widgets.Dropdown(options=[('TF-IDF (cosinus)', 'tfidf'), ('BM25', 'bm25'),
+                                                      ('Sémantique (LSA)', 'semantique')],
+                                             value='tfidf', description='Classement:', style=style, layout=layout)
         bouton_rechercher = widgets.Button(description='Rechercher', button_style='info',
                                            tooltip='Cliquer pour rechercher', icon='search')
 
@@ -204,8 +208,9 @@ class Interface:
                 clear_output(wait=True)
                 try:
                     if self.corpus_courant:
-                        resultats = self.corpus_courant.rechercher_documents(sequence_recherche_widget.value)
-                        self.recherche_courante = resultats.head(nombre_resultats_widget.value)
+                        self.recherche_courante = self.corpus_courant.rechercher_documents(
+                            sequence_recherche_widget.value, k=nombre_resultats_widget.value,
+                            classement=classement_widget.value)
                         self.afficher_resultats_recherche()
                     else:
                         print("Aucun corpus n'est chargé actuellement.")
@@ -214,26 +219,37 @@ class Interface:
 
         bouton_rechercher.on_click(on_bouton_rechercher_clicked)
 
-        return widgets.VBox([sequence_recherche_widget, nombre_resultats_widget, bouton_rechercher, self.output_mr])
+        return widgets.VBox([sequence_recherche_widget, nombre_resultats_widget, classement_widget, bouton_rechercher,
+                             self.output_mr])
 
 
 
-    def afficher_page_concordances(self, concordances, page_num, results_per_page):
+    def obtenir_concordances(self, nombre):
+        """
+        Complète les occurrences déjà obtenues par le concordancier jusqu'à en avoir 'nombre', si elles existent :
+        les occurrences suivantes ne sont cherchées que lorsqu'une page les affiche.
+        """
+        manquantes = nombre - len(self.concordances)
+        if manquantes > 0 and self.iterateur_concordances is not None:
+            self.concordances.extend(itertools.islice(self.iterateur_concordances, manquantes))
+
+    def afficher_page_concordances(self, page_num, results_per_page):
         with self.output_concordances:
             clear_output(wait=True)
             start = (page_num - 1) * results_per_page
             end = start + results_per_page
-            page_concordances = concordances.iloc[start:end]
+            self.obtenir_concordances(end + 1)  # une occurrence de plus indique s'il existe une page suivante
+            page_concordances = pd.DataFrame(self.concordances[start:end], columns=COLONNES_CONCORDANCES)
             display(page_concordances)
 
             # Gérer l'affichage des boutons de pagination
             self.bouton_page_precedente_concordances.disabled = page_num <= 1
-            self.bouton_page_suivante_concordances.disabled = end >= len(concordances)
+            self.bouton_page_suivante_concordances.disabled = end >= len(self.concordances)
 
             if page_num > 1:
                 display(self.bouton_page_precedente_concordances)
 
-            if end < len(concordances):
+            if end < len(self.concordances):
                 display(self.bouton_page_suivante_concordances)
 
     def concordancier(self):
@@ -241,33 +257,42 @@ class Interface:
         layout = widgets.Layout(width='500px')
 
         expression_widget = widgets.Text(description='Expression:', style=style, layout=layout)
+        mode_widget = widgets.Dropdown(options=[('Texte exact', 'regex'), ('Requête (index inversé)', 'index')],
+                                       value='regex', description='Mode:', style=style, layout=layout)
         contexte_widget = widgets.IntSlider(value=30, min=20, max=100, step=1, description='Taille du contexte:', style=style, layout=layout)
         results_per_page_widget = widgets.IntSlider(value=10, min=1, max=100, step=1, description='Résultats par page:', style=style, layout=layout)
         bouton_concorde = widgets.Button(description='Concorde', button_style='info', icon='search')
 
-        def update_page(concordances, change):
+        def update_page(change):
             new_page = self.current_page_concordancier + change
-            max_page = (len(concordances) - 1) // results_per_page_widget.value + 1
-            if 1 <= new_page <= max_page:
+            # la page suivante existe si au moins une occurrence la suit (voir afficher_page_concordances)
+            page_existe = new_page >= 1 and len(self.concordances) > (new_page - 1) * results_per_page_widget.value
+            if page_existe:
                 self.current_page_concordancier = new_page
-                self.afficher_page_concordances(concordances, self.current_page_concordancier, results_per_page_widget.value)
+                self.afficher_page_concordances(self.current_page_concordancier, results_per_page_widget.value)
 
-        self.bouton_page_suivante_concordances.on_click(lambda b: update_page(self.concordances, 1))
-        self.bouton_page_precedente_concordances.on_click(lambda b: update_page(self.concordances, -1))
+        self.bouton_page_suivante_concordances.on_click(lambda b: update_page(1))
+        self.bouton_page_precedente_concordances.on_click(lambda b: update_page(-1))
 
         def on_bouton_concorde_clicked(b):
             with self.output_concordances:
                 clear_output(wait=True)
                 if self.corpus_courant:
-                    self.concordances = self.corpus_courant.concorde(expression_widget.value, contexte_widget.value)
+                    self.concordances = []
+                    self.iterateur_concordances = self.corpus_courant.iterer_concordances(
+                        expression_widget.value, contexte_widget.value, mode_widget.value)
                     self.current_page_concordancier = 1
-                    self.afficher_page_concordances(self.concordances, self.current_page_concordancier, results_per_page_widget.value)
+                    try:
+                        self.afficher_page_concordances(self.current_page_concordancier, results_per_page_widget.value)
+                    except ValueError as erreur:  # requête de l'index mal formée
+                        print(erreur)
                 else:
                     print("Aucun corpus n'est chargé actuellement.")
 
         bouton_concorde.on_click(on_bouton_concorde_clicked)
 
-        return widgets.VBox([expression_widget, contexte_widget, results_per_page_widget, bouton_concorde, self.output_concordances])
+        return widgets.VBox([expression_widget, mode_widget, contexte_widget, results_per_page_widget, bouton_concorde,
+                             self.output_concordances])
 
     def diviser_et_presenter_selon_date(self):
         style = {'description_width': 'initial'}
@@ -282,8 +307,9 @@ class Interface:
                 clear_output(wait=True)
                 if self.corpus_courant:
                     date_limite = date_widget.value
-                    self.sous_corpus_courant_predate = self.corpus_courant.copier_et_filtrer_avant_date(date_limite)
-                    self.sous_corpus_courant_postdate = self.corpus_courant.copier_et_filtrer_apres_date(date_limite)
+                    # vues partageant les documents du corpus courant (voir CorpusView), sans copie
+                    self.sous_corpus_courant_predate = self.corpus_courant.vue_avant_date(date_limite)
+                    self.sous_corpus_courant_postdate = self.corpus_courant.vue_apres_date(date_limite)
 
                     # Afficher les deux sous-corpus
                     print("\033[1m" + "Sous-corpus avant la date limite: \n" + "\033[0m")
@@ -311,15 +337,13 @@ class Interface:
         output_comparaison = widgets.Output()
 
         def comparer_frequences_mots(corpus1, corpus2):
-            vocabulaire1 = corpus1.construire_vocabulaire()
-            vocabulaire2 = corpus2.construire_vocabulaire()
-
-            frequences1 = corpus1.calculer_frequences(vocabulaire1)
-            frequences2 = corpus2.calculer_frequences(vocabulaire2)
+            # Fréquences totales des mots, calculées sur la matrice creuse documents × termes
+            frequences1 = corpus1.frequences_mots()
+            frequences2 = corpus2.frequences_mots()
 
             # Comparer les fréquences des mots les plus courants dans chaque corpus
-            mots_les_plus_frequents1 = frequences1.sum().sort_values(ascending=False).head(20)
-            mots_les_plus_frequents2 = frequences2.sum().sort_values(ascending=False).head(20)
+            mots_les_plus_frequents1 = frequences1.sort_values(ascending=False).head(20)
+            mots_les_plus_frequents2 = frequences2.sort_values(ascending=False).head(20)
 
             # Retourne les mots les plus fréquents avec leurs fréquences pour chaque corpus
             return mots_les_plus_frequents1, mots_les_plus_frequents2
@@ -364,14 +388,11 @@ class Interface:
         output_comparaison = widgets.Output()
 
         def comparer_frequences_mots_specifiques(corpus1, corpus2, mots):
-            vocabulaire1 = corpus1.construire_vocabulaire()
-            vocabulaire2 = corpus2.construire_vocabulaire()
-
-            frequences1 = corpus1.calculer_frequences(vocabulaire1)
-            frequences2 = corpus2.calculer_frequences(vocabulaire2)
+            frequences1 = corpus1.frequences_mots()
+            frequences2 = corpus2.frequences_mots()
 
-            frequences_mots1 = {mot: frequences1.sum().get(mot, 0) for mot in mots}
-            frequences_mots2 = {mot: frequences2.sum().get(mot, 0) for mot in mots}
+            frequences_mots1 = {mot: frequences1.get(mot, 0) for mot in mots}
+            frequences_mots2 = {mot: frequences2.get(mot, 0) for mot in mots}
 
             return frequences_mots1, frequences_mots2
 
@@ -438,21 +459,8 @@ class Interface:
         display(mots_input, bouton_calculer, output)
 
     def calculer_cooccurrences(self, corpus, mots):
-        # Compter les co-occurrences dans le corpus
-        cooccurrences = Counter()
-        for doc in corpus.id2doc.values():
-            doc.texte = str(doc.texte) if str(doc.texte) != 'nan' else ''
-            texte = doc.texte.split()
-            for combinaison in itertools.combinations(mots, 2):
-                if all(mot in texte for mot in combinaison):
-                    cooccurrences[combinaison] += 1
-
-        # Créer un DataFrame pour la heatmap
-        df = pd.DataFrame(index=mots, columns=mots).fillna(0)
-        for (mot1, mot2), count in cooccurrences.items():
-            df.at[mot1, mot2] = count
-            df.at[mot2, mot1] = count
-        return df
+        # Nombre de documents contenant chaque couple de mots (voir Corpus.cooccurrences)
+        return corpus.cooccurrences(mots)
 
 
 
@@ -541,7 +549,7 @@ class Interface:
             with output_sauvegarde:
                 clear_output(wait=True)
                 try:
-                    nom_fichier = f"data/{self.nom_corpus_courant}.pkl"
+                    nom_fichier = Corpus.chemin_fichier(self.nom_corpus_courant)
                     self.corpus_courant.save(nom_fichier)
                     print("Corpus sauvegardé avec succès.")
                 except Exception as e:
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, date as type_date
 import pandas as pd
 import pickle
 import re
@@ -9,10 +9,117 @@ from sklearn.metrics.pairwise import cosine_similarity
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 import copy
-from collections import defaultdict
+import hashlib
+import os
+import json
+import math
+import weakref
+import zlib
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from itertools import islice
 import numpy as np
+from scipy import sparse
 import matplotlib.pyplot as plt
 import seaborn as sns
+from Classe_Cache import CacheTextes, CacheResultats, normaliser_requete
+from Classes_Indexation import (nettoyer_texte, NettoyeurTextes, VOCABULAIRE, MatriceDocumentsTermes, IndexSegmente,
+                                ModeleTfidfIncremental, IndexSemantique, ModeleBM25, MatriceCollocations,
+                                meilleurs_indices)
+
+
+EXTENSION_COLONNES = '.corpus'  # extension des corpus sauvegardés au format en colonnes
+CACHE_TEXTES = CacheTextes()  # textes des documents chargés paresseusement, partagé par tous les corpus
+
+# Une occurrence trouvée par le concordancier : le titre du document, la position (en caractères) du motif
+# dans son texte, le motif et ses contextes, qui ne débordent ni sur un autre document ni sur une autre ligne.
+Concordance = namedtuple('Concordance', ['document', 'position', 'contexte_gauche', 'motif', 'contexte_droit'])
+COLONNES_CONCORDANCES = ['document', 'position', 'contexte gauche', 'motif trouvé', 'contexte droit']
+CLASSEMENTS = ('tfidf', 'bm25', 'semantique')  # classements proposés par rechercher_documents
+
+
+def _empreinte_contenu(titres, tailles, textes):
+    """
+    Renvoie l'empreinte du contenu d'un corpus sauvegardé au format en colonnes : ses titres, et ses textes
+    tels qu'ils sont enregistrés dans le fichier des textes (tailles et données), qui n'ont pas à être décompressés.
+    """
+    empreinte = hashlib.blake2b(digest_size=16)
+    empreinte.update('\0'.join(map(str, titres)).encode('utf-8'))
+    empreinte.update(np.asarray(tailles, dtype=np.int64).tobytes())
+    empreinte.update(textes)
+    return empreinte.hexdigest()
+
+
+def _valeur_textuelle(valeur):
+    """
+    Renvoie la valeur sous forme de texte, ou None si elle est absente (None ou NaN issu d'un fichier CSV).
+    """
+    if valeur is None or (isinstance(valeur, float) and math.isnan(valeur)):
+        return None
+    return str(valeur)
+
+
+class LecteurTextes:
+    """
+    Classe donnant accès aux textes d'un corpus sauvegardé au format en colonnes.
+
+    Les textes sont enregistrés les uns à la suite des autres dans le fichier des textes, compressés
+    séparément : le texte d'un document se lit à partir de sa position et de sa taille,
+    sans lire le reste du fichier. Les textes lus sont conservés dans un cache partagé (voir CacheTextes).
+
+    Un fichier des textes n'est jamais réécrit : chaque sauvegarde en écrit un nouveau (voir Corpus.save_colonnes),
+    et l'ancien n'est supprimé que lorsque plus aucun lecteur ne le lit (voir fichiers_lus).
+    """
+
+    # lecteurs existants, pour ne pas supprimer un fichier qu'un corpus chargé paresseusement lit encore
+    _lecteurs = weakref.WeakSet()
+
+    def __init__(self, chemin, cache=None):
+        self.chemin = os.path.abspath(chemin)
+        self.cache = CACHE_TEXTES if cache is None else cache
+        LecteurTextes._lecteurs.add(self)
+
+    @classmethod
+    def fichiers_lus(cls):
+        """
+        Renvoie les chemins (absolus) des fichiers des textes lus par les lecteurs existants.
+        """
+        return {lecteur.chemin for lecteur in list(cls._lecteurs)}
+
+    @staticmethod
+    def encoder(texte):
+        """
+        Renvoie le texte compressé, tel qu'il est enregistré dans le fichier.
+        """
+        return zlib.compress(texte.encode('utf-8'))
+
+    @staticmethod
+    def decoder(donnees):
+        """
+        Renvoie le texte correspondant à des données compressées.
+        """
+        return zlib.decompress(donnees).decode('utf-8')
+
+    def lire(self, position, taille):
+        """
+        Renvoie le texte enregistré à cette position, depuis le cache ou le fichier.
+
+        Args:
+            position (int): La position du texte dans le fichier, en octets.
+            taille (int): La taille du texte compressé, négative pour un texte absent.
+
+        Returns:
+            str: Le texte, ou None si le document n'en a pas.
+        """
+        if taille < 0:
+            return None
+        # un fichier des textes n'étant jamais réécrit, les lecteurs d'un même fichier partagent ses textes en cache
+        return self.cache.obtenir((self.chemin, position), lambda: self._lire(position, taille))
+
+    def _lire(self, position, taille):
+        with open(self.chemin, 'rb') as file:
+            file.seek(position)
+            return self.decoder(file.read(taille))
 
 
 ########################################################################################################################
@@ -52,12 +159,96 @@ class Document:
     def __init__(self, titre, auteur, date, url, texte):
         self.titre = titre
         self.auteur = auteur
-        self.date = datetime.strptime(date, "%Y-%m-%d %H:%M:%S").date()
+        if isinstance(date, datetime):
+            self.date = date.date()
+        elif isinstance(date, type_date):
+            self.date = date  # date déjà analysée, par exemple lors d'une construction en masse
+        else:
+            self.date = datetime.strptime(date, "%Y-%m-%d %H:%M:%S").date()
         self.url = url
+        self._proprietaire = None  # référence faible vers le corpus contenant le document (voir Corpus.version)
         self.texte = texte
 
         self.annotations = {}  # attribut pour stocker des annotations éventuelles du document
 
+    @property
+    def texte(self):
+        """
+        Le contenu textuel du document, lu sur le disque à la première demande si son chargement a été différé.
+        """
+        if self._emplacement_texte is not None:
+            lecteur, position, taille = self._emplacement_texte
+            return lecteur.lire(position, taille)
+        return self._texte
+
+    @texte.setter
+    def texte(self, texte):
+        self._texte = texte
+        self._emplacement_texte = None
+        self._jetons = None
+        corpus = self._proprietaire() if self._proprietaire is not None else None
+        if corpus is not None:
+            corpus._signaler_modification()
+
+    def jetons(self, nettoyeur=None):
+        """
+        Renvoie le texte nettoyé (voir nettoyer_texte) sous forme d'identifiants du vocabulaire partagé.
+
+        Le nettoyage n'a lieu qu'une fois : le résultat est conservé jusqu'à ce que le texte soit modifié.
+
+        :param nettoyeur: Un NettoyeurTextes partagé par les documents d'un même traitement, qui ne nettoie
+            qu'une fois chaque mot distinct ; par défaut le texte est nettoyé par nettoyer_texte.
+        :return: Un tableau numpy d'identifiants (voir Vocabulaire), en lecture seule.
+        """
+        if self._jetons is None:
+            mots = nettoyer_texte(self.texte).split() if nettoyeur is None else nettoyeur.mots(self.texte)
+            self._jetons = VOCABULAIRE.identifiants(mots)
+        return self._jetons
+
+    def differer_texte(self, lecteur, position, taille):
+        """
+        Diffère le chargement du texte : il sera lu par le lecteur à la position indiquée lorsqu'il sera demandé.
+        Le texte désigné doit être celui du document : les jetons déjà calculés sont conservés.
+
+        :param lecteur: Le LecteurTextes du fichier contenant le texte.
+        :param position: La position du texte dans le fichier.
+        :param taille: La taille du texte compressé, négative si le document n'a pas de texte.
+        """
+        self._texte = None
+        self._emplacement_texte = (lecteur, position, taille)
+
+    def __getstate__(self):
+        # un document enregistré en pickle emporte son texte et ne dépend plus du fichier ;
+        # ses jetons, propres au vocabulaire de ce processus, ne sont pas enregistrés,
+        # et le corpus le contenant s'enregistre à nouveau comme propriétaire au chargement
+        etat = self.__dict__.copy()
+        if etat['_emplacement_texte'] is not None:
+            etat['_texte'] = self.texte
+            etat['_emplacement_texte'] = None
+        etat['_jetons'] = None
+        etat['_proprietaire'] = None
+        return etat
+
+    def __setstate__(self, etat):
+        # les documents enregistrés avant le chargement différé conservaient leur texte dans l'attribut 'texte'
+        if 'texte' in etat:
+            etat['_texte'] = etat.pop('texte')
+        etat.setdefault('_emplacement_texte', None)
+        etat.setdefault('_jetons', None)
+        etat.setdefault('_proprietaire', None)
+        self.__dict__.update(etat)
+
+    def __deepcopy__(self, memo):
+        # la copie partage avec l'original l'emplacement de son texte différé et ses jetons (en lecture seule) ;
+        # elle n'appartient pas au corpus de l'original (la copie d'un corpus enregistre ses propres documents)
+        copie = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copie
+        for attribut, valeur in self.__dict__.items():
+            partage = attribut in ('_emplacement_texte', '_jetons')
+            copie.__dict__[attribut] = valeur if partage else copy.deepcopy(valeur, memo)
+        copie._proprietaire = None
+        return copie
+
 
     def afficher_infos(self):
         return print(f"Titre: {self.titre}\nAuteur: {self.auteur}\nDate: {self.date}\nURL: {self.url}\nTexte: {self.texte}")
@@ -197,18 +388,7 @@ class DocumentFactory:
         docs = pd.read_csv(chemin_donnees_acquises, sep='\t')
 
         # instancier un objet Corpus pour y stocker sous forme d'instances d'autres objets les articles acquis
-        corpus_articles = Corpus(nom_corpus)
-
-        for _, doc in docs.iterrows():
-            corpus_articles.add_document(doc['source'],
-                                         doc['titre'],
-                                         doc['auteur'],
-                                         doc['date'],
-                                         doc['url'],
-                                         doc['texte'],
-                                         doc['co_auteurs'],
-                                         doc['nombre_commentaires'])
-        return corpus_articles
+        return Corpus.from_dataframe(docs, nom_corpus)
 
 ########################################################################################################################
 
@@ -225,21 +405,111 @@ class Corpus:
 
     """
 
-    def __init__(self, nom):
+    def __init__(self, nom, mot_de_recherche=None):
         self.nom = nom
+        self.mot_de_recherche = mot_de_recherche  # séquence ayant servi à l'acquisition, utile pour actualiser le corpus
         self.authors = {}  # Dictionnaire des auteurs
         self.id2doc = {}  # Dictionnaire des documents
         self.ndoc = 0  # Comptage des documents
         self.naut = 0  # Comptage des auteurs
         self.texte_concatene = None # sera acquis au premier appel de la fonction search
+        self._index_inverse = None  # construit à la première recherche par index (voir index_inverse)
+
+        # Chaque modification incrémente la version ; les structures dérivées (texte concaténé, index inversé,
+        # TF-IDF) mémorisent l'état du corpus lors de leur calcul (voir _etat) pour être mises à jour à la demande
+        self.version = 0
+        self._version_reconstruction = 0  # version de la dernière modification autre qu'un ajout de documents
+        self._etat_texte_concatene = None
+        self._etat_index_inverse = None
+        self._etat_tfidf = None
+        self._tfidf_transposee = None  # (tfidf_matrix, sa transposée au format CSR), voir _matrice_termes_documents
+        self.index_semantique = None  # voir construire_index_semantique ; enregistré avec le corpus
+        self._etat_index_semantique = None  # (état du corpus, vectoriseur) lors de la construction de l'index
+        self.bm25 = None  # voir construire_bm25 ; enregistré au format pickle seulement
+        self._etat_bm25 = None
+        self.cache_recherches = CacheResultats()  # résultats de rechercher_documents, voir CacheResultats
+        self._documents_termes = None  # (état du corpus, MatriceDocumentsTermes), voir cooccurrences
+        self._collocations = None  # (état du corpus, MatriceCollocations), voir collocations
+        self._index_dates = None  # (état du corpus, dates triées, positions, documents), voir _dates_triees
+
+    def __getstate__(self):
+        # l'index inversé et la transposée de la matrice TF-IDF ne sont ni enregistrés ni copiés :
+        # ils sont reconstruits à la demande
+        etat = self.__dict__.copy()
+        etat['_index_inverse'] = None
+        etat['_etat_index_inverse'] = None
+        etat['_tfidf_transposee'] = None
+        etat['_documents_termes'] = None
+        etat['_collocations'] = None
+        etat['_index_dates'] = None
+        return etat
+
+    def __setstate__(self, etat):
+        # les corpus enregistrés avant le suivi des versions n'ont ni version ni état des structures dérivées
+        for attribut in ('_index_inverse', '_etat_texte_concatene', '_etat_index_inverse', '_etat_tfidf',
+                         '_tfidf_transposee', 'index_semantique', '_etat_index_semantique', 'bm25', '_etat_bm25',
+                         '_documents_termes', '_collocations', '_index_dates'):
+            etat.setdefault(attribut, None)
+        etat.setdefault('mot_de_recherche', None)  # attribut absent des corpus enregistrés avant son ajout
+        etat.setdefault('version', 0)
+        etat.setdefault('cache_recherches', CacheResultats())
+        etat.setdefault('_version_reconstruction', 0)
+        self.__dict__.update(etat)
+        self._enregistrer_documents(self.id2doc.values())
+
+    def _enregistrer_documents(self, documents):
+        # les documents signalent au corpus les modifications de leur texte
+        reference = weakref.ref(self)
+        for doc in documents:
+            doc._proprietaire = reference
+
+    def _signaler_modification(self, ajout=False):
+        """
+        Signale une modification du corpus, en incrémentant sa version.
+
+        Les structures dérivées sont mises à jour à leur prochaine utilisation : incrémentalement si des documents
+        ont seulement été ajoutés à la fin de id2doc (ajout=True), en les reconstruisant sinon (texte modifié,
+        document remplacé, corpus filtré).
+        """
+        self.version += 1
+        if not ajout:
+            self._version_reconstruction = self.version
+
+    def _etat(self):
+        return self.version, len(self.id2doc), self.id2doc
+
+    def _documents_ajoutes(self, etat):
+        """
+        Renvoie les documents ajoutés depuis qu'une structure dérivée a été calculée.
+
+        Args:
+            etat (tuple): L'état du corpus (voir _etat) lors du calcul de la structure, ou None.
+
+        Returns:
+            list: Les documents ajoutés depuis (une liste vide si la structure est à jour), ou None si
+            la structure doit être reconstruite.
+        """
+        if etat is None:
+            return None
+        version, nombre, id2doc = etat
+        if id2doc is not self.id2doc or len(id2doc) < nombre:  # id2doc remplacé ou modifié directement
+            return None
+        if version == self.version:
+            return []
+        if version < self._version_reconstruction:
+            return None
+        return list(islice(self.id2doc.values(), nombre, None))
 
     def add_document(self,source ,titre, auteur, date, url, texte, co_auteurs, nb_commentaires=0):
         # Créer une nouvelle instance de Document
 
         doc = DocumentFactory.create_document(source ,titre, auteur, date, url, texte, co_auteurs, nb_commentaires)
 
-        # Ajouter le document à id2doc
+        # Ajouter le document à id2doc (un titre déjà présent remplace le document précédent, à sa place)
+        remplacement = titre in self.id2doc
         self.id2doc[titre] = doc
+        self._enregistrer_documents([doc])
+        self._signaler_modification(ajout=not remplacement)
 
         # Incrémenter le comptage des documents
         self.ndoc += 1
@@ -257,6 +527,77 @@ class Corpus:
         # Utiliser la méthode "add" de l'instance pour ajouter le document à sa production
         current_auteur.add(doc)
 
+    def add_documents(self, lignes):
+        """
+        Ajoute plusieurs documents au corpus, directement depuis les lignes acquises.
+
+        Args:
+            lignes (iterable): Des dictionnaires ayant les clés 'source', 'titre', 'auteur', 'date', 'url',
+                'texte' et éventuellement 'co_auteurs' et 'nombre_commentaires'. Un générateur peut être
+                fourni : les documents sont alors ajoutés au fur et à mesure de leur acquisition.
+
+        Returns:
+            int: Le nombre de documents ajoutés.
+        """
+        nombre_ajoutes = 0
+        for ligne in lignes:
+            self.add_document(ligne['source'],
+                              ligne['titre'],
+                              ligne['auteur'],
+                              ligne['date'],
+                              ligne['url'],
+                              ligne['texte'],
+                              ligne.get('co_auteurs'),
+                              ligne.get('nombre_commentaires', 0))
+            nombre_ajoutes += 1
+        return nombre_ajoutes
+
+    @classmethod
+    def from_dataframe(cls, docs, nom, mot_de_recherche=None):
+        """
+        Crée un corpus à partir d'un DataFrame, en traitant les colonnes d'un seul tenant.
+
+        Les dates sont analysées en une seule passe et les auteurs sont regroupés par pandas,
+        au lieu d'un appel à add_document par ligne.
+
+        Args:
+            docs (DataFrame): Les documents, avec les colonnes 'source', 'titre', 'auteur', 'date', 'url',
+                'texte' et éventuellement 'co_auteurs' et 'nombre_commentaires'.
+            nom (str): Le nom du corpus.
+            mot_de_recherche (str): La séquence ayant servi à l'acquisition.
+
+        Returns:
+            Corpus: Le corpus contenant les documents, identique à celui obtenu par add_document.
+        """
+        corpus = cls(nom, mot_de_recherche)
+        nombre = len(docs)
+        if nombre == 0:
+            return corpus
+
+        dates = pd.to_datetime(docs['date'], format="%Y-%m-%d %H:%M:%S").dt.date.tolist()
+        co_auteurs = docs['co_auteurs'].tolist() if 'co_auteurs' in docs else [None] * nombre
+        nb_commentaires = docs['nombre_commentaires'].tolist() if 'nombre_commentaires' in docs else [0] * nombre
+
+        documents = [DocumentFactory.create_document(source, titre, auteur, date, url, texte, co_auteur, nb)
+                     for source, titre, auteur, date, url, texte, co_auteur, nb in zip(
+                         docs['source'].tolist(), docs['titre'].tolist(), docs['auteur'].tolist(), dates,
+                         docs['url'].tolist(), docs['texte'].tolist(), co_auteurs, nb_commentaires)]
+
+        # comme avec add_document, un titre répété remplace le document précédent
+        corpus.id2doc = dict(zip(docs['titre'].tolist(), documents))
+        corpus.ndoc = nombre
+        corpus._enregistrer_documents(documents)
+        corpus._signaler_modification()
+
+        for auteur, positions in docs.groupby('auteur', sort=False, dropna=False).indices.items():
+            current_auteur = Author(auteur)
+            current_auteur.ndoc = len(positions)
+            current_auteur.production = {documents[i].titre: documents[i] for i in positions}
+            corpus.authors[auteur] = current_auteur
+        corpus.naut = len(corpus.authors)
+
+        return corpus
+
     def __repr__(self):
         return f"Corpus '{self.nom}' contenant {self.ndoc} documents et {self.naut} auteurs."
 
@@ -321,121 +662,542 @@ class Corpus:
         """
         Sauvegarde l'objet Corpus dans un fichier.
 
+        Un nom se terminant par '.corpus' désigne le format en colonnes (voir save_colonnes),
+        tout autre nom un fichier pickle.
+        Le fichier contenant alors tous les documents, le journal des ajouts éventuel est supprimé.
+
         Args:
             filename (str): Le nom du fichier où sauvegarder l'objet.
         """
-        with open(filename, 'wb') as file:
-            pickle.dump(self, file)
+        if filename.endswith(EXTENSION_COLONNES):
+            self.save_colonnes(filename)
+        else:
+            with open(filename, 'wb') as file:
+                pickle.dump(self, file)
+        if os.path.exists(self.chemin_journal(filename)):
+            os.remove(self.chemin_journal(filename))
+
+    def save_colonnes(self, repertoire):
+        """
+        Sauvegarde le corpus au format en colonnes : un répertoire contenant une table Parquet
+        pour les documents, une pour les auteurs et une pour les annotations, plus les métadonnées du corpus.
+
+        Les colonnes textuelles sont compressées, et chaque colonne peut être relue séparément
+        (voir lire_colonnes). Les textes des documents sont enregistrés à part, dans un fichier des textes
+        dont la table des documents indique la position et la taille de chaque texte : ils peuvent ainsi
+        être lus un par un (voir LecteurTextes).
+        Ce fichier est nommé d'après l'empreinte du contenu ('textes-<empreinte>.bin') et n'est jamais réécrit :
+        les corpus chargés paresseusement depuis ce répertoire continuent de lire le fichier précédent, qui n'est
+        supprimé que lorsqu'aucun lecteur de ce processus ne l'utilise plus (voir LecteurTextes.fichiers_lus).
+        Le modèle TF-IDF et l'index sémantique, s'ils sont à jour, sont enregistrés à côté (voir _enregistrer_tfidf) ;
+        les autres structures dérivées (texte concaténé, index inversé, modèle BM25) ne sont pas enregistrées.
+
+        Args:
+            repertoire (str): Le répertoire où sauvegarder le corpus (créé si besoin).
+        """
+        os.makedirs(repertoire, exist_ok=True)
+        docs = list(self.id2doc.values())
+
+        # les textes sont tous lus avant d'écrire : un corpus chargé paresseusement peut les lire dans ce même fichier
+        textes = [_valeur_textuelle(doc.texte) for doc in docs]
+        positions, tailles, donnees = [], [], []
+        position = 0
+        for texte in textes:
+            encode = b'' if texte is None else LecteurTextes.encoder(texte)
+            positions.append(position)
+            tailles.append(-1 if texte is None else len(encode))
+            donnees.append(encode)
+            position += len(encode)
+        # l'empreinte du contenu nomme le fichier des textes et relie les modèles enregistrés à côté
+        # (voir _enregistrer_tfidf) à ce contenu
+        empreinte = _empreinte_contenu([doc.titre for doc in docs], tailles, b''.join(donnees))
+        fichier_textes = f"textes-{empreinte}.bin"
+        chemin_textes = os.path.join(repertoire, fichier_textes)
+        with open(chemin_textes + '.tmp', 'wb') as file:
+            file.writelines(donnees)
+        os.replace(chemin_textes + '.tmp', chemin_textes)
+
+        # les documents de ce corpus chargés paresseusement depuis ce répertoire lisent désormais le nouveau fichier
+        lecteur = None
+        dossier = os.path.abspath(repertoire)
+        for doc, position, taille in zip(docs, positions, tailles):
+            if doc._emplacement_texte is not None and os.path.dirname(doc._emplacement_texte[0].chemin) == dossier:
+                lecteur = lecteur or LecteurTextes(chemin_textes, doc._emplacement_texte[0].cache)
+                doc.differer_texte(lecteur, position, taille)
+
+        documents = pd.DataFrame({
+            'titre': [doc.titre for doc in docs],
+            'auteur': [_valeur_textuelle(doc.auteur) for doc in docs],
+            'date': pd.Series([doc.date for doc in docs], dtype='object'),
+            'url': [_valeur_textuelle(doc.url) for doc in docs],
+            'source': [doc.type for doc in docs],
+            'co_auteurs': [_valeur_textuelle(getattr(doc, 'co_auteurs', None)) for doc in docs],
+            'nombre_commentaires': pd.array([getattr(doc, 'nb_commentaires', None) for doc in docs], dtype='Int64'),
+            'position_texte': pd.Series(positions, dtype='int64'),
+            'taille_texte': pd.Series(tailles, dtype='int64'),
+        })
+        documents.to_parquet(os.path.join(repertoire, 'documents.parquet'), index=False, compression='zstd')
+
+        auteurs = pd.DataFrame({
+            'nom': [_valeur_textuelle(nom) for nom in self.authors],
+            'ndoc': [auteur.ndoc for auteur in self.authors.values()],
+        })
+        auteurs.to_parquet(os.path.join(repertoire, 'auteurs.parquet'), index=False, compression='zstd')
+
+        # identifiants, positions et dates des annotations sont de types libres : ils sont enregistrés en JSON
+        annotations = pd.DataFrame([{
+            'titre': doc.titre,
+            'id_annotation': json.dumps(id_annotation, default=str),
+            'texte': _valeur_textuelle(info['texte']),
+            'position': json.dumps(info['position'], default=str),
+            'auteur': json.dumps(info['auteur'], default=str),
+            'date': json.dumps(info['date'], default=str),
+        } for doc in docs for id_annotation, info in doc.annotations.items()],
+            columns=['titre', 'id_annotation', 'texte', 'position', 'auteur', 'date'], dtype='object')
+        annotations.to_parquet(os.path.join(repertoire, 'annotations.parquet'), index=False, compression='zstd')
+
+        chemin_meta = os.path.join(repertoire, 'corpus.json')
+        with open(chemin_meta + '.tmp', 'w') as file:
+            json.dump({'nom': self.nom,
+                       'mot_de_recherche': getattr(self, 'mot_de_recherche', None),
+                       'ndoc': self.ndoc,
+                       'naut': self.naut,
+                       'empreinte': empreinte,
+                       'textes': fichier_textes}, file)
+        os.replace(chemin_meta + '.tmp', chemin_meta)
+
+        # les fichiers des textes précédents ne sont supprimés qu'une fois qu'aucun lecteur ne les lit plus
+        lus = LecteurTextes.fichiers_lus()
+        for fichier in os.listdir(repertoire):
+            chemin = os.path.abspath(os.path.join(repertoire, fichier))
+            if (fichier.startswith('textes') and fichier.endswith('.bin') and fichier != fichier_textes
+                    and chemin not in lus):
+                os.remove(chemin)
+
+        self._enregistrer_tfidf(repertoire, empreinte)
+
+    def _enregistrer_tfidf(self, repertoire, empreinte):
+        """
+        Enregistre le modèle TF-IDF ajusté dans le répertoire d'un corpus au format en colonnes : la matrice et
+        les poids IDF dans 'tfidf.npz', le vocabulaire (dans l'ordre des colonnes) dans 'vocabulaire.json', avec
+        l'empreinte du contenu du corpus. L'index sémantique construit sur ce modèle est enregistré dans
+        'semantique.npz' (voir IndexSemantique.tableaux). Un modèle ou un index absent, périmé (ou un modèle
+        incrémental) n'est pas enregistré, et les fichiers enregistrés précédemment sont alors supprimés.
+
+        Args:
+            repertoire (str): Le répertoire du corpus.
+            empreinte (str): L'empreinte du contenu enregistré (voir _empreinte_contenu).
+        """
+        chemin_matrice = os.path.join(repertoire, 'tfidf.npz')
+        chemin_vocabulaire = os.path.join(repertoire, 'vocabulaire.json')
+        chemin_semantique = os.path.join(repertoire, 'semantique.npz')
+        a_jour = (isinstance(getattr(self, 'vectorizer', None), TfidfVectorizer) and self._etat_tfidf is not None
+                  and self._etat_tfidf[0] == self.version)
+        semantique_a_jour = (a_jour and self.index_semantique is not None
+                             and self._etat_index_semantique[0][0] == self.version
+                             and self._etat_index_semantique[1] is self.vectorizer)
+        for chemin, garder in ((chemin_matrice, a_jour), (chemin_vocabulaire, a_jour),
+                               (chemin_semantique, semantique_a_jour)):
+            if not garder and os.path.exists(chemin):
+                os.remove(chemin)
+        if not a_jour:
+            return
+
+        matrice = self.tfidf_matrix.tocsr()
+        with open(chemin_matrice + '.tmp', 'wb') as file:
+            np.savez(file, data=matrice.data, indices=matrice.indices, indptr=matrice.indptr,
+                     shape=np.array(matrice.shape), idf=self.vectorizer.idf_)
+        os.replace(chemin_matrice + '.tmp', chemin_matrice)
+        if semantique_a_jour:
+            with open(chemin_semantique + '.tmp', 'wb') as file:
+                np.savez(file, **self.index_semantique.tableaux())
+            os.replace(chemin_semantique + '.tmp', chemin_semantique)
+        with open(chemin_vocabulaire, 'w') as file:
+            json.dump({'empreinte': empreinte, 'termes': self.vectorizer.get_feature_names_out().tolist()}, file)
+
+    def _charger_tfidf(self, repertoire, empreinte):
+        """
+        Charge le modèle TF-IDF (et l'index sémantique) enregistré par _enregistrer_tfidf, s'il existe et correspond au contenu du corpus
+        (même empreinte) : la première recherche ne réajuste alors pas le modèle. Les empreintes enregistrées
+        sont comparées sans lire les textes, qu'un chargement paresseux ne lit pas.
+
+        Args:
+            repertoire (str): Le répertoire du corpus.
+            empreinte (str): L'empreinte du contenu, enregistrée dans 'corpus.json' (None si elle en est absente).
+
+        Returns:
+            bool: True si le modèle a été chargé.
+        """
+        chemin_matrice = os.path.join(repertoire, 'tfidf.npz')
+        chemin_vocabulaire = os.path.join(repertoire, 'vocabulaire.json')
+        if not (os.path.exists(chemin_matrice) and os.path.exists(chemin_vocabulaire)):
+            return False
+        with open(chemin_vocabulaire, 'r') as file:
+            vocabulaire = json.load(file)
+        if empreinte is None or vocabulaire['empreinte'] != empreinte:
+            return False
+
+        with np.load(chemin_matrice) as tableaux:
+            self.tfidf_matrix = sparse.csr_matrix((tableaux['data'], tableaux['indices'], tableaux['indptr']),
+                                                  shape=tuple(tableaux['shape']))
+            self.vectorizer = TfidfVectorizer()
+            self.vectorizer.vocabulary_ = {terme: i for i, terme in enumerate(vocabulaire['termes'])}
+            self.vectorizer.idf_ = tableaux['idf']
+        self._etat_tfidf = self._etat()
+
+        # l'index sémantique se rapporte aux colonnes de ce modèle : il n'est chargé qu'avec lui
+        chemin_semantique = os.path.join(repertoire, 'semantique.npz')
+        if os.path.exists(chemin_semantique):
+            with np.load(chemin_semantique) as tableaux:
+                self.index_semantique = IndexSemantique.depuis_tableaux(tableaux)
+            self._etat_index_semantique = (self._etat(), self.vectorizer)
+        return True
+
+    @staticmethod
+    def lire_colonnes(repertoire, colonnes=None, table='documents'):
+        """
+        Lit certaines colonnes d'un corpus sauvegardé au format en colonnes, sans construire le corpus.
+
+        Le fichier est projeté en mémoire et seules les colonnes demandées sont lues : parcourir les titres
+        et les dates d'un corpus ne nécessite pas de lire les textes. La colonne 'texte' de la table des documents
+        est reconstituée à partir du fichier des textes.
+
+        Args:
+            repertoire (str): Le répertoire du corpus.
+            colonnes (list): Les colonnes à lire, toutes si None.
+            table (str): 'documents', 'auteurs' ou 'annotations'.
+
+        Returns:
+            DataFrame: Les colonnes demandées.
+        """
+        chemin = os.path.join(repertoire, f"{table}.parquet")
+        if table != 'documents' or (colonnes is not None and 'texte' not in colonnes):
+            return pd.read_parquet(chemin, columns=colonnes, memory_map=True)
+
+        lues = None if colonnes is None else [c for c in colonnes if c != 'texte'] + ['position_texte', 'taille_texte']
+        documents = pd.read_parquet(chemin, columns=lues, memory_map=True)
+        with open(Corpus._chemin_textes(repertoire), 'rb') as file:
+            donnees = memoryview(file.read())
+        documents['texte'] = [None if taille < 0 else LecteurTextes.decoder(donnees[position:position + taille])
+                              for position, taille in zip(documents['position_texte'].tolist(),
+                                                          documents['taille_texte'].tolist())]
+        return documents if colonnes is None else documents[list(colonnes)]
+
+    @staticmethod
+    def _chemin_textes(repertoire, meta=None):
+        """
+        Renvoie le chemin du fichier des textes d'un corpus au format en colonnes, indiqué dans 'corpus.json'
+        ('textes.bin' pour les corpus enregistrés avant que ce fichier soit nommé d'après leur contenu).
+        """
+        if meta is None:
+            with open(os.path.join(repertoire, 'corpus.json'), 'r') as file:
+                meta = json.load(file)
+        return os.path.join(repertoire, meta.get('textes', 'textes.bin'))
+
+    @classmethod
+    def load_colonnes(cls, repertoire, paresseux=False):
+        """
+        Charge un corpus sauvegardé au format en colonnes (voir save_colonnes).
+
+        En mode paresseux, seules les métadonnées des documents sont chargées : le texte d'un document
+        est lu dans le fichier des textes à sa première demande, puis conservé dans un cache borné
+        partagé par tous les corpus (voir CacheTextes).
+        Le modèle TF-IDF et l'index sémantique enregistrés avec le corpus sont chargés s'ils correspondent
+        à son contenu (voir _charger_tfidf).
+
+        Args:
+            repertoire (str): Le répertoire du corpus.
+            paresseux (bool): Si True, le chargement des textes est différé.
+
+        Returns:
+            Corpus: L'objet Corpus chargé.
+        """
+        with open(os.path.join(repertoire, 'corpus.json'), 'r') as file:
+            meta = json.load(file)
+
+        if paresseux:
+            documents = cls.lire_colonnes(repertoire, ['titre', 'auteur', 'date', 'url', 'source', 'co_auteurs',
+                                                       'nombre_commentaires', 'position_texte', 'taille_texte'])
+            documents['texte'] = None
+        else:
+            documents = cls.lire_colonnes(repertoire)
+        documents['date'] = pd.to_datetime(documents['date'])
+        corpus = cls.from_dataframe(documents, meta['nom'], meta['mot_de_recherche'])
+        if paresseux:
+            lecteur = LecteurTextes(cls._chemin_textes(repertoire, meta))
+            for titre, position, taille in zip(documents['titre'].tolist(), documents['position_texte'].tolist(),
+                                               documents['taille_texte'].tolist()):
+                corpus.id2doc[titre].differer_texte(lecteur, position, taille)
+
+        # compteurs enregistrés : un titre répété compte plusieurs fois, comme avec add_document
+        corpus.ndoc = meta['ndoc']
+        corpus.naut = meta['naut']
+        auteurs = cls.lire_colonnes(repertoire, table='auteurs')
+        for nom, ndoc in zip(auteurs['nom'].tolist(), auteurs['ndoc'].tolist()):
+            if nom in corpus.authors:
+                corpus.authors[nom].ndoc = ndoc
+
+        annotations = cls.lire_colonnes(repertoire, table='annotations')
+        for ligne in annotations.to_dict('records'):
+            corpus.id2doc[ligne['titre']].ajouter_annotation(json.loads(ligne['id_annotation']),
+                                                             ligne['texte'],
+                                                             json.loads(ligne['position']),
+                                                             json.loads(ligne['auteur']),
+                                                             json.loads(ligne['date']))
+        corpus._charger_tfidf(repertoire, meta.get('empreinte'))
+        return corpus
+
+    @staticmethod
+    def chemin_fichier(nom, repertoire="data"):
+        """
+        Renvoie le chemin du fichier d'un corpus à partir de son nom.
+
+        Le format en colonnes est privilégié ; un corpus existant uniquement au format pickle reste désigné par son fichier '.pkl'.
+
+        Args:
+            nom (str): Le nom du corpus.
+            repertoire (str): Le répertoire des corpus.
+
+        Returns:
+            str: Le chemin du fichier (ou répertoire) du corpus.
+        """
+        chemin = os.path.join(repertoire, nom + EXTENSION_COLONNES)
+        chemin_pickle = os.path.join(repertoire, nom + '.pkl')
+        if not os.path.exists(chemin) and os.path.exists(chemin_pickle):
+            return chemin_pickle
+        return chemin
+
+    @staticmethod
+    def chemin_journal(filename):
+        """
+        Renvoie le chemin du journal des ajouts associé à un fichier de corpus.
+        """
+        return f"{filename}.journal"
+
+    def save_delta(self, filename, lignes):
+        """
+        Enregistre uniquement des documents ajoutés, à la suite du journal associé au fichier du corpus.
+
+        Le fichier du corpus n'est pas réécrit : le journal est rejoué par Corpus.load.
+
+        Args:
+            filename (str): Le nom du fichier du corpus.
+            lignes (list): Les lignes des documents ajoutés (voir add_documents).
+        """
+        with open(self.chemin_journal(filename), 'ab') as file:
+            pickle.dump(list(lignes), file)
 
     @classmethod
-    def load(cls, filename):
+    def load(cls, filename, paresseux=False):
         """
-        Charge un objet Corpus à partir d'un fichier.
+        Charge un objet Corpus à partir d'un fichier, puis rejoue le journal des ajouts s'il existe.
 
         Args:
             filename (str): Le nom du fichier depuis lequel charger l'objet.
+            paresseux (bool): Si True, les textes d'un corpus au format en colonnes ne sont lus qu'à la demande
+                (voir load_colonnes). Un fichier pickle est toujours chargé entièrement.
 
         Returns:
             Corpus: L'objet Corpus chargé.
         """
-        with open(filename, 'rb') as file:
-            return pickle.load(file)
+        if filename.endswith(EXTENSION_COLONNES):
+            corpus = cls.load_colonnes(filename, paresseux)
+        else:
+            with open(filename, 'rb') as file:
+                corpus = pickle.load(file)
+        if os.path.exists(cls.chemin_journal(filename)):
+            with open(cls.chemin_journal(filename), 'rb') as file:
+                while True:
+                    try:
+                        corpus.add_documents(pickle.load(file))
+                    except EOFError:
+                        break
+        return corpus
 
     def concatener_textes(self):
-        if self.texte_concatene is None:
+        """
+        Met à jour texte_concatene, le texte de tous les documents séparés par une espace :
+        seuls les textes des documents ajoutés depuis le dernier appel sont ajoutés à la fin.
+        """
+        ajoutes = None if self.texte_concatene is None else self._documents_ajoutes(self._etat_texte_concatene)
+        if ajoutes is None or self._etat_texte_concatene[1] == 0:
             self.texte_concatene = ' '.join([str(doc.texte) if doc.texte is not None else '' for doc in self.id2doc.values()])
+        elif ajoutes:
+            self.texte_concatene = ' '.join([self.texte_concatene]
+                                            + [str(doc.texte) if doc.texte is not None else '' for doc in ajoutes])
+        self._etat_texte_concatene = self._etat()
+
+    def index_inverse(self):
+        """
+        Renvoie l'index inversé positionnel des textes du corpus, construit au premier appel puis complété
+        par les documents ajoutés depuis (voir IndexSegmente).
 
-    def search(self, mot_clef):
+        Returns:
+            IndexSegmente: L'index, dont les documents sont dans l'ordre de id2doc.
+        """
+        ajoutes = None if self._index_inverse is None else self._documents_ajoutes(self._etat_index_inverse)
+        if ajoutes is None:
+            self._index_inverse = IndexSegmente()
+            ajoutes = list(self.id2doc.values())
+        if ajoutes or not self._index_inverse.segments:
+            self._index_inverse.ajouter([doc.titre for doc in ajoutes], [_valeur_textuelle(doc.texte) for doc in ajoutes])
+        self._etat_index_inverse = self._etat()
+        return self._index_inverse
+
+    def search(self, mot_clef, mode='regex'):
+        """
+        Recherche un mot-clé dans les textes du corpus.
+
+        Args:
+            mot_clef (str): Une expression régulière (mode 'regex'), ou une requête de l'index inversé
+                (mode 'index') : termes, préfixes (scien*), expressions exactes ("machine learning"),
+                opérateurs AND, OR, NOT et parenthèses (voir IndexInverse).
+            mode (str): 'regex' parcourt le texte concaténé de tout le corpus, 'index' interroge l'index inversé
+                sans relire les textes.
+
+        Returns:
+            list | DataFrame: En mode 'regex', la liste des occurrences trouvées. En mode 'index', un DataFrame
+            ayant une ligne par document satisfaisant la requête, avec les colonnes 'titre', 'occurrences'
+            (le nombre d'occurrences des termes recherchés), 'positions' (leurs positions en mots) et 'debuts'
+            (leurs positions en caractères dans le texte).
+        """
+        if mode == 'index':
+            index = self.index_inverse()
+            resultat = index.rechercher(mot_clef)
+            occurrences = resultat.occurrences
+            # les occurrences étant triées par document, celles de chaque document forment une tranche
+            debuts = np.searchsorted(occurrences.documents, resultat.documents, side='left')
+            fins = np.searchsorted(occurrences.documents, resultat.documents, side='right')
+            positions, positions_caracteres = occurrences.positions.tolist(), occurrences.debuts.tolist()
+            return pd.DataFrame({
+                'titre': [index.titres[i] for i in resultat.documents],
+                'occurrences': (fins - debuts).astype('int64'),
+                'positions': [positions[d:f] for d, f in zip(debuts.tolist(), fins.tolist())],
+                'debuts': [positions_caracteres[d:f] for d, f in zip(debuts.tolist(), fins.tolist())],
+            }, columns=['titre', 'occurrences', 'positions', 'debuts'])
+        if mode != 'regex':
+            raise ValueError(f"Mode de recherche {mode} non reconnu")
 
         self.concatener_textes()
 
         # Utilisez re.findall pour trouver toutes les occurrences du mot-clé
         return re.findall(mot_clef, self.texte_concatene)
 
-    def concorde(self, expression, taille_contexte):
+    def iterer_concordances(self, expression, taille_contexte, mode='regex'):
         """
-        Recherche les occurrences de l'expression dans le corpus, en fournissant un contexte autour de chaque occurrence.
+        Parcourt les occurrences d'une expression, document par document, en fournissant un contexte
+        autour de chaque occurrence. Les occurrences sont produites à la demande : interrompre le parcours
+        (par exemple après une page de résultats) évite de lire et d'analyser les documents suivants.
 
         Args:
-            expression (str): L'expression à rechercher dans le corpus.
-            taille_contexte (int): La taille du contexte autour de l'expression trouvée.
+            expression (str): L'expression à rechercher : le texte exact, sensible à la casse (mode 'regex'),
+                ou une requête de l'index inversé (mode 'index', voir Corpus.search).
+            taille_contexte (int): La taille (en caractères) des contextes gauche et droit.
+            mode (str): 'regex' analyse le texte de chaque document ; 'index' ne lit que les textes des
+                documents satisfaisant la requête, aux positions données par l'index inversé.
+
+        Yields:
+            Concordance: (document, position, contexte_gauche, motif, contexte_droit) pour chaque occurrence,
+            dans l'ordre des documents puis des positions.
+        """
+        if mode == 'index':
+            index = self.index_inverse()
+            occurrences = index.rechercher(expression).occurrences
+            emplacements = zip(occurrences.documents.tolist(), occurrences.debuts.tolist(), occurrences.fins.tolist())
+            docs, indice_courant, texte = list(self.id2doc.values()), None, None
+            for indice, debut, fin in emplacements:
+                if indice != indice_courant:
+                    indice_courant, texte = indice, _valeur_textuelle(docs[indice].texte)
+                yield self._concordance(index.titres[indice], texte, debut, fin, taille_contexte)
+            return
+        if mode != 'regex':
+            raise ValueError(f"Mode de recherche {mode} non reconnu")
+
+        motif = re.compile(re.escape(expression))
+        for titre, doc in list(self.id2doc.items()):
+            texte = _valeur_textuelle(doc.texte)
+            if texte is None:
+                continue
+            for correspondance in motif.finditer(texte):
+                yield self._concordance(titre, texte, correspondance.start(), correspondance.end(), taille_contexte)
 
-        Returns:
-            DataFrame: Un DataFrame contenant les contextes gauche et droit de chaque occurrence de l'expression.
+    @staticmethod
+    def _concordance(titre, texte, debut, fin, taille_contexte):
+        # comme '.' dans une expression régulière, les contextes s'arrêtent aux sauts de ligne
+        gauche = texte[max(debut - taille_contexte, 0):debut]
+        droite = texte[fin:fin + taille_contexte]
+        return Concordance(titre, debut, gauche[gauche.rfind('\n') + 1:], texte[debut:fin], droite.split('\n', 1)[0])
+
+    def page_concordances(self, expression, taille_contexte, page=1, resultats_par_page=10, mode='regex'):
         """
-        # concatener les textes
-        self.concatener_textes()
+        Renvoie une page de concordances (voir iterer_concordances), sans chercher les occurrences suivantes.
 
-        # Trouver toutes les occurrences de l'expression
-        pattern = re.compile(
-            r'(.{{0,{}}})({})(.{{0,{}}})'.format(taille_contexte, re.escape(expression), taille_contexte))
-        matches = pattern.finditer(self.texte_concatene)
+        Args:
+            expression (str): L'expression à rechercher.
+            taille_contexte (int): La taille des contextes gauche et droit.
+            page (int): Le numéro de la page demandée, à partir de 1.
+            resultats_par_page (int): Le nombre d'occurrences par page.
+            mode (str): Le mode de recherche, 'regex' ou 'index'.
 
-        # Créer une liste pour stocker les résultats
-        concordances_list = []
+        Returns:
+            tuple: Un DataFrame des occurrences de la page, et un booléen indiquant s'il existe une page suivante.
+        """
+        debut = (page - 1) * resultats_par_page
+        concordances = list(islice(self.iterer_concordances(expression, taille_contexte, mode),
+                                   debut, debut + resultats_par_page + 1))
+        suite = len(concordances) > resultats_par_page
+        return pd.DataFrame(concordances[:resultats_par_page], columns=COLONNES_CONCORDANCES), suite
 
-        # Remplir la liste avec les résultats
-        for match in matches:
-            concordance = {
-                'contexte gauche': match.group(1),
-                'motif trouvé': match.group(2),
-                'contexte droit': match.group(3)
-            }
-            concordances_list.append(concordance)
+    def concorde(self, expression, taille_contexte):
+        """
+        Recherche les occurrences de l'expression dans le corpus, en fournissant un contexte autour de chaque occurrence.
 
-        # Convertir la liste en DataFrame
-        concordances = pd.DataFrame(concordances_list, columns=['contexte gauche', 'motif trouvé', 'contexte droit'])
+        Args:
+            expression (str): L'expression à rechercher dans le corpus.
+            taille_contexte (int): La taille du contexte autour de l'expression trouvée.
 
-        return concordances
+        Returns:
+            DataFrame: Un DataFrame contenant, pour chaque occurrence de l'expression, le document et la position
+            où elle a été trouvée ainsi que ses contextes gauche et droit (voir iterer_concordances).
+        """
+        return pd.DataFrame(list(self.iterer_concordances(expression, taille_contexte)), columns=COLONNES_CONCORDANCES)
 
     def nettoyer_texte(self, texte):
         """
-        Nettoie le texte en appliquant plusieurs traitements.
+        Nettoie le texte en appliquant plusieurs traitements (voir Classes_Indexation.nettoyer_texte).
         """
-        # s'assurer de bien transmettre une chaine de texte
-
-        if texte is None or str(texte).lower() == 'nan':
-            return ''
-
-        # suppression des nombres et conversion en minuscules
-        texte = re.sub(r'\d+', '', texte).lower()
-
-        # Suppression de la ponctuation
-        texte = re.sub(r'[^\w\s]', '', texte)
-
-        # Supprimer les stopwords
-        stop_words = set(stopwords.words('english'))  # ne pas oublier de le spécifier
-        mots = texte.split()
-        mots_filtrés = [mot for mot in mots if mot not in stop_words]
-        texte_nettoye = ' '.join(mots_filtrés)
-
-        return texte_nettoye
+        return nettoyer_texte(texte)
 
     def construire_vocabulaire(self):
         """
         Construit le vocabulaire à partir des textes de tous les documents du corpus.
 
+        Les textes nettoyés sont ceux conservés par chaque document (voir Document.jetons).
+
         Returns:
-            dict: Un dictionnaire avec chaque mot unique et son nombre d'occurrences.
+            dict: Un dictionnaire associant un indice à chaque mot unique.
         """
-        vocabulaire = set()
-
-        # Boucler sur chaque document et extraire les mots
-        for doc in self.id2doc.values():
-            # Nettoyer le texte (en utilisant la fonction nettoyer_texte si elle est définie)
-            texte_nettoye = self.nettoyer_texte(doc.texte)
-
-            # Séparer les mots en utilisant l'espace, la tabulation, et la ponctuation comme délimiteurs
-            mots = re.findall(r'\b\w+\b', texte_nettoye)
+        vocabulaire = VOCABULAIRE.termes(self._identifiants_uniques())
+        return {index: mot for index, mot in enumerate(vocabulaire)}
 
-            # Ajouter les mots au set vocabulaire
-            vocabulaire.update(mots)
-
-        # Convertir le set en dictionnaire avec le compte des occurrences
-        vocabulaire_dict = {index: mot for index, mot in enumerate(vocabulaire)}
+    def _jetons_documents(self):
+        """
+        Renvoie les jetons (voir Document.jetons) de chaque document, dans l'ordre de id2doc.
 
+        Les documents qui n'ont pas encore été nettoyés le sont ensemble : chaque mot distinct
+        n'est nettoyé qu'une fois pour tout le corpus (voir NettoyeurTextes).
+        """
+        nettoyeur = NettoyeurTextes()
+        return [doc.jetons(nettoyeur) for doc in self.id2doc.values()]
 
-        return vocabulaire_dict
+    def _identifiants_uniques(self):
+        """
+        Renvoie les identifiants (voir Vocabulaire) des mots présents dans au moins un document.
+        """
+        jetons = self._jetons_documents()
+        if not jetons:
+            return np.array([], dtype=np.int32)
+        return np.unique(np.concatenate(jetons))
 
     def nombre_mots_uniques(self):
         """
@@ -445,52 +1207,125 @@ class Corpus:
         Returns:
             int: Le nombre de mots uniques dans le corpus.
         """
-        vocabulaire_dict = self.construire_vocabulaire()
-        return len(vocabulaire_dict)
+        return len(self._identifiants_uniques())
 
-    def calculer_frequences(self, vocabulaire_dict):
-        # Créer un dictionnaire pour stocker les fréquences des termes dans chaque document
-        freq_par_doc = {doc.titre: {mot: 0 for mot in vocabulaire_dict.values()} for doc in self.id2doc.values()}
+    def matrice_documents_termes(self):
+        """
+        Construit la matrice creuse documents × termes du corpus, en un seul passage sur les textes nettoyés.
 
-        for doc in self.id2doc.values():
-            # Nettoyage et extraction des mots
-            texte_nettoye = self.nettoyer_texte(doc.texte)
-            mots = re.findall(r'\b\w+\b', texte_nettoye)
+        Returns:
+            MatriceDocumentsTermes: La matrice (attribut 'matrice', au format CSR), ses termes
+            (attributs 'termes' et 'terme2indice') et les titres des documents (attribut 'titres').
+        """
+        docs = list(self.id2doc.values())
+        return MatriceDocumentsTermes.depuis_jetons([doc.titre for doc in docs], self._jetons_documents())
 
-            # Compter les fréquences des mots pour ce document
-            for mot in mots:
-                if mot in freq_par_doc[doc.titre]:
-                    freq_par_doc[doc.titre][mot] += 1
+    def cooccurrences(self, mots):
+        """
+        Compte, pour chaque couple de mots, le nombre de documents qui les contiennent tous les deux.
 
-        # Transformer le dictionnaire en DataFrame pour une meilleure lisibilité
-        freq_df = pd.DataFrame.from_dict(freq_par_doc, orient='index')
+        Les mots sont nettoyés comme les textes (voir nettoyer_texte). La matrice documents × termes du corpus
+        est construite une fois par version du corpus ; ses colonnes binarisées B restreintes aux mots donnent
+        tous les comptes en un seul produit creux Bᵀ·B.
 
-        return freq_df
+        Args:
+            mots (list): Les mots.
 
-    def calculer_frequences_2(self, vocabulaire_dict):
-        # Créer un dictionnaire pour stocker les fréquences des termes dans chaque document
-        freq_par_doc = {index: {mot: 0 for mot in vocabulaire_dict.values()} for index, doc in
-                        enumerate(self.id2doc.values())}
+        Returns:
+            DataFrame: Les comptes (entiers), avec les mots en lignes et en colonnes, prêts pour une heatmap.
+            La diagonale vaut 0.
+        """
+        mots = list(mots)
+        if self._documents_termes is None or self._documents_ajoutes(self._documents_termes[0]) != []:
+            self._documents_termes = (self._etat(), self.matrice_documents_termes())
+        nettoyeur = NettoyeurTextes()
+        presences = self._documents_termes[1].colonnes([nettoyeur[mot] for mot in mots])
+        presences.data[:] = 1
+        comptes = (presences.T @ presences).toarray().astype('int64')
+        np.fill_diagonal(comptes, 0)
+        return pd.DataFrame(comptes, index=mots, columns=mots)
+
+    def collocations(self, fenetre=5, taille_bloc=1000, nombre_threads=None):
+        """
+        Renvoie la matrice des cooccurrences des termes du corpus dans une fenêtre de ±'fenetre' mots
+        (voir MatriceCollocations), calculée sur les textes nettoyés. La matrice est conservée : après des ajouts
+        de documents, seuls ceux-ci sont comptés ; elle est recalculée après toute autre modification.
+
+        Args:
+            fenetre (int): La distance maximale (en mots nettoyés) entre deux termes cooccurrents.
+            taille_bloc (int): Le nombre de documents traités par bloc.
+            nombre_threads (int): Le nombre de blocs traités en parallèle.
+
+        Returns:
+            MatriceCollocations: La matrice.
+        """
+        ajoutes = None
+        if self._collocations is not None and self._collocations[1].fenetre == fenetre:
+            ajoutes = self._documents_ajoutes(self._collocations[0])
+        if ajoutes is None:
+            matrice, ajoutes = MatriceCollocations(fenetre), list(self.id2doc.values())
+        else:
+            matrice = self._collocations[1]
+        if ajoutes:
+            nettoyeur = NettoyeurTextes()
+            matrice.ajouter([doc.jetons(nettoyeur) for doc in ajoutes], taille_bloc, nombre_threads)
+        self._collocations = (self._etat(), matrice)
+        return matrice
+
+    def collocats(self, mot, n=10, mesure='pmi', fenetre=5, minimum=5):
+        """
+        Renvoie les n termes les plus associés à un mot dans une fenêtre de ±'fenetre' mots (voir collocations).
 
-        for index, doc in enumerate(self.id2doc.values()):
-            # Nettoyage et extraction des mots
-            texte_nettoye = self.nettoyer_texte(doc.texte)
-            mots = re.findall(r'\b\w+\b', texte_nettoye)
+        Args:
+            mot (str): Le mot, nettoyé comme les textes.
+            n (int): Le nombre de collocats.
+            mesure (str): 'pmi' (information mutuelle ponctuelle) ou 'llr' (rapport de vraisemblance).
+            fenetre (int): La taille de la fenêtre.
+            minimum (int): Le nombre minimal de cooccurrences d'un collocat retenu.
+
+        Returns:
+            DataFrame: Les collocats, par score décroissant (colonnes 'collocat', 'cooccurrences' et 'score').
+        """
+        return self.collocations(fenetre).collocats(NettoyeurTextes()[mot], n, mesure, minimum)
+
+    def frequences_mots(self):
+        """
+        Compte les occurrences de chaque mot dans l'ensemble du corpus.
+
+        Returns:
+            Series: Le nombre d'occurrences, indexé par les mots.
+        """
+        return self.matrice_documents_termes().frequences_totales()
 
-            # Compter les fréquences des mots pour ce document spécifique
-            for mot in mots:
-                if mot in vocabulaire_dict.values():  # Assurez-vous que le mot est dans le vocabulaire
-                    freq_par_doc[index][mot] += 1
+    def calculer_frequences(self, vocabulaire_dict):
+        """
+        Calcule les fréquences des mots du vocabulaire dans chaque document, indexées par titre.
 
-        # Transformer le dictionnaire en DataFrame pour une meilleure lisibilité
-        freq_df = pd.DataFrame.from_dict(freq_par_doc, orient='index')
+        Le DataFrame renvoyé contient une cellule par document et par mot : pour un corpus volumineux,
+        utiliser matrice_documents_termes ou frequences_mots.
+        """
+        return self.matrice_documents_termes().vers_dataframe(vocabulaire_dict.values())
 
-        return freq_df
+    def calculer_frequences_2(self, vocabulaire_dict):
+        """
+        Calcule les fréquences des mots du vocabulaire dans chaque document, indexées par position.
+        """
+        return self.matrice_documents_termes().vers_dataframe(vocabulaire_dict.values(), index=range(len(self.id2doc)))
 
-    def vectoriser_documents(self):
+    def vectoriser_documents(self, incremental=False, reajuster=False):
         """
         Vectorise les documents du corpus en utilisant TF-IDF.
+
+        Args:
+            incremental (bool): Si True, les documents sont vectorisés par un ModeleTfidfIncremental : seuls
+                les documents ajoutés depuis la dernière vectorisation sont vectorisés, au lieu d'ajuster
+                un nouveau TfidfVectorizer sur tout le corpus.
+            reajuster (bool): En mode incrémental, si True, le modèle est reconstruit à partir de tous les documents.
         """
+        if incremental:
+            self._vectoriser_incrementalement(reajuster)
+            return
+
         # Assurez-vous que les textes sont concaténés
         self.concatener_textes()
 
@@ -502,24 +1337,173 @@ class Corpus:
 
         # Vectoriser les documents
         self.tfidf_matrix = self.vectorizer.fit_transform(documents)
+        self._etat_tfidf = self._etat()
+        self.cache_recherches.vider()
+
+    def _vectoriser_incrementalement(self, reajuster=False):
+        ajoutes = None
+        if isinstance(getattr(self, 'vectorizer', None), ModeleTfidfIncremental) and not reajuster:
+            ajoutes = self._documents_ajoutes(self._etat_tfidf)
+        if ajoutes is None:  # premier appel, ou modification autre qu'un ajout : le modèle est reconstruit
+            self.vectorizer = ModeleTfidfIncremental()
+            ajoutes = list(self.id2doc.values())
+        if not self.vectorizer.nombre_documents and not ajoutes:
+            raise ValueError("Le corpus ne contient aucun document à vectoriser")
+        if ajoutes:
+            self.vectorizer.ajouter([str(doc.texte) if doc.texte is not None else '' for doc in ajoutes])
+        self.tfidf_matrix = self.vectorizer.matrice()
+        self._etat_tfidf = self._etat()
+        self.cache_recherches.vider()
+
+    def _actualiser_tfidf(self):
+        # Vérifiez si les documents ont été vectorisés depuis la dernière modification du corpus,
+        # en conservant le mode de vectorisation choisi (voir vectoriser_documents)
+        if not hasattr(self, 'tfidf_matrix') or self._etat_tfidf is None or self._etat_tfidf[0] != self.version:
+            self.vectoriser_documents(incremental=isinstance(getattr(self, 'vectorizer', None), ModeleTfidfIncremental))
+
+    def _matrice_termes_documents(self):
+        """
+        Renvoie la transposée de tfidf_matrix au format CSR : la ligne d'un terme y donne directement
+        les documents qui le contiennent, et le score d'une requête ne parcourt que les lignes de ses termes.
+        """
+        if self._tfidf_transposee is None or self._tfidf_transposee[0] is not self.tfidf_matrix:
+            self._tfidf_transposee = (self.tfidf_matrix, self.tfidf_matrix.T.tocsr())
+        return self._tfidf_transposee[1]
+
+    def construire_index_semantique(self, dimensions=200, nombre_groupes=None, groupes_sondes=8):
+        """
+        Construit l'index sémantique (voir IndexSemantique) des vecteurs TF-IDF du corpus, utilisé par
+        rechercher_documents(..., semantique=True). L'index est enregistré avec le corpus (voir save), avec le
+        modèle TF-IDF au format en colonnes (voir _enregistrer_tfidf).
+
+        Args:
+            dimensions (int): La dimension de l'espace sémantique (de 100 à 300 pour un grand corpus).
+            nombre_groupes (int): Si précisé, le nombre de groupes de la recherche approchée.
+            groupes_sondes (int): Le nombre de groupes examinés par requête en recherche approchée.
 
-    def rechercher_documents(self, requete):
+        Returns:
+            IndexSemantique: L'index construit.
+        """
+        self._actualiser_tfidf()
+        self.index_semantique = IndexSemantique(dimensions, nombre_groupes, groupes_sondes).ajuster(self.tfidf_matrix)
+        self._etat_index_semantique = (self._etat(), self.vectorizer)
+        self.cache_recherches.vider()
+        return self.index_semantique
+
+    def _actualiser_index_semantique(self):
+        """
+        Renvoie l'index sémantique à jour : les documents ajoutés y sont projetés avec la projection existante,
+        qui n'est recalculée que si les vecteurs TF-IDF ont été recalculés entièrement (nouveau vectoriseur).
+        """
+        self._actualiser_tfidf()
+        index = self.index_semantique
+        if index is None:
+            return self.construire_index_semantique()
+        etat, vectoriseur = self._etat_index_semantique
+        ajoutes = self._documents_ajoutes(etat) if vectoriseur is self.vectorizer else None
+        if ajoutes is None:
+            return self.construire_index_semantique(index.dimensions, index.nombre_groupes, index.groupes_sondes)
+        if ajoutes:
+            index.ajouter(self.tfidf_matrix[len(index):])
+            self._etat_index_semantique = (self._etat(), self.vectorizer)
+        return index
+
+    def construire_bm25(self, k1=1.2, b=0.75):
+        """
+        Construit le modèle BM25 (voir ModeleBM25) des documents du corpus, utilisé par
+        rechercher_documents(..., classement='bm25'). Le modèle est enregistré avec un corpus au format pickle ;
+        au format en colonnes, il n'est pas enregistré et sera reconstruit à la première recherche BM25.
+
+        Args:
+            k1 (float): La saturation de la fréquence des termes (de 1,2 à 2 habituellement).
+            b (float): L'influence de la longueur des documents, de 0 (aucune) à 1 (normalisation complète).
+
+        Returns:
+            ModeleBM25: Le modèle construit.
+        """
+        self.bm25 = ModeleBM25(k1, b).ajouter([str(doc.texte) if doc.texte is not None else ''
+                                                for doc in self.id2doc.values()])
+        self._etat_bm25 = self._etat()
+        self.cache_recherches.vider()
+        return self.bm25
+
+    def _actualiser_bm25(self):
+        """
+        Renvoie le modèle BM25 à jour : les documents ajoutés y sont ajoutés, et il est reconstruit
+        (avec les mêmes paramètres) après toute autre modification du corpus.
+        """
+        if self.bm25 is None:
+            return self.construire_bm25()
+        ajoutes = self._documents_ajoutes(self._etat_bm25)
+        if ajoutes is None:
+            return self.construire_bm25(self.bm25.k1, self.bm25.b)
+        if ajoutes:
+            self.bm25.ajouter([str(doc.texte) if doc.texte is not None else '' for doc in ajoutes])
+            self._etat_bm25 = self._etat()
+        return self.bm25
+
+    @staticmethod
+    def _verifier_classement(classement, semantique):
+        classement = 'semantique' if semantique else classement
+        if classement not in CLASSEMENTS:
+            raise ValueError(f"Classement inconnu : {classement!r} (attendu : {', '.join(CLASSEMENTS)})")
+        return classement
+
+    def rechercher_documents(self, requete, k=None, semantique=False, classement='tfidf'):
         """
         Recherche les documents pertinents basés sur une requête multi-mots.
 
         Args:
             requete (str): La requête de recherche entrée par l'utilisateur.
+            k (int): Si précisé, seuls les k documents les plus pertinents sont sélectionnés (sans trier
+                les scores de tous les documents) et renvoyés.
+            semantique (bool): Équivaut à classement='semantique'.
+            classement (str): Le score des documents (voir CLASSEMENTS) : 'tfidf' (similarité cosinus des
+                vecteurs TF-IDF), 'bm25' (modèle BM25, construit au besoin, voir construire_bm25) ou 'semantique'
+                (similarité dans l'espace de l'index sémantique, construit au besoin, voir
+                construire_index_semantique ; k vaut alors 10 par défaut).
 
         Returns:
-            DataFrame: Un DataFrame contenant les documents triés par pertinence.
+            DataFrame: Un DataFrame contenant les documents triés par pertinence, indexé par leur position
+            dans le corpus.
+
+        Les résultats sont conservés dans cache_recherches, par requête normalisée (casse et espaces), classement,
+        k et version du corpus : une requête répétée sur un corpus inchangé n'est pas recalculée.
         """
-        # Vérifiez si les documents ont été vectorisés
-        if not hasattr(self, 'tfidf_matrix'):
-            self.vectoriser_documents()
+        classement = self._verifier_classement(classement, semantique)
+        if classement == 'semantique' and k is None:
+            k = 10
+        cle = (normaliser_requete(requete), classement, k, self.version, len(self.id2doc))
+        # une copie est renvoyée : le résultat conservé ne peut pas être modifié par l'appelant
+        return self.cache_recherches.obtenir(cle, lambda: self._rechercher_documents(requete, k, classement)).copy()
+
+    def _rechercher_documents(self, requete, k, classement):
+        if classement == 'bm25':
+            scores = self._actualiser_bm25().scores([requete])[0]
+            indices = meilleurs_indices(scores, len(scores) if k is None else k)
+            titres = list(self.id2doc)
+            return pd.DataFrame({'Document': [titres[i] for i in indices], 'Score': scores[indices]}, index=indices)
+
+        if classement == 'semantique':
+            index = self._actualiser_index_semantique()
+            indices, scores = index.rechercher(self.vectorizer.transform([requete]), k)
+            trouves = indices[0] >= 0
+            titres = list(self.id2doc)
+            return pd.DataFrame({'Document': [titres[i] for i in indices[0][trouves]], 'Score': scores[0][trouves]},
+                                index=indices[0][trouves])
+
+        self._actualiser_tfidf()
 
         # Nettoyer et vectoriser la requête
         requete_vectorisee = self.vectorizer.transform([requete])
 
+        if k is not None:
+            # les vecteurs TF-IDF étant normalisés, la similarité cosinus est un simple produit scalaire
+            scores = (requete_vectorisee @ self._matrice_termes_documents()).toarray().ravel()
+            indices = meilleurs_indices(scores, k)
+            titres = list(self.id2doc)
+            return pd.DataFrame({'Document': [titres[i] for i in indices], 'Score': scores[indices]}, index=indices)
+
         # Calculer la similarité cosinus
         cos_similarities = cosine_similarity(requete_vectorisee, self.tfidf_matrix)
 
@@ -537,6 +1521,64 @@ class Corpus:
 
         return resultats_ordonnes
 
+    def rechercher_documents_par_lot(self, requetes, k=10, taille_bloc=4_000_000, semantique=False,
+                                     classement='tfidf'):
+        """
+        Recherche les k documents les plus pertinents pour chacune d'une liste de requêtes.
+
+        Toutes les requêtes sont vectorisées ensemble, et leurs scores sont obtenus par un produit
+        de matrices creuses, par blocs de requêtes dont les scores occupent au plus 'taille_bloc' valeurs.
+
+        Args:
+            requetes (list): Les requêtes.
+            k (int): Le nombre de documents à renvoyer par requête.
+            taille_bloc (int): Le nombre maximal de scores (requêtes × documents) calculés à la fois.
+            semantique (bool): Équivaut à classement='semantique'.
+            classement (str): Le score des documents : 'tfidf', 'bm25' ou 'semantique' (voir rechercher_documents).
+
+        Returns:
+            DataFrame: Une ligne par requête et par document retenu, avec les colonnes 'Requête', 'Rang'
+            (à partir de 1), 'Indice' (la position du document dans le corpus), 'Document' et 'Score'.
+        """
+        classement = self._verifier_classement(classement, semantique)
+        requetes = list(requetes)
+        requetes_par_bloc = max(taille_bloc // max(len(self.id2doc), 1), 1)
+        if classement == 'bm25':
+            modele = self._actualiser_bm25()
+        elif classement == 'semantique':
+            index = self._actualiser_index_semantique()
+        else:
+            self._actualiser_tfidf()
+            matrice_transposee = self._matrice_termes_documents()
+
+        indices, scores = [], []
+        for debut in range(0, len(requetes), requetes_par_bloc):
+            bloc = requetes[debut:debut + requetes_par_bloc]
+            if classement == 'semantique':
+                indices_bloc, scores_bloc = index.rechercher(self.vectorizer.transform(bloc), k)
+                indices.append(indices_bloc)
+                scores.append(scores_bloc)
+                continue
+            if classement == 'bm25':
+                scores_bloc = modele.scores(bloc)
+            else:
+                scores_bloc = (self.vectorizer.transform(bloc) @ matrice_transposee).toarray()
+            indices_bloc = meilleurs_indices(scores_bloc, k)
+            indices.append(indices_bloc)
+            scores.append(np.take_along_axis(scores_bloc, indices_bloc, axis=1))
+        k = indices[0].shape[1] if indices else 0
+        indices = np.concatenate(indices).ravel() if indices else np.array([], dtype=np.int64)
+        scores = np.concatenate(scores).ravel() if scores else np.array([], dtype=np.float64)
+        trouves = indices >= 0  # la recherche sémantique approchée peut trouver moins de k documents
+        titres = list(self.id2doc)
+        return pd.DataFrame({
+            'Requête': np.repeat(np.array(requetes, dtype=object), k)[trouves],
+            'Rang': np.tile(np.arange(1, k + 1), len(requetes))[trouves],
+            'Indice': indices[trouves],
+            'Document': [titres[i] for i in indices[trouves]],
+            'Score': scores[trouves],
+        })
+
     def vision_d_ensemble(self, max_words = 200, min_word_length = 0, background_color = 'pink' ):
         """
         Présentation générale du corpus
@@ -549,7 +1591,7 @@ class Corpus:
         print(f"Le Corpus totalise  {self.nombre_mots_uniques()} mots uniques.")
         print("Voici un nuage représentant Les mots par leur fréquence d'apparition dans le corpus")
         # Concaténer tous les textes du corpus
-        full_text = ' '.join(str(doc.texte) for doc in self.id2doc.values() if str(doc.texte) != 'nan')
+        full_text = ' '.join(str(doc.texte) for doc in self.id2doc.values() if _valeur_textuelle(doc.texte) is not None)
 
         # Générer le nuage de mots
         wordcloud = WordCloud(width=800, height=400, background_color= background_color, max_words=max_words, min_word_length = min_word_length).generate(full_text)
@@ -560,33 +1602,134 @@ class Corpus:
         plt.axis('off')
         plt.show()
 
-    def copier_et_filtrer_avant_date(self, date_limite):
-        # Créer une copie profonde du corpus
-        copie_corpus = copy.deepcopy(self)
+    @staticmethod
+    def _auteurs_des_documents(documents):
+        """
+        Renvoie les auteurs de documents (dictionnaire nom -> Author), leur production limitée à ces documents.
+        """
+        auteurs = {}
+        for doc in documents:
+            if doc.auteur not in auteurs:
+                auteurs[doc.auteur] = Author(doc.auteur)
+            auteurs[doc.auteur].add(doc)
+        return auteurs
+
+    def _dates_triees(self):
+        """
+        Renvoie l'index des dates du corpus : les dates des documents dans l'ordre croissant, les positions
+        (dans id2doc) des documents correspondants, et la liste des documents dans l'ordre de id2doc.
+        L'index est reconstruit après toute modification du corpus.
+        """
+        if self._index_dates is None or self._documents_ajoutes(self._index_dates[0]) != []:
+            documents = list(self.id2doc.values())
+            dates = [doc.date for doc in documents]
+            positions = sorted(range(len(dates)), key=dates.__getitem__)
+            self._index_dates = (self._etat(), [dates[i] for i in positions], np.array(positions, dtype=np.int64),
+                                 documents)
+        return self._index_dates[1:]
+
+    def vue_par_dates(self, debut=None, fin=None):
+        """
+        Renvoie une vue (voir CorpusView) des documents datés de 'debut' (inclus) à 'fin' (exclue).
 
-        # Filtrer les documents pour ne garder que ceux avant la date limite
-        documents_filtrés = {titre: doc for titre, doc in copie_corpus.id2doc.items() if doc.date < date_limite}
-        copie_corpus.id2doc = documents_filtrés
+        Les documents sont trouvés par recherche dichotomique dans l'index des dates (voir _dates_triees),
+        sans parcourir le corpus ; la vue partage les documents du corpus, sans les copier.
 
-        # Ajuster les attributs de la copie
-        copie_corpus.ndoc = len(documents_filtrés)
-        copie_corpus.naut = len({doc.auteur for doc in documents_filtrés.values()})
-        copie_corpus.texte_concatene = None  # Reset et sera recalculé si nécessaire
+        Args:
+            debut (date): La première date retenue, aucune limite si None.
+            fin (date): La date suivant la dernière date retenue, aucune limite si None.
 
-        return copie_corpus
+        Returns:
+            CorpusView: La vue, dont les documents sont dans l'ordre de id2doc.
+        """
+        dates, positions, documents = self._dates_triees()
+        gauche = 0 if debut is None else bisect_left(dates, debut)
+        droite = len(dates) if fin is None else max(bisect_left(dates, fin), gauche)
+        return CorpusView(self, [documents[i] for i in np.sort(positions[gauche:droite]).tolist()])
+
+    def vue_avant_date(self, date_limite):
+        """
+        Renvoie une vue des documents antérieurs à la date limite (voir vue_par_dates).
+        """
+        return self.vue_par_dates(fin=date_limite)
+
+    def vue_apres_date(self, date_limite):
+        """
+        Renvoie une vue des documents datés de la date limite ou d'après (voir vue_par_dates).
+        """
+        return self.vue_par_dates(debut=date_limite)
+
+    def copier_et_filtrer_avant_date(self, date_limite):
+        # Copie indépendante des seuls documents antérieurs à la date limite
+        return self.vue_avant_date(date_limite).materialiser()
 
     def copier_et_filtrer_apres_date(self, date_limite):
-        # Créer une copie profonde du corpus
-        copie_corpus = copy.deepcopy(self)
+        # Copie indépendante des seuls documents datés de la date limite ou d'après
+        return self.vue_apres_date(date_limite).materialiser()
+
+
+########################################################################################################################
+class CorpusView(Corpus):
+    """
+    Classe représentant une vue d'une partie des documents d'un corpus (par exemple une période, voir
+    Corpus.vue_par_dates).
+
+    La vue partage les documents du corpus : elle ne copie ni leurs textes, ni leurs annotations, et offre
+    les mêmes méthodes de lecture qu'un corpus (recherche, concordancier, fréquences, co-occurrences, ...), dont
+    les structures dérivées sont calculées sur ses seuls documents. Ses documents sont ceux du corpus lors de
+    sa création ; une modification d'un texte est signalée au corpus, et la vue suit la version de celui-ci :
+    ses structures dérivées sont alors recalculées.
+    Une vue est en lecture seule ; materialiser en fait un corpus indépendant, qui peut être modifié. Une vue
+    copiée ou enregistrée est matérialisée.
+    """
+
+    def __init__(self, parent, documents):
+        self._parent = parent
+        self._version_parent = parent.version
+        super().__init__(parent.nom, parent.mot_de_recherche)
+        self.id2doc = {doc.titre: doc for doc in documents}
+        self.authors = self._auteurs_des_documents(self.id2doc.values())
+        self.ndoc = len(self.id2doc)
+        self.naut = len(self.authors)
+
+    @property
+    def version(self):
+        # toute modification du corpus (un texte partagé a pu changer) est une modification de la vue
+        if self._parent.version != self._version_parent:
+            self._version_parent = self._parent.version
+            self._version_propre += 1
+            self._version_reconstruction = self._version_propre
+        return self._version_propre
+
+    @version.setter
+    def version(self, version):
+        self._version_propre = version
+
+    def __repr__(self):
+        return f"Vue du corpus '{self.nom}' contenant {self.ndoc} documents et {self.naut} auteurs."
 
-        # Filtrer les documents pour ne garder que ceux après la date limite
-        documents_filtrés = {titre: doc for titre, doc in copie_corpus.id2doc.items() if doc.date >= date_limite}
-        copie_corpus.id2doc = documents_filtrés
+    def __deepcopy__(self, memo):
+        return self.materialiser()
 
-        # Ajuster les attributs de la copie
-        copie_corpus.ndoc = len(documents_filtrés)
-        copie_corpus.naut = len({doc.auteur for doc in documents_filtrés.values()})
-        copie_corpus.texte_concatene = None  # Reset et sera recalculé si nécessaire
+    def __reduce_ex__(self, protocole):
+        corpus = self.materialiser()
+        return object.__new__, (Corpus,), corpus.__getstate__()
 
-        return copie_corpus
+    def add_document(self, *args, **kwargs):
+        raise TypeError("Une vue de corpus est en lecture seule (voir CorpusView.materialiser)")
 
+    def materialiser(self):
+        """
+        Renvoie un corpus indépendant contenant une copie des documents de la vue.
+
+        Returns:
+            Corpus: Le corpus, que ses modifications n'affectent ni la vue ni le corpus d'origine.
+        """
+        corpus = Corpus(self.nom, self.mot_de_recherche)
+        corpus.id2doc = {titre: copy.deepcopy(doc) for titre, doc in self.id2doc.items()}
+        corpus.authors = self._auteurs_des_documents(corpus.id2doc.values())
+        corpus.ndoc = len(corpus.id2doc)
+        corpus.naut = len(corpus.authors)
+        corpus._enregistrer_documents(corpus.id2doc.values())
+        corpus._signaler_modification()
+        return corpus
@@ -0,0 +1,1009 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from nltk.corpus import stopwords
+from scipy import sparse
+from scipy.special import xlogy
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+MOTIF_NOMBRES = re.compile(r'\d+')
+MOTIF_PONCTUATION = re.compile(r'[^\w\s]')
+MOTIF_MOTS = re.compile(r'\w+')
+MOTIF_REQUETE = re.compile(r'"[^"]*"?|[()]|[^\s()"]+')
+MESURES_ASSOCIATION = ('pmi', 'llr')  # mesures proposées par MatriceCollocations.collocats
+
+
+@lru_cache(maxsize=None)
+def mots_vides(langue='english'):
+    """
+    Renvoie les mots vides (stopwords) NLTK d'une langue, lus une seule fois.
+
+    :param langue: La langue des mots vides.
+    :return: Un frozenset de mots vides.
+    """
+    return frozenset(stopwords.words(langue))
+
+
+def nettoyer_texte(texte, langue='english'):
+    """
+    Nettoie un texte : suppression des nombres, passage en minuscules, suppression de la ponctuation
+    et des mots vides.
+
+    :param texte: Le texte à nettoyer (None ou NaN donnent un texte vide).
+    :param langue: La langue des mots vides.
+    :return: Le texte nettoyé, ses mots séparés par une espace.
+    """
+    if texte is None or str(texte).lower() == 'nan':
+        return ''
+    texte = MOTIF_NOMBRES.sub('', texte).lower()
+    texte = MOTIF_PONCTUATION.sub('', texte)
+    vides = mots_vides(langue)
+    return ' '.join(mot for mot in texte.split() if mot not in vides)
+
+
+def nettoyer_textes(textes, langue='english', garder_nombres=False, longueur_min=1):
+    """
+    Nettoie une liste de textes en un seul traitement (voir NettoyeurTextes).
+
+    Avec les options par défaut, le résultat est identique à celui de nettoyer_texte appliqué à chaque texte.
+
+    :param textes: Les textes à nettoyer.
+    :param langue: La langue des mots vides.
+    :param garder_nombres: Si True, les chiffres ne sont pas supprimés.
+    :param longueur_min: La longueur minimale (en caractères) d'un mot conservé.
+    :return: La liste des textes nettoyés.
+    """
+    nettoyeur = NettoyeurTextes(langue, garder_nombres, longueur_min)
+    return [' '.join(nettoyeur.mots(texte)) for texte in textes]
+
+
+########################################################################################################################
+class NettoyeurTextes(dict):
+    """
+    Classe nettoyant des textes mot par mot, chaque mot distinct n'étant nettoyé qu'une fois.
+
+    Les traitements de nettoyer_texte (suppression des nombres, minuscules, suppression de la ponctuation)
+    ne modifient pas les espaces : ils peuvent être appliqués à chaque mot séparément. Or un corpus
+    répète sans cesse les mêmes mots : le nettoyeur se comporte comme un dictionnaire {mot brut: mot nettoyé}
+    rempli à la demande, et nettoyer un texte revient à consulter ce dictionnaire pour chacun de ses mots.
+    Un mot supprimé (mot vide, trop court, ou vidé par le nettoyage) est associé à la chaîne vide.
+    """
+
+    def __init__(self, langue='english', garder_nombres=False, longueur_min=1):
+        super().__init__()
+        self.vides = mots_vides(langue)
+        self.garder_nombres = garder_nombres
+        self.longueur_min = longueur_min
+
+    def __missing__(self, brut):
+        mot = brut if self.garder_nombres else MOTIF_NOMBRES.sub('', brut)
+        mot = MOTIF_PONCTUATION.sub('', mot.lower())
+        if mot in self.vides or len(mot) < max(self.longueur_min, 1):
+            mot = ''
+        self[brut] = mot
+        return mot
+
+    def mots(self, texte):
+        """
+        Renvoie les mots nettoyés d'un texte.
+
+        :param texte: Le texte à nettoyer (None ou NaN donnent une liste vide).
+        :return: La liste des mots conservés, dans l'ordre du texte.
+        """
+        if texte is None or (len(str(texte)) == 3 and str(texte).lower() == 'nan'):
+            return []
+        return [mot for mot in map(self.__getitem__, texte.split()) if mot]
+
+
+def meilleurs_indices(scores, k):
+    """
+    Renvoie les indices des k plus grands scores, par score décroissant, sans trier tous les scores :
+    une sélection partielle (argpartition) isole les k meilleurs, qui seuls sont triés.
+
+    :param scores: Un tableau numpy de scores, à une dimension, ou à deux dimensions (une ligne par requête).
+    :param k: Le nombre d'indices à renvoyer (tous les indices s'il y a moins de k scores).
+    :return: Un tableau d'indices, de même nombre de dimensions que scores (k indices par ligne).
+    """
+    lignes = np.atleast_2d(scores)
+    k = min(k, lignes.shape[1])
+    if k <= 0:
+        indices = np.empty((lignes.shape[0], 0), dtype=np.int64)
+    else:
+        indices = np.argpartition(-lignes, k - 1, axis=1)[:, :k]
+        ordre = np.argsort(-np.take_along_axis(lignes, indices, axis=1), axis=1, kind='stable')
+        indices = np.take_along_axis(indices, ordre, axis=1)
+    return indices if np.ndim(scores) == 2 else indices[0]
+
+
+########################################################################################################################
+class Vocabulaire:
+    """
+    Classe représentant un vocabulaire : la correspondance entre chaque terme et un identifiant entier.
+
+    Les identifiants sont attribués dans l'ordre d'apparition des termes et ne changent plus :
+    un texte nettoyé peut être conservé sous forme d'un tableau d'identifiants, bien plus compact
+    qu'une liste de chaînes. Un vocabulaire unique (VOCABULAIRE) est partagé par tous les corpus.
+    """
+
+    def __init__(self):
+        self.terme2id = {}
+        self.id2terme = []
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self.id2terme)
+
+    def identifiants(self, termes):
+        """
+        Renvoie les identifiants des termes, en ajoutant au vocabulaire ceux qu'il ne contient pas encore.
+
+        :param termes: Une liste de termes.
+        :return: Un tableau numpy (int32) d'identifiants, en lecture seule.
+        """
+        terme2id = self.terme2id
+        if any(terme not in terme2id for terme in termes):
+            with self._verrou:
+                for terme in termes:
+                    if terme not in terme2id:
+                        terme2id[terme] = len(self.id2terme)
+                        self.id2terme.append(terme)
+        ids = np.fromiter((terme2id[terme] for terme in termes), dtype=np.int32, count=len(termes))
+        ids.flags.writeable = False
+        return ids
+
+    def termes(self, ids):
+        """
+        Renvoie les termes correspondant à des identifiants.
+        """
+        id2terme = self.id2terme
+        return [id2terme[i] for i in ids]
+
+
+VOCABULAIRE = Vocabulaire()
+
+
+########################################################################################################################
+class MatriceDocumentsTermes:
+    """
+    Classe représentant la matrice creuse documents × termes d'un corpus.
+
+    La ligne i correspond au i-ème document (titres[i]), la colonne j au terme termes[j], et chaque
+    valeur non nulle au nombre d'occurrences du terme dans le document. Seules les valeurs non nulles
+    sont stockées (format CSR) : la mémoire dépend du nombre de mots des textes, et non du produit
+    du nombre de documents par la taille du vocabulaire.
+    """
+
+    def __init__(self, matrice, termes, titres):
+        self.matrice = matrice  # scipy.sparse.csr_matrix (int32)
+        self.termes = termes  # indice de colonne -> terme
+        self.terme2indice = {terme: indice for indice, terme in enumerate(termes)}
+        self.titres = titres  # indice de ligne -> titre du document
+
+    @property
+    def shape(self):
+        return self.matrice.shape
+
+    @classmethod
+    def depuis_jetons(cls, titres, jetons, vocabulaire=VOCABULAIRE):
+        """
+        Construit la matrice en un seul passage sur les jetons des documents.
+
+        :param titres: Les titres des documents, dans l'ordre des lignes.
+        :param jetons: Les tableaux d'identifiants (voir Vocabulaire) des documents, dans le même ordre.
+        :param vocabulaire: Le vocabulaire auquel se rapportent les identifiants.
+        :return: Une instance de MatriceDocumentsTermes, dont les termes sont ceux présents dans le corpus.
+        """
+        longueurs = np.fromiter((len(ids) for ids in jetons), dtype=np.int64, count=len(jetons))
+        tous = np.concatenate(jetons) if len(jetons) else np.array([], dtype=np.int32)
+        # identifiants globaux -> colonnes consécutives, dans l'ordre des identifiants
+        ids_presents, colonnes = np.unique(tous, return_inverse=True)
+        lignes = np.repeat(np.arange(len(jetons)), longueurs)
+        matrice = sparse.csr_matrix((np.ones(len(tous), dtype=np.int32), (lignes, colonnes.ravel())),
+                                    shape=(len(jetons), len(ids_presents)), dtype=np.int32)
+        matrice.sum_duplicates()
+        return cls(matrice, vocabulaire.termes(ids_presents), list(titres))
+
+    def frequences_totales(self):
+        """
+        Renvoie le nombre d'occurrences de chaque terme dans l'ensemble du corpus.
+
+        :return: Une Series indexée par les termes.
+        """
+        return pd.Series(np.asarray(self.matrice.sum(axis=0)).ravel(), index=self.termes, dtype='int64')
+
+    def colonnes(self, mots):
+        """
+        Renvoie la sous-matrice des colonnes de certains mots, dans l'ordre donné.
+        Un mot absent du corpus donne une colonne de zéros.
+
+        :param mots: Une liste de mots.
+        :return: Une matrice CSR de len(mots) colonnes.
+        """
+        indices = np.array([self.terme2indice.get(mot, -1) for mot in mots], dtype=np.int64)
+        presents = indices >= 0
+        # matrice de sélection : la colonne k reçoit la colonne indices[k] de la matrice, si elle existe
+        selection = sparse.csr_matrix((np.ones(presents.sum(), dtype=np.int32),
+                                       (indices[presents], np.flatnonzero(presents))),
+                                      shape=(self.matrice.shape[1], len(mots)), dtype=np.int32)
+        return (self.matrice @ selection).tocsr()
+
+    def vers_dataframe(self, mots=None, index=None):
+        """
+        Renvoie la matrice sous forme d'un DataFrame dense (documents × mots).
+
+        Réservé aux petits corpus : le DataFrame occupe une cellule par document et par mot.
+
+        :param mots: Les colonnes du DataFrame, tous les termes par défaut.
+        :param index: L'index du DataFrame, les titres des documents par défaut.
+        :return: Un DataFrame d'entiers.
+        """
+        mots = self.termes if mots is None else list(mots)
+        index = self.titres if index is None else index
+        return pd.DataFrame(self.colonnes(mots).toarray().astype('int64'), index=index, columns=mots)
+
+
+def termes_requete(texte):
+    """
+    Découpe un texte en termes de la même façon que l'index inversé : mots (voir MOTIF_MOTS) en minuscules.
+    """
+    return [mot.lower() for mot in MOTIF_MOTS.findall(texte)]
+
+
+# Occurrences d'une requête, triées par document puis par position. 'positions' compte les mots depuis le début
+# du texte ; 'debuts' et 'fins' sont les indices des caractères de l'occurrence dans le texte (texte[debut:fin]).
+Occurrences = namedtuple('Occurrences', ['documents', 'positions', 'debuts', 'fins'])
+
+# Résultat d'une requête : les documents qui la satisfont et les occurrences de ses termes dans ces documents.
+# Un document peut satisfaire une requête sans y avoir d'occurrence (requête 'NOT terme').
+ResultatRecherche = namedtuple('ResultatRecherche', ['documents', 'occurrences'])
+
+
+########################################################################################################################
+class IndexInverse:
+    """
+    Classe représentant l'index inversé positionnel d'un ensemble de textes.
+
+    Les textes sont découpés en mots (voir termes_requete), sans autre nettoyage : les mots vides et les nombres
+    restent interrogeables. Pour chaque terme, l'index conserve toutes ses occurrences (document, position du mot,
+    début et fin dans le texte), rangées de façon contiguë : les occurrences du terme d'indice i sont les éléments
+    pointeurs[i]:pointeurs[i + 1] des tableaux d'occurrences. Les termes étant triés, ceux d'un même préfixe
+    forment eux aussi une plage contiguë.
+
+    Une requête (voir rechercher) combine :
+        - des termes : data
+        - des préfixes : scien*
+        - des expressions exactes : "machine learning"
+        - les opérateurs AND, OR, NOT et des parenthèses : (data OR donnees) AND NOT "big data"
+    Deux éléments juxtaposés sans opérateur sont combinés par AND.
+    """
+
+    def __init__(self, titres, termes, pointeurs, occurrences):
+        self.titres = titres  # indice de document -> titre
+        self.termes = termes  # liste triée des termes
+        self.terme2indice = {terme: indice for indice, terme in enumerate(termes)}
+        self.pointeurs = pointeurs  # indice de terme -> début de ses occurrences
+        self.occurrences = occurrences  # Occurrences, triées par terme puis par document et position
+        # nombre de positions d'un document, pour combiner document et position en une seule clé entière
+        self._largeur = int(occurrences.positions.max()) + 2 if len(occurrences.positions) else 1
+
+    def __len__(self):
+        return len(self.titres)
+
+    @property
+    def nombre_mots(self):
+        return len(self.occurrences.documents)
+
+    @classmethod
+    def depuis_textes(cls, titres, textes):
+        """
+        Construit l'index en un seul passage sur les textes.
+
+        :param titres: Les titres des documents.
+        :param textes: Les textes des documents, dans le même ordre (None pour un document sans texte).
+        :return: Une instance de IndexInverse.
+        """
+        brut2id = {}  # mot tel qu'il apparaît -> identifiant provisoire
+        ids, debuts, fins = [], [], []
+        longueurs = np.zeros(len(titres), dtype=np.int64)
+        for i, texte in enumerate(textes):
+            if texte is None:
+                continue
+            correspondances = list(MOTIF_MOTS.finditer(texte))
+            longueurs[i] = len(correspondances)
+            ids.extend([brut2id.setdefault(m.group(), len(brut2id)) for m in correspondances])
+            debuts.extend([m.start() for m in correspondances])
+            fins.extend([m.end() for m in correspondances])
+
+        # les mots sont mis en minuscules une fois par forme distincte, puis numérotés dans l'ordre alphabétique
+        minuscules = np.array([brut.lower() for brut in brut2id], dtype=object)
+        termes, brut2terme = np.unique(minuscules, return_inverse=True)
+        ids_termes = brut2terme.ravel()[np.array(ids, dtype=np.int64)] if ids else np.array([], dtype=np.int64)
+
+        documents = np.repeat(np.arange(len(titres), dtype=np.int32), longueurs)
+        positions = np.arange(len(ids), dtype=np.int64) - np.repeat(np.cumsum(longueurs) - longueurs, longueurs)
+        ordre = np.argsort(ids_termes, kind='stable')  # tri stable : l'ordre document, position est conservé
+        occurrences = Occurrences(documents[ordre], positions[ordre].astype(np.int32),
+                                  np.array(debuts, dtype=np.int32)[ordre], np.array(fins, dtype=np.int32)[ordre])
+        pointeurs = np.concatenate(([0], np.cumsum(np.bincount(ids_termes, minlength=len(termes)))))
+        return cls(list(titres), termes.tolist(), pointeurs, occurrences)
+
+    @classmethod
+    def fusionner(cls, index):
+        """
+        Réunit plusieurs index en un seul, les documents de chacun étant placés à la suite de ceux du précédent.
+
+        :param index: Une liste d'instances de IndexInverse.
+        :return: Une instance de IndexInverse.
+        """
+        termes, termes_fusionnes = np.unique(np.array([terme for i in index for terme in i.termes], dtype=object),
+                                             return_inverse=True)
+        termes_fusionnes = termes_fusionnes.ravel()
+        ids_termes, champs, decalage_termes, decalage_documents = [], [[], [], [], []], 0, 0
+        for i in index:
+            # identifiant, dans l'index fusionné, du terme de chaque occurrence de cet index
+            ids_locaux = np.repeat(np.arange(len(i.termes)), np.diff(i.pointeurs))
+            ids_termes.append(termes_fusionnes[decalage_termes + ids_locaux])
+            champs[0].append(i.occurrences.documents + decalage_documents)
+            for champ, tableau in zip(champs[1:], i.occurrences[1:]):
+                champ.append(tableau)
+            decalage_termes += len(i.termes)
+            decalage_documents += len(i)
+        ids_termes = np.concatenate(ids_termes) if ids_termes else np.array([], dtype=np.int64)
+        # tri stable par terme : les occurrences d'un terme restent dans l'ordre des documents puis des positions
+        ordre = np.argsort(ids_termes, kind='stable')
+        occurrences = Occurrences(*(np.concatenate(champ)[ordre] if champ else np.array([], dtype=np.int32)
+                                    for champ in champs))
+        pointeurs = np.concatenate(([0], np.cumsum(np.bincount(ids_termes, minlength=len(termes)))))
+        return cls([titre for i in index for titre in i.titres], termes.tolist(), pointeurs, occurrences)
+
+    def _tranche(self, debut, fin):
+        return Occurrences(*(tableau[debut:fin] for tableau in self.occurrences))
+
+    def _vide(self):
+        return self._tranche(0, 0)
+
+    def _cles(self, occurrences):
+        return occurrences.documents.astype(np.int64) * self._largeur + occurrences.positions
+
+    def occurrences_terme(self, terme):
+        """
+        Renvoie les occurrences d'un terme (en minuscules).
+        """
+        indice = self.terme2indice.get(terme)
+        if indice is None:
+            return self._vide()
+        return self._tranche(self.pointeurs[indice], self.pointeurs[indice + 1])
+
+    def occurrences_prefixe(self, prefixe):
+        """
+        Renvoie les occurrences des termes commençant par un préfixe (en minuscules).
+        """
+        if not prefixe:
+            return self._vide()
+        premier = bisect_left(self.termes, prefixe)
+        # les termes de ce préfixe précèdent tous le « successeur » du préfixe
+        successeur = prefixe[:-1] + chr(ord(prefixe[-1]) + 1) if ord(prefixe[-1]) < 0x10FFFF else None
+        dernier = bisect_left(self.termes, successeur) if successeur is not None else len(self.termes)
+        tranche = self._tranche(self.pointeurs[premier], self.pointeurs[dernier])
+        ordre = np.lexsort((tranche.positions, tranche.documents))
+        return Occurrences(*(tableau[ordre] for tableau in tranche))
+
+    def occurrences_expression(self, elements):
+        """
+        Renvoie les occurrences d'une suite de termes consécutifs.
+
+        :param elements: Les occurrences (voir occurrences_terme et occurrences_prefixe) de chaque terme
+            de l'expression, dans l'ordre.
+        :return: Les occurrences de l'expression, du début de son premier terme à la fin du dernier.
+        """
+        premier = elements[0]
+        if len(elements) == 1:
+            return premier
+        cles = self._cles(premier)
+        garder = np.ones(len(cles), dtype=bool)
+        for decalage, element in enumerate(elements[1:], start=1):
+            if not len(element.documents):
+                return self._vide()
+            # le k-ième terme doit se trouver k positions après le premier, dans le même document
+            cles_element = self._cles(element)
+            indices = np.minimum(np.searchsorted(cles_element, cles + decalage), len(cles_element) - 1)
+            garder &= cles_element[indices] == cles + decalage
+        return Occurrences(premier.documents[garder], premier.positions[garder],
+                           premier.debuts[garder], element.fins[indices[garder]])
+
+    def _occurrences_mots(self, mots):
+        """
+        Renvoie les occurrences d'une suite de mots de la requête. Un mot terminé par '*' est un préfixe,
+        un mot coupé par la ponctuation (par exemple 'data-science') compte pour plusieurs termes consécutifs.
+        """
+        elements = []
+        for mot in mots:
+            prefixe = mot.endswith('*')
+            termes = termes_requete(mot)
+            elements.extend(self.occurrences_terme(terme) for terme in termes[:-1])
+            if termes:
+                elements.append(self.occurrences_prefixe(termes[-1]) if prefixe else self.occurrences_terme(termes[-1]))
+        return self.occurrences_expression(elements) if elements else self._vide()
+
+    def _fusionner(self, gauche, droite, documents):
+        """
+        Réunit deux ensembles d'occurrences, limités aux documents donnés (masque booléen), en supprimant les doublons.
+        """
+        occurrences = Occurrences(*(np.concatenate(tableaux) for tableaux in zip(gauche, droite)))
+        ordre = np.lexsort((occurrences.fins, occurrences.positions, occurrences.documents))
+        occurrences = Occurrences(*(tableau[ordre] for tableau in occurrences))
+        garder = documents[occurrences.documents]
+        garder[1:] &= ((np.diff(occurrences.documents) != 0) | (np.diff(occurrences.positions) != 0)
+                       | (np.diff(occurrences.fins) != 0))
+        return Occurrences(*(tableau[garder] for tableau in occurrences))
+
+    def rechercher(self, requete):
+        """
+        Recherche les documents satisfaisant une requête (voir la description de la classe).
+
+        :param requete: La requête, par exemple '"neural network*" AND (image OR vision) NOT survey'.
+        :return: Un ResultatRecherche : les indices des documents satisfaisant la requête, et les occurrences
+            de ses termes (hors termes exclus par NOT) dans ces documents.
+        """
+        jetons = MOTIF_REQUETE.findall(requete)
+        (documents, occurrences), suivant = self._analyser_ou(jetons, 0)
+        if suivant < len(jetons):
+            raise ValueError(f"Requête invalide : '{jetons[suivant]}' inattendu dans '{requete}'")
+        return ResultatRecherche(np.flatnonzero(documents), occurrences)
+
+    # Analyse de la requête par descente récursive ; priorités décroissantes : NOT, AND, OR.
+    # Chaque méthode renvoie le résultat de la partie analysée, sous forme d'un masque booléen des documents
+    # et de leurs occurrences, et l'indice du jeton suivant.
+
+    def _analyser_ou(self, jetons, i):
+        gauche, i = self._analyser_et(jetons, i)
+        while i < len(jetons) and jetons[i] == 'OR':
+            droite, i = self._analyser_et(jetons, i + 1)
+            documents = gauche[0] | droite[0]
+            gauche = documents, self._fusionner(gauche[1], droite[1], documents)
+        return gauche, i
+
+    def _analyser_et(self, jetons, i):
+        gauche, i = self._analyser_non(jetons, i)
+        while i < len(jetons) and jetons[i] not in ('OR', ')'):
+            if jetons[i] == 'AND':
+                i += 1
+            droite, i = self._analyser_non(jetons, i)
+            documents = gauche[0] & droite[0]
+            gauche = documents, self._fusionner(gauche[1], droite[1], documents)
+        return gauche, i
+
+    def _analyser_non(self, jetons, i):
+        if i >= len(jetons):
+            raise ValueError("Requête invalide : elle se termine par un opérateur ou est vide")
+        jeton = jetons[i]
+        if jeton == 'NOT':
+            (exclus, _), i = self._analyser_non(jetons, i + 1)
+            return (~exclus, self._vide()), i
+        if jeton == '(':
+            resultat, i = self._analyser_ou(jetons, i + 1)
+            if i >= len(jetons) or jetons[i] != ')':
+                raise ValueError("Requête invalide : parenthèse non fermée")
+            return resultat, i + 1
+        if jeton in (')', 'AND', 'OR'):
+            raise ValueError(f"Requête invalide : '{jeton}' inattendu")
+        occurrences = self._occurrences_mots(jeton.strip('"').split())
+        documents = np.zeros(len(self.titres), dtype=bool)
+        documents[occurrences.documents] = True
+        return (documents, occurrences), i + 1
+
+
+########################################################################################################################
+class IndexSegmente:
+    """
+    Classe représentant un index inversé auquel des documents peuvent être ajoutés sans le reconstruire.
+
+    Chaque ajout de documents crée un petit index (un segment, voir IndexInverse) couvrant ces seuls documents ;
+    une requête est évaluée sur chaque segment, et les résultats sont mis bout à bout. Pour que le nombre
+    de segments reste faible, le dernier segment est fusionné avec le précédent tant que celui-ci n'est pas
+    nettement plus grand : chaque mot n'est ainsi refusionné qu'un nombre logarithmique de fois.
+    """
+
+    FACTEUR_FUSION = 2  # un segment est fusionné avec le suivant s'il n'est pas FACTEUR_FUSION fois plus grand
+
+    def __init__(self):
+        self.segments = []
+        self.titres = []  # indice de document -> titre, pour l'ensemble des segments
+
+    def __len__(self):
+        return len(self.titres)
+
+    @property
+    def nombre_mots(self):
+        return sum(segment.nombre_mots for segment in self.segments)
+
+    def ajouter(self, titres, textes):
+        """
+        Ajoute des documents à la suite de ceux déjà indexés.
+
+        :param titres: Les titres des documents.
+        :param textes: Les textes des documents, dans le même ordre (None pour un document sans texte).
+        """
+        self.segments.append(IndexInverse.depuis_textes(titres, textes))
+        self.titres.extend(titres)
+        segments = self.segments
+        while len(segments) > 1 and segments[-2].nombre_mots <= self.FACTEUR_FUSION * segments[-1].nombre_mots:
+            segments[-2:] = [IndexInverse.fusionner(segments[-2:])]
+
+    def rechercher(self, requete):
+        """
+        Recherche les documents satisfaisant une requête (voir IndexInverse.rechercher).
+        """
+        documents, occurrences, decalage = [], [], 0
+        for segment in self.segments or [IndexInverse.depuis_textes([], [])]:
+            resultat = segment.rechercher(requete)
+            documents.append(resultat.documents + decalage)
+            occurrences.append(resultat.occurrences._replace(documents=resultat.occurrences.documents + decalage))
+            decalage += len(segment)
+        return ResultatRecherche(np.concatenate(documents),
+                                 Occurrences(*(np.concatenate(champ) for champ in zip(*occurrences))))
+
+
+########################################################################################################################
+class ModeleTfidfIncremental:
+    """
+    Classe représentant un modèle TF-IDF auquel des documents peuvent être ajoutés sans le réajuster.
+
+    Un TfidfVectorizer doit connaître tout le vocabulaire avant de vectoriser : chaque ajout impose de tout
+    revectoriser. Ici, les termes sont associés à des colonnes par hachage (HashingVectorizer, même découpage
+    en mots que TfidfVectorizer), et le nombre de documents contenant chaque colonne est tenu à jour :
+    ajouter K documents ne coûte que leur vectorisation, et les poids IDF se recalculent à partir des compteurs.
+
+    Les documents sont pondérés par l'IDF connu lors de leur ajout. Lorsque le nombre de documents a augmenté
+    de plus de 'tolerance' (en proportion) depuis la dernière pondération complète, tous les documents
+    sont à nouveau pondérés à partir de leurs occurrences conservées, sans revectoriser les textes.
+    Avec tolerance=0, les poids sont toujours ceux d'un TfidfVectorizer ajusté sur tous les documents
+    (aux collisions du hachage près).
+    """
+
+    def __init__(self, nombre_colonnes=2 ** 20, tolerance=0.1):
+        self.hachage = HashingVectorizer(n_features=nombre_colonnes, alternate_sign=False, norm=None)
+        self.tolerance = tolerance
+        self.nombre_documents = 0
+        self.frequences_documents = np.zeros(nombre_colonnes, dtype=np.int64)  # colonne -> nombre de documents
+        self._comptes = []  # blocs des occurrences brutes (CSR), dans l'ordre des documents
+        self._ponderes = []  # blocs des vecteurs TF-IDF correspondants, normalisés
+        self._nombre_documents_pondere = 0  # nombre de documents lors de la dernière pondération complète
+
+    def idf(self):
+        """
+        Renvoie les poids IDF de chaque colonne, calculés comme TfidfVectorizer (smooth_idf=True).
+        """
+        return np.log((1 + self.nombre_documents) / (1 + self.frequences_documents)) + 1
+
+    def _ponderer(self, comptes, idf):
+        ponderes = comptes.astype(np.float64)
+        ponderes.data *= idf[ponderes.indices]
+        return normalize(ponderes, copy=False)
+
+    def ajouter(self, textes):
+        """
+        Ajoute des documents au modèle.
+
+        :param textes: Les textes des documents.
+        """
+        comptes = self.hachage.transform(textes).astype(np.int32)
+        self.frequences_documents += np.bincount(comptes.indices, minlength=len(self.frequences_documents))
+        self.nombre_documents += comptes.shape[0]
+        self._comptes.append(comptes)
+
+        if self.nombre_documents > (1 + self.tolerance) * self._nombre_documents_pondere:
+            self.reponderer()
+        else:
+            self._ponderes.append(self._ponderer(comptes, self.idf()))
+
+    def reponderer(self):
+        """
+        Pondère à nouveau tous les documents avec les poids IDF actuels.
+        """
+        comptes = sparse.vstack(self._comptes, format='csr') if self._comptes else self.hachage.transform([])
+        self._comptes = [comptes]
+        self._ponderes = [self._ponderer(comptes, self.idf())]
+        self._nombre_documents_pondere = self.nombre_documents
+
+    def matrice(self):
+        """
+        Renvoie la matrice TF-IDF (documents × colonnes) des documents ajoutés, dans l'ordre d'ajout.
+        """
+        if len(self._ponderes) > 1:
+            self._ponderes = [sparse.vstack(self._ponderes, format='csr')]
+        return self._ponderes[0] if self._ponderes else self.hachage.transform([])
+
+    def transform(self, textes):
+        """
+        Renvoie les vecteurs TF-IDF de textes (par exemple une requête), comme TfidfVectorizer.transform.
+        """
+        return self._ponderer(self.hachage.transform(textes), self.idf())
+
+
+########################################################################################################################
+class IndexSemantique:
+    """
+    Classe représentant un index sémantique (analyse sémantique latente) de vecteurs TF-IDF.
+
+    Une décomposition en valeurs singulières tronquée projette chaque document dans un espace dense de faible
+    dimension, où des termes employés dans les mêmes contextes (synonymes) se rapprochent : une requête peut
+    y trouver des documents ne contenant aucun de ses mots. Le score d'un document est la similarité cosinus
+    entre sa projection et celle de la requête.
+
+    Avec 'nombre_groupes', les projections sont en outre regroupées par k-moyennes : une requête n'est alors
+    comparée qu'aux documents des 'groupes_sondes' groupes dont le centre lui est le plus proche (recherche
+    approchée, beaucoup plus rapide sur un grand corpus). Sans groupes, la recherche est exhaustive.
+    """
+
+    def __init__(self, dimensions=200, nombre_groupes=None, groupes_sondes=8, graine=0):
+        self.dimensions = dimensions
+        self.nombre_groupes = nombre_groupes
+        self.groupes_sondes = groupes_sondes
+        self.graine = graine
+        self.colonnes = None  # colonnes TF-IDF présentes dans les documents lors de l'ajustement
+        self._rangs = None  # colonne TF-IDF -> son rang dans colonnes, -1 si elle n'y figure pas
+        self.composantes = None  # colonnes × dimensions : la projection
+        self.vecteurs = None  # documents × dimensions, normalisés
+        self.centres = None  # groupes × dimensions
+        self.groupes = None  # document -> groupe
+        self._ordre = self._pointeurs = None  # documents rangés par groupe, et début de chaque groupe
+
+    def __len__(self):
+        return 0 if self.vecteurs is None else len(self.vecteurs)
+
+    def ajuster(self, matrice):
+        """
+        Calcule la projection à partir des vecteurs TF-IDF des documents, puis projette ces documents.
+
+        :param matrice: La matrice TF-IDF (documents × colonnes), au format CSR.
+        :return: L'index lui-même.
+        """
+        self.colonnes = np.unique(matrice.indices)
+        self._rangs = np.full(matrice.shape[1], -1, dtype=np.int64)
+        self._rangs[self.colonnes] = np.arange(len(self.colonnes))
+        reduite = self._reduire(matrice)
+        dimensions = max(1, min(self.dimensions, reduite.shape[0], reduite.shape[1] - 1))
+        svd = TruncatedSVD(n_components=dimensions, random_state=self.graine)
+        svd.fit(reduite)
+        self.composantes = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+        self.vecteurs = np.empty((0, dimensions), dtype=np.float32)
+        self.centres = self.groupes = None
+        vecteurs = self.projeter(matrice)
+        if self.nombre_groupes:
+            kmeans = MiniBatchKMeans(n_clusters=min(self.nombre_groupes, len(vecteurs)), random_state=self.graine,
+                                     n_init=3)
+            kmeans.fit(vecteurs)
+            self.centres = kmeans.cluster_centers_.astype(np.float32)
+            self.groupes = np.empty(0, dtype=np.int64)
+        self.ajouter(matrice, vecteurs)
+        return self
+
+    def tableaux(self):
+        """
+        Renvoie les paramètres et les tableaux de l'index, à enregistrer par exemple avec numpy.savez.
+
+        :return: Un dictionnaire de tableaux numpy, qui permet de reconstruire l'index (voir depuis_tableaux).
+        """
+        return {'parametres': np.array([self.dimensions, self.nombre_groupes or 0, self.groupes_sondes, self.graine]),
+                'largeur': np.array(len(self._rangs)), 'colonnes': self.colonnes, 'composantes': self.composantes,
+                'vecteurs': self.vecteurs,
+                'centres': np.empty((0, self.composantes.shape[1]), np.float32) if self.centres is None else self.centres,
+                'groupes': np.empty(0, np.int64) if self.groupes is None else self.groupes}
+
+    @classmethod
+    def depuis_tableaux(cls, tableaux):
+        """
+        Reconstruit un index à partir de ses tableaux (voir tableaux), sans recalculer la projection.
+
+        :param tableaux: Un dictionnaire (ou le résultat de numpy.load) des tableaux de l'index.
+        :return: L'index.
+        """
+        dimensions, nombre_groupes, groupes_sondes, graine = (int(v) for v in tableaux['parametres'])
+        index = cls(dimensions, nombre_groupes or None, groupes_sondes, graine)
+        index.colonnes = tableaux['colonnes']
+        index._rangs = np.full(int(tableaux['largeur']), -1, dtype=np.int64)
+        index._rangs[index.colonnes] = np.arange(len(index.colonnes))
+        index.composantes = tableaux['composantes']
+        index.vecteurs = tableaux['vecteurs']
+        if nombre_groupes:
+            index.centres = tableaux['centres']
+            index.groupes = tableaux['groupes']
+            index._ranger()
+        return index
+
+    def _reduire(self, matrice):
+        # restreint la matrice aux colonnes de l'ajustement, en ne parcourant que ses valeurs non nulles
+        rangs = self._rangs[matrice.indices]
+        garder = rangs >= 0
+        pointeurs = np.concatenate(([0], np.cumsum(garder)))[matrice.indptr]
+        return sparse.csr_matrix((matrice.data[garder], rangs[garder], pointeurs),
+                                 shape=(matrice.shape[0], len(self.colonnes)))
+
+    def projeter(self, matrice):
+        """
+        Renvoie les projections normalisées de vecteurs TF-IDF (documents ou requêtes).
+        """
+        vecteurs = np.asarray(self._reduire(matrice.tocsr()) @ self.composantes, dtype=np.float32)
+        return normalize(vecteurs, copy=False)
+
+    def ajouter(self, matrice, vecteurs=None):
+        """
+        Ajoute des documents à l'index avec la projection existante, sans la recalculer.
+
+        :param matrice: Les vecteurs TF-IDF des nouveaux documents (mêmes colonnes que lors de l'ajustement).
+        :param vecteurs: Leurs projections, si elles sont déjà calculées.
+        """
+        vecteurs = self.projeter(matrice) if vecteurs is None else vecteurs
+        self.vecteurs = np.vstack([self.vecteurs, vecteurs])
+        if self.centres is not None:
+            groupes = np.argmax(vecteurs @ self.centres.T, axis=1) if len(vecteurs) else np.empty(0, dtype=np.int64)
+            self.groupes = np.concatenate([self.groupes, groupes])
+            self._ranger()
+
+    def _ranger(self):
+        # documents rangés par groupe, et début de chaque groupe dans ce rangement
+        self._ordre = np.argsort(self.groupes, kind='stable')
+        self._pointeurs = np.concatenate(([0], np.cumsum(np.bincount(self.groupes, minlength=len(self.centres)))))
+
+    def rechercher(self, matrice, k):
+        """
+        Recherche les k documents les plus proches de chaque requête.
+
+        :param matrice: Les vecteurs TF-IDF des requêtes (une ligne par requête).
+        :param k: Le nombre de documents par requête.
+        :return: Deux tableaux (requêtes × k) : les indices des documents, par score décroissant, et leurs scores.
+            En recherche approchée, si les groupes sondés comptent moins de k documents, les places restantes
+            ont l'indice -1 et le score -inf.
+        """
+        requetes = self.projeter(matrice)
+        if self.centres is None:
+            scores = (self.vecteurs @ requetes.T).T
+            indices = meilleurs_indices(scores, k)
+            return indices, np.take_along_axis(scores, indices, axis=1)
+
+        groupes = meilleurs_indices(requetes @ self.centres.T, self.groupes_sondes)
+        k = min(k, len(self.vecteurs))
+        indices = np.full((len(requetes), k), -1, dtype=np.int64)
+        scores = np.full((len(requetes), k), -np.inf, dtype=np.float32)
+        for i, requete in enumerate(requetes):
+            candidats = np.concatenate([self._ordre[self._pointeurs[g]:self._pointeurs[g + 1]] for g in groupes[i]])
+            scores_candidats = self.vecteurs[candidats] @ requete
+            meilleurs = meilleurs_indices(scores_candidats, k)
+            indices[i, :len(meilleurs)] = candidats[meilleurs]
+            scores[i, :len(meilleurs)] = scores_candidats[meilleurs]
+        return indices, scores
+
+
+########################################################################################################################
+class ModeleBM25:
+    """
+    Classe représentant un modèle de classement BM25 (Okapi) des documents pour une requête.
+
+    Le score d'un document est la somme, sur les termes de la requête, de idf(terme) × tf × (k1 + 1) /
+    (tf + k1 × (1 - b + b × longueur / longueur moyenne)) : la fréquence d'un terme sature (k1), et elle est
+    rapportée à la longueur du document (b). Les documents très courts (posts Reddit sans texte) et très longs
+    (résumés arXiv) sont ainsi comparés plus équitablement qu'avec la similarité cosinus des vecteurs TF-IDF.
+
+    Les termes sont associés à des colonnes par hachage (même découpage en mots que TfidfVectorizer), et les
+    poids de chaque couple (terme, document) sont précalculés dans une matrice termes × documents : le score
+    d'une requête ne parcourt que les listes de documents de ses termes. Des documents peuvent être ajoutés :
+    seuls leurs textes sont vectorisés, et les poids sont recalculés à partir des occurrences conservées.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, nombre_colonnes=2 ** 20):
+        self.k1 = k1
+        self.b = b
+        self.hachage = HashingVectorizer(n_features=nombre_colonnes, alternate_sign=False, norm=None)
+        self.nombre_documents = 0
+        self.frequences_documents = np.zeros(nombre_colonnes, dtype=np.int64)  # colonne -> nombre de documents
+        self.longueurs = np.empty(0, dtype=np.float64)  # document -> nombre de mots
+        self._comptes = []  # blocs des occurrences brutes (CSR), dans l'ordre des documents
+        self._poids = None  # colonnes × documents (CSR), recalculée après chaque ajout
+
+    def __len__(self):
+        return self.nombre_documents
+
+    def __getstate__(self):
+        # les poids se recalculent à partir des occurrences : ils ne sont ni enregistrés ni copiés
+        etat = self.__dict__.copy()
+        etat['_poids'] = None
+        return etat
+
+    def idf(self):
+        """
+        Renvoie les poids IDF de chaque colonne : log(1 + (N - n + 0,5) / (n + 0,5)), toujours positifs.
+        """
+        return np.log1p((self.nombre_documents - self.frequences_documents + 0.5) / (self.frequences_documents + 0.5))
+
+    def ajouter(self, textes):
+        """
+        Ajoute des documents au modèle.
+
+        :param textes: Les textes des documents.
+        :return: Le modèle lui-même.
+        """
+        comptes = self.hachage.transform(textes).astype(np.int32)
+        self.frequences_documents += np.bincount(comptes.indices, minlength=len(self.frequences_documents))
+        self.nombre_documents += comptes.shape[0]
+        self.longueurs = np.concatenate([self.longueurs, np.asarray(comptes.sum(axis=1), dtype=np.float64).ravel()])
+        self._comptes.append(comptes)
+        self._poids = None
+        return self
+
+    def _matrice_poids(self):
+        if self._poids is None:
+            if len(self._comptes) != 1:
+                self._comptes = [sparse.vstack(self._comptes, format='csr') if self._comptes
+                                 else self.hachage.transform([]).astype(np.int32)]
+            poids = self._comptes[0].astype(np.float64)
+            longueur_moyenne = self.longueurs.mean() if self.nombre_documents and self.longueurs.any() else 1.0
+            normes = self.k1 * (1 - self.b + self.b * self.longueurs / longueur_moyenne)
+            tf = poids.data
+            poids.data = self.idf()[poids.indices] * tf * (self.k1 + 1) / (tf + np.repeat(normes, np.diff(poids.indptr)))
+            self._poids = poids.T.tocsr()
+        return self._poids
+
+    def scores(self, textes):
+        """
+        Renvoie les scores BM25 de tous les documents pour chaque requête.
+
+        :param textes: Les requêtes.
+        :return: Un tableau (requêtes × documents) ; un terme répété dans une requête compte autant de fois.
+        """
+        return (self.hachage.transform(textes) @ self._matrice_poids()).toarray()
+
+    def rechercher(self, textes, k):
+        """
+        Recherche les k documents de meilleur score pour chaque requête.
+
+        :param textes: Les requêtes.
+        :param k: Le nombre de documents par requête.
+        :return: Deux tableaux (requêtes × k) : les indices des documents, par score décroissant, et leurs scores.
+        """
+        scores = self.scores(textes)
+        indices = meilleurs_indices(scores, k)
+        return indices, np.take_along_axis(scores, indices, axis=1)
+
+
+########################################################################################################################
+class MatriceCollocations:
+    """
+    Classe représentant la matrice des cooccurrences de termes dans une fenêtre glissante.
+
+    La valeur (i, j) compte les occurrences du terme j situées à au plus 'fenetre' mots d'une occurrence
+    du terme i, dans un même document : la matrice est symétrique. Ses lignes et colonnes sont les identifiants
+    du vocabulaire des jetons (voir Vocabulaire), ce qui permet d'ajouter des documents sans renuméroter les termes.
+
+    Les jetons sont parcourus une seule fois, par blocs de documents traités en parallèle : pour chaque
+    décalage d de 1 à 'fenetre', les couples (jeton p, jeton p + d) d'un bloc sont obtenus par deux tranches
+    de ses jetons mis bout à bout (séparés par 'fenetre' cases vides, pour qu'aucun couple ne chevauche
+    deux documents), et comptés en construisant une matrice creuse.
+    """
+
+    def __init__(self, fenetre=5, vocabulaire=VOCABULAIRE):
+        if fenetre < 1:
+            raise ValueError("La fenêtre doit compter au moins un mot")
+        self.fenetre = fenetre
+        self.vocabulaire = vocabulaire
+        self.matrice = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.marges = np.zeros(0, dtype=np.int64)  # terme -> somme de sa ligne
+        self.total = 0  # somme de la matrice
+
+    def _compter(self, jetons, taille):
+        separateur = np.full(self.fenetre, -1, dtype=np.int64)
+        tous = np.concatenate([tableau for ids in jetons for tableau in (ids, separateur)])
+        lignes, colonnes = [], []
+        for decalage in range(1, self.fenetre + 1):
+            gauche, droite = tous[:-decalage], tous[decalage:]
+            garder = (gauche >= 0) & (droite >= 0)
+            lignes.append(gauche[garder])
+            colonnes.append(droite[garder])
+        lignes, colonnes = np.concatenate(lignes), np.concatenate(colonnes)
+        # chaque couple est compté dans un sens (la conversion au format CSR additionne les couples répétés) ;
+        # la somme des blocs est symétrisée par ajouter
+        return sparse.csr_matrix((np.ones(len(lignes), dtype=np.int64), (lignes, colonnes)), shape=(taille, taille))
+
+    def ajouter(self, jetons, taille_bloc=1000, nombre_threads=None):
+        """
+        Ajoute aux comptes les cooccurrences de documents.
+
+        :param jetons: Les tableaux d'identifiants (voir Vocabulaire) des documents.
+        :param taille_bloc: Le nombre de documents traités par bloc.
+        :param nombre_threads: Le nombre de blocs traités en parallèle (par défaut, selon le nombre de processeurs).
+        :return: La matrice elle-même.
+        """
+        jetons = [ids for ids in jetons if len(ids)]
+        taille = max(len(self.vocabulaire), self.matrice.shape[0])
+        blocs = [jetons[debut:debut + taille_bloc] for debut in range(0, len(jetons), taille_bloc)]
+
+        # les matrices des blocs sont additionnées deux à deux, comme les chiffres d'un compteur binaire : chaque
+        # addition porte sur des matrices de tailles comparables, et le coût total reste proche de
+        # nnz × log(nombre de blocs), au lieu de nnz × nombre de blocs pour une somme cumulée
+        pile = []  # (rang, somme de 2 ** rang blocs)
+        with ThreadPoolExecutor(max_workers=nombre_threads) as executeur:
+            for somme in executeur.map(lambda bloc: self._compter(bloc, taille), blocs):
+                rang = 0
+                while pile and pile[-1][0] == rang:
+                    somme = pile.pop()[1] + somme
+                    rang += 1
+                pile.append((rang, somme))
+
+        matrice = self.matrice.copy()
+        matrice.resize((taille, taille))
+        if pile:
+            comptes = pile.pop()[1]
+            while pile:
+                comptes = pile.pop()[1] + comptes
+            matrice = matrice + comptes + comptes.T
+        self.matrice = matrice.tocsr()
+        self.marges = np.asarray(self.matrice.sum(axis=1)).ravel()
+        self.total = int(self.marges.sum())
+        return self
+
+    def cooccurrences(self, terme1, terme2):
+        """
+        Renvoie le nombre de cooccurrences de deux termes (0 si l'un d'eux est inconnu).
+        """
+        i, j = self._indice(terme1), self._indice(terme2)
+        return 0 if i is None or j is None else int(self.matrice[i, j])
+
+    def _indice(self, terme):
+        indice = self.vocabulaire.terme2id.get(terme)
+        return indice if indice is not None and indice < self.matrice.shape[0] else None
+
+    def collocats(self, terme, n=10, mesure='pmi', minimum=1):
+        """
+        Renvoie les n termes les plus associés à un terme, selon une mesure d'association calculée sur la matrice :
+        - 'pmi' : l'information mutuelle ponctuelle log(c(t, u) × N / (c(t) × c(u))), qui favorise les termes rares
+          (d'où 'minimum') ;
+        - 'llr' : le rapport de vraisemblance G² de Dunning, négatif lorsque les termes se fréquentent moins
+          que ne le voudrait le hasard.
+        N est le total de la matrice, c(t) la somme de la ligne de t.
+
+        :param terme: Le terme (nettoyé, voir nettoyer_texte).
+        :param n: Le nombre de collocats.
+        :param mesure: 'pmi' ou 'llr' (voir MESURES_ASSOCIATION).
+        :param minimum: Le nombre minimal de cooccurrences d'un collocat retenu.
+        :return: Un DataFrame trié par score décroissant, de colonnes 'collocat', 'cooccurrences' et 'score'
+            (vide si le terme est inconnu).
+        """
+        if mesure not in MESURES_ASSOCIATION:
+            raise ValueError(f"Mesure inconnue : {mesure!r} (attendu : {', '.join(MESURES_ASSOCIATION)})")
+        indice = self._indice(terme)
+        if indice is None:
+            return pd.DataFrame({'collocat': [], 'cooccurrences': np.array([], dtype=np.int64), 'score': []})
+
+        debut, fin = self.matrice.indptr[indice], self.matrice.indptr[indice + 1]
+        colonnes = self.matrice.indices[debut:fin]
+        comptes = self.matrice.data[debut:fin]
+        garder = comptes >= minimum
+        colonnes, comptes = colonnes[garder], comptes[garder].astype(np.float64)
+        ligne, marges, total = float(self.marges[indice]), self.marges[colonnes].astype(np.float64), float(self.total)
+
+        if mesure == 'pmi':
+            scores = np.log(comptes * total / (ligne * marges))
+        else:
+            # tableau de contingence 2 × 2 de chaque couple (terme, collocat)
+            attendus = ligne * marges / total
+            cases = [(comptes, ligne, marges), (ligne - comptes, ligne, total - marges),
+                     (marges - comptes, total - ligne, marges), (total - ligne - marges + comptes, total - ligne,
+                                                                 total - marges)]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = 2 * sum(xlogy(k, np.where(k > 0, k * total / (lig * col), 1)) for k, lig, col in cases)
+            scores = np.where(comptes >= attendus, scores, -scores)
+
+        meilleurs = meilleurs_indices(scores, n)
+        return pd.DataFrame({'collocat': self.vocabulaire.termes(colonnes[meilleurs]),
+                             'cooccurrences': comptes[meilleurs].astype(np.int64),
+                             'score': scores[meilleurs]})
@@ -0,0 +1,202 @@
+import gzip
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+
+DATE_INITIALE = datetime(2024, 1, 1)
+
+
+def texte_synthetique(i, longueur):
+    """
+    Renvoie un texte factice d'environ 'longueur' caractères, différent pour chaque document.
+    """
+    motif = f"document {i} sur la science des données et l'apprentissage automatique "
+    return (motif * (longueur // len(motif) + 1))[:longueur]
+
+
+########################################################################################################################
+class ServeurArxivSimule:
+    """
+    Classe représentant un serveur HTTP local qui imite l'API arXiv.
+
+    Le serveur répond aux requêtes de construire_requete_arxiv par un flux Atom synthétique,
+    en respectant la pagination (paramètres 'start' et 'max_results') et en attendant une latence
+    configurable avant chaque réponse (et à l'ouverture de chaque connexion). Les réponses sont compressées
+    si le client l'accepte. Il permet de mesurer l'acquisition sans accès au réseau.
+    Les premières requêtes peuvent recevoir des réponses en erreur, pour vérifier les nouvelles tentatives.
+
+    S'utilise comme gestionnaire de contexte :
+
+        with ServeurArxivSimule(nombre_articles=1000, latence=0.05) as serveur:
+            ... serveur.url ...
+    """
+
+    def __init__(self, nombre_articles=1000, latence=0.0, longueur_resume=1000, auteurs_par_article=3,
+                 erreurs=(), retry_after=None, latence_connexion=0.0):
+        self.nombre_articles = nombre_articles
+        self.latence = latence  # en secondes, par requête
+        self.latence_connexion = latence_connexion  # en secondes, par connexion (poignées de main TCP et TLS)
+        self.longueur_resume = longueur_resume  # en caractères
+        self.auteurs_par_article = auteurs_par_article
+        self.erreurs = list(erreurs)  # codes d'erreur renvoyés, dans l'ordre, aux premières requêtes
+        self.retry_after = retry_after  # valeur de l'en-tête Retry-After des réponses en erreur
+        self.nombre_requetes = 0
+        self.nombre_connexions = 0
+        self.octets_envoyes = 0
+        self._serveur = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        L'URL de l'API simulée, à utiliser à la place de URL_API_ARXIV.
+        """
+        hote, port = self._serveur.server_address[:2]
+        return f"http://{hote}:{port}/api/query"
+
+    def creer_entree(self, i):
+        """
+        Renvoie l'élément <entry> Atom du i-ème article.
+        """
+        auteurs = ''.join(f"<author><name>Auteur {(i + k) % 997}</name></author>"
+                          for k in range(self.auteurs_par_article))
+        publication = (DATE_INITIALE - timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        return (f"<entry><id>http://arxiv.org/abs/{i}</id>"
+                f"<published>{publication}</published>"
+                f"<title>Article {i}</title>"
+                f"<summary>{escape(texte_synthetique(i, self.longueur_resume))}</summary>"
+                f"{auteurs}"
+                f"<link href=\"http://arxiv.org/abs/{i}\" rel=\"alternate\" type=\"text/html\"/>"
+                f"</entry>")
+
+    def creer_flux(self, debut, taille):
+        """
+        Renvoie le flux Atom (bytes) des articles demandés, tronqué au nombre d'articles disponibles.
+        """
+        fin = min(debut + taille, self.nombre_articles)
+        entrees = ''.join(self.creer_entree(i) for i in range(debut, fin))
+        return (f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<feed xmlns="http://www.w3.org/2005/Atom">{entrees}</feed>').encode('utf-8')
+
+    def _creer_gestionnaire(self):
+        simulateur = self
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # connexions conservées entre les requêtes (keep-alive)
+            disable_nagle_algorithm = True  # en-têtes et contenu sont écrits séparément
+
+            def setup(self):
+                super().setup()
+                simulateur.nombre_connexions += 1
+                time.sleep(simulateur.latence_connexion)
+
+            def do_GET(self):
+                parametres = parse_qs(urlparse(self.path).query)
+                debut = int(parametres.get('start', ['0'])[0])
+                taille = int(parametres.get('max_results', ['10'])[0])
+                simulateur.nombre_requetes += 1
+                time.sleep(simulateur.latence)
+                if simulateur.erreurs:
+                    self.send_response(simulateur.erreurs.pop(0))
+                    if simulateur.retry_after is not None:
+                        self.send_header('Retry-After', str(simulateur.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                contenu = simulateur.creer_flux(debut, taille)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/atom+xml; charset=utf-8')
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    contenu = gzip.compress(contenu, compresslevel=1)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(contenu)))
+                self.end_headers()
+                self.wfile.write(contenu)
+                simulateur.octets_envoyes += len(contenu)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Gestionnaire
+
+    def demarrer(self):
+        """
+        Démarre le serveur sur un port libre de la machine locale, dans un thread dédié.
+        """
+        self._serveur = ThreadingHTTPServer(('127.0.0.1', 0), self._creer_gestionnaire())
+        self._serveur.daemon_threads = True
+        self._thread = threading.Thread(target=self._serveur.serve_forever, name="serveur arXiv simulé", daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        """
+        Arrête le serveur.
+        """
+        self._serveur.shutdown()
+        self._serveur.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+
+########################################################################################################################
+class RedditSimule:
+    """
+    Classe représentant un client praw factice produisant des posts synthétiques.
+
+    Une instance remplace la classe praw.Reddit : l'appeler avec les identifiants la renvoie elle-même,
+    et subreddit(...).search(...) renvoie
+    un générateur de posts ayant les attributs lus par extraire_lignes_reddit. Comme praw, les posts
+    sont obtenus par pages de 100, chaque page coûtant 'latence' secondes.
+    """
+
+    TAILLE_PAGE = 100  # nombre de posts par requête, comme l'API Reddit
+
+    def __init__(self, nombre_posts=1000, latence=0.0, longueur_texte=500):
+        self.nombre_posts = nombre_posts
+        self.latence = latence  # en secondes, par page
+        self.longueur_texte = longueur_texte  # en caractères
+        self.nombre_requetes = 0
+
+    def __call__(self, **identifiants):
+        # une instance configurée peut remplacer la classe praw.Reddit : praw.Reddit(client_id=..., ...)
+        return self
+
+    def subreddit(self, nom):
+        return SimpleNamespace(search=self.search, display_name=nom)
+
+    def creer_post(self, i):
+        """
+        Renvoie le i-ème post synthétique.
+        """
+        return SimpleNamespace(
+            id=f"p{i}",
+            title=f"Post {i}",
+            author=SimpleNamespace(name=f"redditeur_{i % 499}"),
+            created_utc=(DATE_INITIALE - timedelta(minutes=i)).timestamp(),
+            selftext=texte_synthetique(i, self.longueur_texte),
+            url=f"https://www.reddit.com/r/datascience/comments/p{i}",
+            subreddit=SimpleNamespace(display_name="datascience"),
+            ups=i % 300,
+            score=i % 300,
+            num_comments=i % 50,
+            link_flair_text=None,
+        )
+
+    def search(self, query, sort='relevance', limit=100):
+        nombre = min(limit, self.nombre_posts)
+        for i in range(nombre):
+            if i % self.TAILLE_PAGE == 0:
+                self.nombre_requetes += 1
+                time.sleep(self.latence)
+            yield self.creer_post(i)
@@ -1,14 +1,38 @@
 import praw
 import json
 import xmltodict
-import urllib.request as libreq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote_plus
 from datetime import datetime as dt
+import io
 import os
+import queue
+import time
+import threading
+from functools import partial
+from itertools import takewhile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as DelaiDepasse
 import pandas as pd
 from Classes_Data import *
+from Classe_Cache import CacheHTTP
 
 
+URL_API_ARXIV = "http://export.arxiv.org/api/query"
+TAILLE_PAGE_ARXIV = 100  # nombre d'articles demandés par requête lors d'une moisson paginée
+DELAI_ENTRE_REQUETES_ARXIV = 3  # délai (en secondes) entre deux requêtes, recommandé par arXiv
+NS_ATOM = '{http://www.w3.org/2005/Atom}'
+
+CONNEXIONS_HTTP_MAX = 4  # connexions simultanées au plus par hôte, les requêtes suivantes attendent
+TENTATIVES_HTTP = 5  # nouvelles tentatives après une erreur de connexion ou une réponse 429 / 5xx
+FACTEUR_ATTENTE_HTTP = 1  # attente exponentielle entre les tentatives : 1 s, 2 s, 4 s...
+DELAIS_HTTP = (10, 60)  # délais (en secondes) d'établissement de la connexion et de lecture de la réponse
+
+_session_http = None
+_verrou_session_http = threading.Lock()
+
 
 
 def charger_config_json(chemin):
@@ -34,16 +58,61 @@ def initialiser_reddit(config):
                        user_agent=config['REDDIT']['user_agent'])
 
 
-def recuperer_posts_reddit(reddit, mot_de_recherche, taille):
+def recuperer_posts_reddit(reddit, mot_de_recherche, taille, tri='relevance'):
     """
     Récupère des posts de Reddit basés sur un mot-clé de recherche.
 
     :param reddit: L'instance de l'API Reddit.
     :param mot_de_recherche: Le mot-clé pour la recherche.
     :param taille: Le nombre maximum de posts à récupérer.
+    :param tri: L'ordre des résultats ('relevance', 'new', ...).
     :return: Une liste de posts Reddit.
     """
-    return reddit.subreddit('all').search(query=mot_de_recherche, limit=taille)
+    return reddit.subreddit('all').search(query=mot_de_recherche, sort=tri, limit=taille)
+
+
+def extraire_lignes_reddit(posts):
+    """
+    Met en forme les posts Reddit selon les colonnes du corpus, au fur et à mesure de leur lecture.
+
+    :param posts: Une liste (ou un générateur praw) de posts Reddit.
+    :return: Un générateur de dictionnaires, une ligne du corpus par post.
+    """
+    for post in posts:
+        yield {
+            'id_post_reddit': post.id,
+            'titre': post.title,
+            'auteur': post.author.name if post.author else 'N/A',
+            'date': dt.utcfromtimestamp(post.created_utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'texte': post.selftext,
+            'url': post.url,
+            'subreddit': post.subreddit.display_name,
+            'upvotes': post.ups,
+            'score': post.score,
+            'nombre_commentaires': post.num_comments,
+            'flairs': post.link_flair_text,
+            'source': "reddit"
+        }
+
+
+def recuperer_lignes_reddit(reddit, mot_de_recherche, taille, cache=None):
+    """
+    Récupère les posts Reddit déjà mis en forme, en passant par le cache s'il est fourni.
+
+    :param reddit: L'instance de l'API Reddit.
+    :param mot_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre maximum de posts à récupérer.
+    :param cache: Une instance de CacheHTTP, ou None pour toujours interroger l'API.
+    :return: Les lignes du corpus, une par post (générateur sans cache, liste avec cache).
+    """
+    if cache is None:
+        return extraire_lignes_reddit(recuperer_posts_reddit(reddit, mot_de_recherche, taille))
+
+    def telecharger():
+        lignes = list(extraire_lignes_reddit(recuperer_posts_reddit(reddit, mot_de_recherche, taille)))
+        return json.dumps(lignes).encode('utf-8')
+
+    return json.loads(cache.obtenir('reddit', mot_de_recherche, taille, telecharger))
 
 
 def creer_dataframe_reddit(posts):
@@ -54,38 +123,113 @@ def creer_dataframe_reddit(posts):
     :return: Un DataFrame contenant les données des posts.
 
     """
-    data_reddit = [{
-        'id_post_reddit': post.id,
-        'titre': post.title,
-        'auteur': post.author.name if post.author else 'N/A',
-        'date': dt.utcfromtimestamp(post.created_utc).strftime('%Y-%m-%d %H:%M:%S'),
-        'texte': post.selftext,
-        'url': post.url,
-        'subreddit': post.subreddit.display_name,
-        'upvotes': post.ups,
-        'score': post.score,
-        'nombre_commentaires': post.num_comments,
-        'flairs': post.link_flair_text,
-        'source': "reddit"
-    } for post in posts]
-    return pd.DataFrame(data_reddit)
+    return pd.DataFrame(list(extraire_lignes_reddit(posts)))
 
 
-def recuperer_articles_arxiv(sequence_de_recherche, taille):
+def construire_requete_arxiv(sequence_de_recherche, debut, taille, plus_recents_d_abord=False):
     """
-    Récupère des articles depuis arXiv.
+    Construit l'URL d'une requête à l'API arXiv.
 
     :param sequence_de_recherche: Le mot-clé pour la recherche.
+    :param debut: L'indice du premier article demandé.
     :param taille: Le nombre maximum d'articles à récupérer.
-    :return: Un objet xmltodict contenant les articles récupérés.
+    :param plus_recents_d_abord: Si True, les articles sont triés par date de soumission décroissante.
+    :return: L'URL de la requête.
     """
     contenu = quote_plus(sequence_de_recherche) # contrairement à praw, dans xreddit il faut formater la sequence afin qu'il n'y ait pas d'espaces
     cible = 'all'
     cible_exclusion = 'ti'
     contenu_exclusion = 'monkey' # exemple insignifiant, juste pour tester la variable exclusion
-    requete_arxiv = f"http://export.arxiv.org/api/query?search_query={cible}:{contenu}+ANDNOT+%28{cible_exclusion}:{contenu_exclusion}%29&start=0&max_results={taille}"
-    with libreq.urlopen(requete_arxiv) as url:
-        return xmltodict.parse(url.read())
+    tri = "&sortBy=submittedDate&sortOrder=descending" if plus_recents_d_abord else ""
+    return f"{URL_API_ARXIV}?search_query={cible}:{contenu}+ANDNOT+%28{cible_exclusion}:{contenu_exclusion}%29&start={debut}&max_results={taille}{tri}"
+
+
+def creer_session_http(connexions_max=CONNEXIONS_HTTP_MAX, tentatives=TENTATIVES_HTTP,
+                       facteur_attente=FACTEUR_ATTENTE_HTTP):
+    """
+    Crée une session HTTP dont les connexions sont conservées (keep-alive) et réutilisées d'une requête à l'autre.
+
+    Les réponses compressées (gzip) sont acceptées et décompressées. Une requête en échec (connexion
+    impossible, réponse 429 ou 5xx) est retentée après une attente exponentielle, ou après la durée
+    indiquée par l'en-tête Retry-After de la réponse.
+
+    :param connexions_max: Le nombre maximum de connexions simultanées par hôte.
+    :param tentatives: Le nombre maximum de nouvelles tentatives d'une requête.
+    :param facteur_attente: Le facteur de l'attente exponentielle entre les tentatives, en secondes.
+    :return: Une session requests.
+    """
+    strategie = Retry(total=tentatives, backoff_factor=facteur_attente,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(['GET']),
+                      respect_retry_after_header=True, raise_on_status=False)
+    adaptateur = HTTPAdapter(pool_connections=connexions_max, pool_maxsize=connexions_max, pool_block=True,
+                             max_retries=strategie)
+    session = requests.Session()
+    session.mount('http://', adaptateur)
+    session.mount('https://', adaptateur)
+    return session
+
+
+def obtenir_session_http():
+    """
+    Renvoie la session HTTP partagée par toutes les requêtes de l'application, créée au premier appel.
+    """
+    global _session_http
+    with _verrou_session_http:
+        if _session_http is None:
+            _session_http = creer_session_http()
+        return _session_http
+
+
+def telecharger_url(url):
+    """
+    Télécharge le contenu d'une URL avec la session HTTP partagée.
+
+    :param url: L'URL à télécharger.
+    :return: Le contenu de la réponse (bytes).
+    :raises requests.HTTPError: Si la réponse est toujours en erreur après les nouvelles tentatives.
+    """
+    reponse = obtenir_session_http().get(url, timeout=DELAIS_HTTP)
+    reponse.raise_for_status()
+    return reponse.content
+
+
+def recuperer_articles_arxiv(sequence_de_recherche, taille, cache=None):
+    """
+    Récupère des articles depuis arXiv.
+
+    :param sequence_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre maximum d'articles à récupérer.
+    :param cache: Une instance de CacheHTTP, ou None pour toujours interroger l'API.
+    :return: Un objet xmltodict contenant les articles récupérés.
+    """
+    requete_arxiv = construire_requete_arxiv(sequence_de_recherche, 0, taille)
+    if cache is None:
+        return xmltodict.parse(telecharger_url(requete_arxiv))
+    return xmltodict.parse(cache.obtenir('arxiv', sequence_de_recherche, f"0:{taille}",
+                                         lambda: telecharger_url(requete_arxiv)))
+
+
+def creer_ligne_arxiv(titre, auteurs, publication, resume, url):
+    """
+    Met en forme un article arXiv selon les colonnes du corpus.
+
+    :param titre: Le titre de l'article.
+    :param auteurs: La liste des noms des auteurs, le premier étant l'auteur principal.
+    :param publication: La date de publication au format arXiv ('%Y-%m-%dT%H:%M:%SZ').
+    :param resume: Le résumé de l'article.
+    :param url: Le lien vers l'article.
+    :return: Un dictionnaire représentant une ligne du corpus.
+    """
+    return {
+        'titre': titre,
+        'auteur': auteurs[0],
+        'co_auteurs': ', '.join(auteurs[1:]) if len(auteurs) > 1 else None,
+        'date': dt.strptime(publication, '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d %H:%M:%S'),
+        'texte': resume,
+        'url': url,
+        'catégorie': 'cs',
+        'source': 'arxiv'
+    }
 
 
 def creer_dataframe_arxiv(parsed_xml):
@@ -99,55 +243,443 @@ def creer_dataframe_arxiv(parsed_xml):
     if not isinstance(entries, list):  # Si un seul article, il ne sera pas sous forme de liste
         entries = [entries]
 
-    data_arxiv = [{
-        'titre': entry['title'],
-        'auteur': entry['author']['name'] if isinstance(entry['author'], dict) else entry['author'][0]['name'],
-        'co_auteurs': ', '.join([author['name'] for author in entry['author'][1:]]) if isinstance(entry['author'],
-                                                                                                  list) and len(
-            entry['author']) > 1 else None,
-        'date': dt.strptime(entry['published'], '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d %H:%M:%S'),
-        'texte': entry['summary'],
-        'url': entry['link'][0]['@href'] if isinstance(entry['link'], list) else entry['link']['@href'],
-        'catégorie': 'cs',
-        'source': 'arxiv'
-    } for entry in entries]
+    data_arxiv = [creer_ligne_arxiv(
+        entry['title'],
+        [entry['author']['name']] if isinstance(entry['author'], dict) else [author['name'] for author in entry['author']],
+        entry['published'],
+        entry['summary'],
+        entry['link'][0]['@href'] if isinstance(entry['link'], list) else entry['link']['@href']
+    ) for entry in entries]
     return pd.DataFrame(data_arxiv)
 
 
-def appliquer_recherche(nom_corpus, mot_de_recherche, taille_par_source):
+def lire_entrees_arxiv(flux):
+    """
+    Lit un flux Atom arXiv de manière incrémentale et produit les articles au fur et à mesure.
+
+    Chaque élément <entry> est converti puis libéré dès sa lecture terminée :
+    la mémoire utilisée ne dépend pas de la taille du flux.
+
+    :param flux: Un objet fichier (réponse HTTP par exemple) contenant le flux Atom.
+    :return: Un générateur de dictionnaires, une ligne du corpus par article.
+    """
+    racine = None
+    for evenement, element in ET.iterparse(flux, events=('start', 'end')):
+        if racine is None:
+            racine = element
+        if evenement == 'end' and element.tag == f'{NS_ATOM}entry':
+            liens = element.findall(f'{NS_ATOM}link')
+            yield creer_ligne_arxiv(
+                element.findtext(f'{NS_ATOM}title'),
+                [auteur.findtext(f'{NS_ATOM}name') for auteur in element.findall(f'{NS_ATOM}author')],
+                element.findtext(f'{NS_ATOM}published'),
+                element.findtext(f'{NS_ATOM}summary'),
+                liens[0].get('href') if liens else None
+            )
+            # détacher l'article de l'arbre pour ne pas accumuler les entrées déjà lues
+            racine.remove(element)
+
+
+def moissonner_articles_arxiv(sequence_de_recherche, taille, taille_page=TAILLE_PAGE_ARXIV,
+                              delai=None, cache=None, depuis=None):
+    """
+    Récupère des articles arXiv page par page, sans limite de taille.
+
+    Les pages sont demandées successivement (paramètre 'start' de l'API) en respectant
+    le délai entre requêtes, et les articles sont produits dès qu'ils sont lus.
+    Les pages présentes dans le cache ne donnent lieu à aucune requête ni attente.
+
+    :param sequence_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre maximum d'articles à récupérer.
+    :param taille_page: Le nombre d'articles demandés par requête.
+    :param delai: Le délai en secondes entre deux requêtes, DELAI_ENTRE_REQUETES_ARXIV par défaut.
+    :param cache: Une instance de CacheHTTP, ou None pour toujours interroger l'API.
+    :param depuis: Une date : si elle est fournie, les articles sont demandés du plus récent au plus ancien
+        et la moisson s'arrête au premier article publié avant cette date.
+    :return: Un générateur de dictionnaires, une ligne du corpus par article.
+    """
+    delai = DELAI_ENTRE_REQUETES_ARXIV if delai is None else delai
+    limite = None if depuis is None else depuis.strftime('%Y-%m-%d')
+    derniere_requete = None
+
+    def telecharger(url):
+        nonlocal derniere_requete
+        if derniere_requete is not None:
+            attente = delai - (time.monotonic() - derniere_requete)
+            if attente > 0:
+                time.sleep(attente)
+        try:
+            return telecharger_url(url)
+        finally:
+            derniere_requete = time.monotonic()
+
+    debut = 0
+    while debut < taille:
+        taille_demandee = min(taille_page, taille - debut)
+        url = construire_requete_arxiv(sequence_de_recherche, debut, taille_demandee, depuis is not None)
+        if cache is None:
+            page = telecharger(url)
+        else:
+            page = cache.obtenir('arxiv', sequence_de_recherche, f"{debut}:{taille_demandee}",
+                                 lambda: telecharger(url))
+        nombre_recus = 0
+        for ligne in lire_entrees_arxiv(io.BytesIO(page)):
+            # les dates 'AAAA-MM-JJ HH:MM:SS' se comparent comme des chaînes
+            if limite is not None and ligne['date'] < limite:
+                return
+            nombre_recus += 1
+            yield ligne
+        # une page incomplète signifie que tous les résultats ont été parcourus
+        if nombre_recus < taille_demandee:
+            return
+        debut += taille_demandee
+
+
+def acquerir_reddit(mot_de_recherche, taille, config, depuis=None):
+    """
+    Source Reddit complète : connexion, recherche et mise en forme des posts.
+
+    :param mot_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre maximum de posts à récupérer.
+    :param config: Dictionnaire de configuration (identifiants Reddit, cache).
+    :param depuis: Une date : si elle est fournie, seuls les posts publiés à partir de cette date sont récupérés
+        (le cache n'est alors pas utilisé).
+    :return: Les lignes du corpus.
+    """
+    reddit = initialiser_reddit(config)
+    if depuis is not None:
+        limite = depuis.strftime('%Y-%m-%d')
+        posts_reddit = recuperer_posts_reddit(reddit, mot_de_recherche, taille, tri='new')
+        return takewhile(lambda ligne: ligne['date'] >= limite, extraire_lignes_reddit(posts_reddit))
+    # sans cache, praw renvoie un générateur paresseux : les requêtes réseau ont lieu pendant la lecture des lignes
+    return recuperer_lignes_reddit(reddit, mot_de_recherche, taille, CacheHTTP.depuis_config(config))
+
+
+def acquerir_arxiv(mot_de_recherche, taille, config, depuis=None):
+    """
+    Source arXiv complète : moisson paginée de l'API et mise en forme des articles.
+
+    :param mot_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre maximum d'articles à récupérer.
+    :param config: Dictionnaire de configuration (cache).
+    :param depuis: Une date : si elle est fournie, seuls les articles publiés à partir de cette date sont récupérés
+        (le cache n'est alors pas utilisé).
+    :return: Un générateur de lignes du corpus.
+    """
+    if depuis is not None:
+        return moissonner_articles_arxiv(mot_de_recherche, taille, depuis=depuis)
+    return moissonner_articles_arxiv(mot_de_recherche, taille, cache=CacheHTTP.depuis_config(config))
+
+
+# Sources interrogées par appliquer_recherche, dans l'ordre de concaténation des résultats
+SOURCES = {
+    'arxiv': acquerir_arxiv,
+    'reddit': acquerir_reddit,
+}
+
+# Colonnes de l'export TSV écrit par appliquer_recherche : celles des lignes arXiv puis celles propres à Reddit.
+# L'export étant écrit au fil de l'acquisition, une clé absente de cette liste n'est pas exportée.
+COLONNES_TSV = ['titre', 'auteur', 'co_auteurs', 'date', 'texte', 'url', 'catégorie', 'source',
+                'nombre_commentaires', 'id_post_reddit', 'subreddit', 'upvotes', 'score', 'flairs']
+
+# Délai maximal (en secondes) accordé à chaque source en mode parallèle
+DELAIS_PAR_SOURCE = {
+    'arxiv': 60,
+    'reddit': 60,
+}
+
+
+def calculer_delais_par_defaut(taille):
+    """
+    Calcule les délais par source en tenant compte de la pagination d'arXiv.
+
+    :param taille: Le nombre d'articles à récupérer par source.
+    :return: Un dictionnaire {nom: délai en secondes}.
+    """
+    delais = dict(DELAIS_PAR_SOURCE)
+    nombre_pages = -(-taille // TAILLE_PAGE_ARXIV)
+    delais['arxiv'] += max(nombre_pages - 1, 0) * DELAI_ENTRE_REQUETES_ARXIV
+    return delais
+
+
+def acquerir_sources_en_parallele(sources, mot_de_recherche, taille, config, delais=None):
+    """
+    Interroge toutes les sources en même temps, chacune dans son propre thread.
+
+    Le temps total est celui de la source la plus lente et non plus la somme des sources.
+    Une source qui échoue ou dépasse son délai est ignorée : les résultats des autres sont conservés.
+
+    :param sources: Dictionnaire {nom: fonction(mot_de_recherche, taille, config) -> lignes du corpus}.
+    :param mot_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre d'articles à récupérer par source.
+    :param config: Dictionnaire de configuration transmis aux sources.
+    :param delais: Dictionnaire {nom: délai en secondes}, None pour attendre sans limite.
+    :return: Un dictionnaire {nom: liste de lignes} des sources ayant abouti.
+    """
+    delais = delais or {}
+    resultats = {}
+    executeur = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+    debut = time.monotonic()
+    try:
+        # les lignes sont lues dans le thread de la source, là où ont lieu les requêtes réseau
+        futures = {nom: executeur.submit(lambda source=source: list(source(mot_de_recherche, taille, config)))
+                   for nom, source in sources.items()}
+        for nom, future in futures.items():
+            # les délais courent tous depuis le lancement commun des sources
+            delai = delais.get(nom)
+            restant = None if delai is None else max(0, debut + delai - time.monotonic())
+            try:
+                resultats[nom] = future.result(timeout=restant)
+            except DelaiDepasse:
+                print(f"La source {nom} n'a pas répondu dans le délai de {delai} s, elle est ignorée.")
+            except Exception as e:
+                print(f"La source {nom} a échoué ({e}), elle est ignorée.")
+    finally:
+        # ne pas bloquer sur une source trop lente : son thread se terminera en arrière-plan
+        executeur.shutdown(wait=False, cancel_futures=True)
+    return resultats
+
+
+def acquerir_sources_en_flux(sources, mot_de_recherche, taille, config, delais=None):
+    """
+    Interroge toutes les sources en même temps, chacune dans son propre thread, et renvoie leurs lignes
+    au fur et à mesure de leur arrivée, sans attendre la fin des sources.
+
+    Les lignes sont renvoyées dans l'ordre des sources : celles de la source en cours de lecture passent
+    directement au consommateur, celles des sources suivantes attendent leur tour dans une file. La mémoire
+    occupée se limite ainsi aux lignes des sources suivantes arrivées avant leur tour.
+    Une source qui échoue ou dépasse son délai est abandonnée : les lignes qu'elle a déjà renvoyées sont
+    conservées (contrairement à acquerir_sources_en_parallele, qui ignore toute la source).
+
+    :param sources: Dictionnaire {nom: fonction(mot_de_recherche, taille, config) -> lignes du corpus}.
+    :param mot_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre d'articles à récupérer par source.
+    :param config: Dictionnaire de configuration transmis aux sources.
+    :param delais: Dictionnaire {nom: délai en secondes}, None pour attendre sans limite.
+    :return: Un générateur de lignes du corpus. Il lève ValueError si aucune source n'a abouti.
+    """
+    delais = delais or {}
+    fin = object()
+    files = {nom: queue.Queue() for nom in sources}
+    abandons = {nom: threading.Event() for nom in sources}  # arrêtent les sources dont les lignes ne sont plus lues
+
+    def lire_source(nom, source):
+        try:
+            for ligne in source(mot_de_recherche, taille, config):
+                if abandons[nom].is_set():
+                    return
+                files[nom].put(ligne)
+            files[nom].put(fin)
+        except Exception as e:
+            files[nom].put(e)
+
+    executeur = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+    debut = time.monotonic()
+    abouties = 0
+    try:
+        for nom, source in sources.items():
+            executeur.submit(lire_source, nom, source)
+        for nom in sources:
+            # les délais courent tous depuis le lancement commun des sources
+            delai = delais.get(nom)
+            nombre_lignes = 0
+            while True:
+                restant = None if delai is None else max(0, debut + delai - time.monotonic())
+                try:
+                    ligne = files[nom].get(timeout=restant)
+                except queue.Empty:
+                    abandons[nom].set()
+                    print(f"La source {nom} n'a pas répondu dans le délai de {delai} s, elle est abandonnée "
+                          f"({nombre_lignes} lignes conservées).")
+                    break
+                if ligne is fin:
+                    abouties += 1
+                    break
+                if isinstance(ligne, Exception):
+                    print(f"La source {nom} a échoué ({ligne}), elle est abandonnée "
+                          f"({nombre_lignes} lignes conservées).")
+                    break
+                nombre_lignes += 1
+                yield ligne
+    finally:
+        # ne pas bloquer sur une source trop lente : son thread s'arrêtera à sa prochaine ligne
+        for evenement in abandons.values():
+            evenement.set()
+        executeur.shutdown(wait=False, cancel_futures=True)
+    if not abouties:
+        raise ValueError("Aucune source n'a pu être interrogée.")
+
+
+def acquerir_sources_en_sequence(sources, mot_de_recherche, taille, config):
+    """
+    Interroge les sources l'une après l'autre (comportement historique).
+
+    Les lignes ne sont pas lues ici : chaque source est parcourue au moment de la construction du corpus.
+
+    :param sources: Dictionnaire {nom: fonction(mot_de_recherche, taille, config) -> lignes du corpus}.
+    :param mot_de_recherche: Le mot-clé pour la recherche.
+    :param taille: Le nombre d'articles à récupérer par source.
+    :param config: Dictionnaire de configuration transmis aux sources.
+    :return: Un dictionnaire {nom: lignes du corpus}.
+    """
+    return {nom: source(mot_de_recherche, taille, config) for nom, source in sources.items()}
+
+
+def normaliser_ligne(ligne):
+    """
+    Complète une ligne acquise pour qu'elle ait toutes les colonnes attendues par le corpus.
+
+    :param ligne: Un dictionnaire produit par une source (Reddit ou arXiv).
+    :return: La ligne complétée (nombre de commentaires, co-auteurs) et au texte sur une seule ligne.
+    """
+    ligne['nombre_commentaires'] = ligne.get('nombre_commentaires') or 0
+    ligne['co_auteurs'] = ligne.get('co_auteurs') or 'Aucun'
+    if isinstance(ligne.get('texte'), str):
+        ligne['texte'] = ligne['texte'].replace('\n', ' ').strip()
+    return ligne
+
+
+def exporter_tsv(lignes, chemin, colonnes=None, ajout=False):
+    """
+    Exporte des lignes du corpus dans un fichier TSV.
+
+    :param lignes: Une liste de dictionnaires, une ligne du corpus par document.
+    :param chemin: Le chemin du fichier à écrire.
+    :param colonnes: Les colonnes du fichier, dans l'ordre ; None pour toutes les clés des lignes.
+    :param ajout: Si True, les lignes sont ajoutées à la fin du fichier, sans en-tête.
+    """
+    pd.DataFrame(lignes, columns=colonnes).to_csv(chemin, mode='a' if ajout else 'w', header=not ajout,
+                                                  index=False, encoding='utf-8', sep='\t')
+
+
+def exporter_tsv_en_flux(lignes, chemin, taille_bloc=1000):
+    """
+    Exporte les lignes dans un fichier TSV au fur et à mesure qu'elles sont lues, et les renvoie telles quelles :
+    l'export accompagne la construction du corpus sans conserver toutes les lignes.
+
+    Les lignes sont écrites par blocs de 'taille_bloc', dans un thread séparé : un bloc est écrit pendant que
+    le suivant se remplit, et au plus deux blocs sont conservés. Toutes les lignes n'étant pas connues
+    au moment d'écrire l'en-tête, les colonnes du fichier sont celles de COLONNES_TSV.
+
+    :param lignes: Les lignes du corpus (un générateur peut être fourni).
+    :param chemin: Le chemin du fichier à écrire.
+    :param taille_bloc: Le nombre de lignes écrites à la fois.
+    :return: Un générateur des mêmes lignes. Le fichier est complet lorsqu'il a été entièrement parcouru.
+    """
+    executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"export {chemin}")
+    ecriture = None
+    bloc = []
+    try:
+        for ligne in lignes:
+            bloc.append(ligne)
+            yield ligne
+            if len(bloc) == taille_bloc:
+                # attendre l'écriture du bloc précédent borne la mémoire et garde les blocs dans l'ordre
+                if ecriture is not None:
+                    ecriture.result()
+                ecriture = executeur.submit(exporter_tsv, bloc, chemin, colonnes=COLONNES_TSV,
+                                            ajout=ecriture is not None)
+                bloc = []
+        if ecriture is not None:
+            ecriture.result()
+        if bloc or ecriture is None:
+            exporter_tsv(bloc, chemin, colonnes=COLONNES_TSV, ajout=ecriture is not None)
+    finally:
+        executeur.shutdown(wait=True)
+
+
+def appliquer_recherche(nom_corpus, mot_de_recherche, taille_par_source, parallele=True, delais=None,
+                        export_tsv=True):
     """
     Applique une recherche et crée un corpus à partir des résultats.
 
+    Les lignes acquises sont ajoutées directement au corpus, sans passer par un fichier intermédiaire,
+    au fur et à mesure de leur arrivée (voir acquerir_sources_en_flux) : ni l'acquisition ni l'export TSV,
+    écrit au passage des lignes (voir exporter_tsv_en_flux), ne conservent toutes les lignes.
+
     :param nom_corpus: Le nom à donner au corpus.
     :param mot_de_recherche: Le mot-clé pour la recherche.
     :param taille_par_source: Le nombre d'articles à récupérer par source.
+    :param parallele: Si True, les sources sont interrogées simultanément.
+    :param delais: Délais par source en mode parallèle, calculés selon la taille par défaut.
+    :param export_tsv: Si True, les données acquises sont aussi exportées dans data/{nom_corpus}.csv.
     :return: Un objet Corpus contenant les articles récupérés.
     """
     config = charger_config_json('config.json')
-    reddit = initialiser_reddit(config)
+    if parallele:
+        lignes = acquerir_sources_en_flux(SOURCES, mot_de_recherche, taille_par_source, config,
+                                          calculer_delais_par_defaut(taille_par_source) if delais is None else delais)
+    else:
+        resultats = acquerir_sources_en_sequence(SOURCES, mot_de_recherche, taille_par_source, config)
+        lignes = (ligne for nom in SOURCES for ligne in resultats[nom])
 
-    posts_reddit = recuperer_posts_reddit(reddit, mot_de_recherche, taille_par_source)
-    df_reddit = creer_dataframe_reddit(posts_reddit)
+    lignes = (normaliser_ligne(ligne) for ligne in lignes)
+    if export_tsv:
+        lignes = exporter_tsv_en_flux(lignes, f"data/{nom_corpus}.csv")
 
-    parsed_xml = recuperer_articles_arxiv(mot_de_recherche, taille_par_source)
-    df_arxiv = creer_dataframe_arxiv(parsed_xml)
+    corpus_articles = Corpus(nom_corpus, mot_de_recherche)
+    corpus_articles.add_documents(lignes)
+    corpus_articles.save(Corpus.chemin_fichier(nom_corpus))
+
+    return corpus_articles
+
+
+def completer_tsv(lignes, chemin):
+    """
+    Ajoute des lignes à la fin d'un export TSV existant, dans l'ordre de ses colonnes.
+
+    :param lignes: Une liste de dictionnaires, une ligne du corpus par document.
+    :param chemin: Le chemin du fichier TSV à compléter.
+    """
+    colonnes = pd.read_csv(chemin, sep='\t', nrows=0).columns
+    pd.DataFrame(lignes).reindex(columns=colonnes).to_csv(chemin, mode='a', header=False, index=False,
+                                                          encoding='utf-8', sep='\t')
 
-    df_unified = pd.concat([df_arxiv, df_reddit], ignore_index=True, sort=False)
-    if 'nombre_commentaires' not in df_unified.columns:
-        df_unified['nombre_commentaires'] = 0
-    else:
-        df_unified['nombre_commentaires'] = df_unified['nombre_commentaires'].fillna(0)
-    if 'co_auteurs' not in df_unified.columns:
-        df_unified['co_auteurs'] = 'Aucun'
-    else:
-        df_unified['co_auteurs'] = df_unified['co_auteurs'].fillna('Aucun').replace('', 'Aucun')
-    df_unified['texte'] = df_unified['texte'].str.replace('\n', ' ').str.strip()
 
-    fichier_corpus = f"data/{nom_corpus}.csv"
-    df_unified.to_csv(fichier_corpus, index=False, encoding='utf-8', sep='\t')
+def actualiser_corpus(nom_corpus, taille_par_source=1000, mot_de_recherche=None, export_tsv=True):
+    """
+    Met à jour un corpus existant avec les documents publiés depuis son document le plus récent.
+
+    Seuls les documents nouveaux sont demandés aux API, les doublons (même URL ou même titre) sont écartés,
+    et seul le complément est écrit sur disque : il est ajouté au journal du corpus (voir Corpus.save_delta)
+    et, si l'export existe, à la fin de data/{nom_corpus}.csv.
 
-    corpus_articles = DocumentFactory.create_corpus(fichier_corpus, nom_corpus)
-    corpus_articles.save(f"data/{nom_corpus}.pkl")
+    :param nom_corpus: Le nom du corpus à actualiser (voir Corpus.chemin_fichier).
+    :param taille_par_source: Le nombre maximum de nouveaux documents à récupérer par source.
+    :param mot_de_recherche: Le mot-clé de recherche, pour les corpus créés avant qu'il ne soit conservé.
+    :param export_tsv: Si True, les nouveaux documents sont aussi ajoutés à l'export TSV.
+    :return: Le corpus actualisé.
+    """
+    fichier_corpus = Corpus.chemin_fichier(nom_corpus)
+    corpus_articles = Corpus.load(fichier_corpus)
+    mot_de_recherche = mot_de_recherche or getattr(corpus_articles, 'mot_de_recherche', None)
+    if not mot_de_recherche:
+        raise ValueError(f"Le mot-clé de recherche du corpus '{nom_corpus}' est inconnu, veuillez le préciser.")
+
+    # les dates des documents sont à la journée : on redemande le dernier jour, les doublons seront écartés
+    depuis = corpus_articles.newest_doc_date()
+    config = charger_config_json('config.json')
+    sources = {nom: partial(source, depuis=depuis) for nom, source in SOURCES.items()}
+    resultats = acquerir_sources_en_parallele(sources, mot_de_recherche, taille_par_source, config,
+                                              calculer_delais_par_defaut(taille_par_source))
+
+    urls_connues = {doc.url for doc in corpus_articles.id2doc.values()}
+    titres_connus = set(corpus_articles.id2doc)
+    nouvelles_lignes = []
+    for nom in SOURCES:
+        for ligne in resultats.get(nom, []):
+            if ligne['url'] in urls_connues or ligne['titre'] in titres_connus:
+                continue
+            urls_connues.add(ligne['url'])
+            titres_connus.add(ligne['titre'])
+            nouvelles_lignes.append(normaliser_ligne(ligne))
+
+    if nouvelles_lignes:
+        corpus_articles.add_documents(nouvelles_lignes)
+        corpus_articles.save_delta(fichier_corpus, nouvelles_lignes)
+        fichier_tsv = f"data/{nom_corpus}.csv"
+        if export_tsv and os.path.exists(fichier_tsv):
+            completer_tsv(nouvelles_lignes, fichier_tsv)
 
     return corpus_articles
 
@@ -160,6 +692,6 @@ if __name__ == "__main__":
     corpus_articles = appliquer_recherche(nom_corpus, mot_de_recherche, taille_par_source)
 
 
-    ex = Corpus.load('data/python.pkl')
+    ex = Corpus.load(Corpus.chemin_fichier(nom_corpus))
 
 
@@ -0,0 +1,963 @@
+"""
+Mesures de performance de l'application, sans accès réseau.
+
+Lancer depuis le répertoire "./application" :
+
+      $ python benchmarks.py
+"""
+import copy
+import glob
+import itertools
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from datetime import datetime as dt
+from functools import wraps
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import Fonctions_Acquisition_Donnees
+from Classe_Cache import CacheResultats
+from Classes_Data import Corpus, CACHE_TEXTES
+from Classes_Indexation import nettoyer_texte, nettoyer_textes, MatriceCollocations
+from Classes_Simulation import ServeurArxivSimule, RedditSimule
+
+
+
+@contextmanager
+def repertoire_de_travail_temporaire():
+    """
+    Place l'exécution dans un répertoire temporaire contenant un dossier 'data',
+    afin que les benchmarks n'écrivent pas dans les données de l'application.
+    """
+    repertoire_initial = os.getcwd()
+    with tempfile.TemporaryDirectory() as repertoire:
+        os.makedirs(os.path.join(repertoire, 'data'))
+        os.chdir(repertoire)
+        try:
+            yield repertoire
+        finally:
+            os.chdir(repertoire_initial)
+
+
+def creer_source_simulee(source, latence, taille_reponse=None):
+    """
+    Crée une source d'acquisition factice qui attend 'latence' secondes avant de répondre,
+    comme le ferait une API distante.
+
+    :param source: 'reddit' ou 'arxiv'.
+    :param latence: La latence simulée en secondes.
+    :param taille_reponse: Nombre de documents renvoyés, par défaut la taille demandée.
+    :return: Une fonction(mot_de_recherche, taille, config) -> liste de lignes du corpus.
+    """
+    def acquerir(mot_de_recherche, taille, config):
+        time.sleep(latence)
+        n = taille if taille_reponse is None else taille_reponse
+        date = dt(2024, 1, 1).strftime('%Y-%m-%d %H:%M:%S')
+        return [{
+            'titre': f"{source} {mot_de_recherche} {i}",
+            'auteur': f"auteur {i % 10}",
+            'date': date,
+            'texte': f"texte {i} sur {mot_de_recherche}",
+            'url': f"http://{source}.example/{i}",
+            'source': source,
+        } for i in range(n)]
+
+    return acquerir
+
+
+def benchmark_acquisition_parallele(latence_reddit=1.0, latence_arxiv=1.5, taille=100):
+    """
+    Compare la durée de appliquer_recherche en mode séquentiel et en mode parallèle,
+    avec des sources simulées ayant une latence artificielle.
+
+    En séquentiel la durée attendue est la somme des latences, en parallèle la latence maximale.
+    """
+    sources = {
+        'arxiv': creer_source_simulee('arxiv', latence_arxiv),
+        'reddit': creer_source_simulee('reddit', latence_reddit),
+    }
+    durees = {}
+    with repertoire_de_travail_temporaire(), patch.dict(Fonctions_Acquisition_Donnees.SOURCES, sources), \
+            patch('Fonctions_Acquisition_Donnees.charger_config_json', return_value={}):
+        for parallele in (False, True):
+            debut = time.perf_counter()
+            Fonctions_Acquisition_Donnees.appliquer_recherche("benchmark", "python", taille, parallele=parallele)
+            durees[parallele] = time.perf_counter() - debut
+
+    print("Acquisition : sources simulées "
+          f"(reddit {latence_reddit:.1f} s, arxiv {latence_arxiv:.1f} s, {taille} documents par source)")
+    print(f"  séquentiel : {durees[False]:.2f} s (somme des latences : {latence_reddit + latence_arxiv:.2f} s)")
+    print(f"  parallèle  : {durees[True]:.2f} s (latence maximale : {max(latence_reddit, latence_arxiv):.2f} s)")
+    return durees
+
+
+def creer_dataframe_synthetique(nombre):
+    """
+    Crée un DataFrame de documents au format d'un corpus acquis (moitié arXiv, moitié Reddit).
+
+    :param nombre: Le nombre de documents.
+    :return: Un DataFrame ayant les colonnes attendues par Corpus.from_dataframe.
+    """
+    indices = np.arange(nombre)
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(indices % 1500, unit='D')
+    return pd.DataFrame({
+        'source': np.where(indices % 2 == 0, 'arxiv', 'reddit'),
+        'titre': [f"titre {i}" for i in indices],
+        'auteur': [f"auteur {i % (nombre // 5 + 1)}" for i in indices],
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'url': [f"http://exemple.com/{i}" for i in indices],
+        'texte': [f"texte du document {i}" for i in indices],
+        'co_auteurs': 'Aucun',
+        'nombre_commentaires': indices % 50,
+    })
+
+
+def construire_par_iterrows(docs, nom):
+    """
+    Construction historique d'un corpus : un appel à add_document par ligne parcourue avec iterrows.
+    """
+    corpus = Corpus(nom)
+    for _, doc in docs.iterrows():
+        corpus.add_document(doc['source'], doc['titre'], doc['auteur'], doc['date'], doc['url'], doc['texte'],
+                            doc['co_auteurs'], doc['nombre_commentaires'])
+    return corpus
+
+
+def benchmark_construction_corpus(tailles=(10_000, 100_000, 1_000_000)):
+    """
+    Compare la construction d'un corpus avec iterrows et avec Corpus.from_dataframe.
+    """
+    print("Construction du corpus : iterrows + add_document contre Corpus.from_dataframe")
+    durees = {}
+    for taille in tailles:
+        docs = creer_dataframe_synthetique(taille)
+
+        debut = time.perf_counter()
+        construire_par_iterrows(docs, "iterrows")
+        duree_iterrows = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        Corpus.from_dataframe(docs, "from_dataframe")
+        duree_masse = time.perf_counter() - debut
+
+        durees[taille] = (duree_iterrows, duree_masse)
+        print(f"  {taille:>9} documents : iterrows {duree_iterrows:7.2f} s, from_dataframe {duree_masse:6.2f} s "
+              f"(x{duree_iterrows / duree_masse:.1f})")
+    return durees
+
+
+def taille_sur_disque(chemin):
+    """
+    Renvoie la taille en octets d'un fichier, ou de tous les fichiers d'un répertoire.
+    """
+    if os.path.isdir(chemin):
+        return sum(os.path.getsize(os.path.join(chemin, nom)) for nom in os.listdir(chemin))
+    return os.path.getsize(chemin)
+
+
+def mesurer_formats(corpus, nom, repertoire, repetitions):
+    """
+    Mesure la taille et les durées de sauvegarde et de chargement d'un corpus dans les deux formats.
+    """
+    chemins = {'pickle': os.path.join(repertoire, nom + ".pkl"),
+               'colonnes': os.path.join(repertoire, nom + ".corpus")}
+    mesures = {}
+    for format, chemin in chemins.items():
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            corpus.save(chemin)
+        duree_sauvegarde = (time.perf_counter() - debut) / repetitions
+
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            Corpus.load(chemin)
+        duree_chargement = (time.perf_counter() - debut) / repetitions
+        mesures[format] = (taille_sur_disque(chemin), duree_sauvegarde, duree_chargement)
+
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        Corpus.lire_colonnes(chemins['colonnes'], ['titre', 'date'])
+    mesures['titres et dates'] = (None, None, (time.perf_counter() - debut) / repetitions)
+
+    print(f"  {nom} ({corpus.ndoc} documents)")
+    for format, (taille, duree_sauvegarde, duree_chargement) in mesures.items():
+        if taille is None:
+            print(f"    colonnes, titres et dates seuls : chargement {duree_chargement * 1000:7.1f} ms")
+        else:
+            print(f"    {format:<8} : {taille / 1024:9.1f} Ko, sauvegarde {duree_sauvegarde * 1000:7.1f} ms, "
+                  f"chargement {duree_chargement * 1000:7.1f} ms")
+    os.remove(chemins['pickle'])
+    shutil.rmtree(chemins['colonnes'])
+    return mesures
+
+
+def benchmark_format_colonnes(fichiers=None, taille_synthetique=100_000, repetitions=3):
+    """
+    Compare le format pickle et le format en colonnes (Parquet) : taille sur disque, durées de sauvegarde
+    et de chargement, et lecture des seuls titres et dates.
+
+    Les mesures portent sur les corpus de data/ puis sur un corpus synthétique plus volumineux.
+    """
+    fichiers = sorted(glob.glob(os.path.join("data", "*.pkl"))) if fichiers is None else fichiers
+    print("Format de sauvegarde : pickle contre colonnes (Parquet)")
+    resultats = {}
+    with tempfile.TemporaryDirectory() as repertoire:
+        for fichier in fichiers:
+            with open(fichier, 'rb') as file:
+                corpus = pickle.load(file)
+            nom = os.path.splitext(os.path.basename(fichier))[0]
+            resultats[nom] = mesurer_formats(corpus, nom, repertoire, repetitions)
+        if taille_synthetique:
+            corpus = Corpus.from_dataframe(creer_dataframe_synthetique(taille_synthetique), "synthetique")
+            resultats["synthetique"] = mesurer_formats(corpus, "synthetique", repertoire, repetitions)
+    return resultats
+
+
+def benchmark_chargement_paresseux(taille=20_000, nombre_corpus=5, lectures=100):
+    """
+    Compare le chargement complet et le chargement paresseux d'un corpus au format en colonnes :
+    durée d'ouverture, lecture de quelques textes, et mémoire occupée par plusieurs corpus ouverts simultanément.
+    """
+    docs = creer_dataframe_synthetique(taille)
+    docs['texte'] = docs['texte'] + " " + "lorem ipsum dolor sit amet " * 40
+    print(f"Chargement d'un corpus en colonnes : complet contre paresseux ({taille} documents)")
+    resultats = {}
+    with tempfile.TemporaryDirectory() as repertoire:
+        chemin = os.path.join(repertoire, "synthetique.corpus")
+        Corpus.from_dataframe(docs, "synthetique").save(chemin)
+        titres = docs['titre'].sample(lectures, random_state=0).tolist()
+
+        for paresseux in (False, True):
+            CACHE_TEXTES.vider()
+            debut = time.perf_counter()
+            corpus = Corpus.load(chemin, paresseux=paresseux)
+            duree_chargement = time.perf_counter() - debut
+
+            debut = time.perf_counter()
+            for titre in titres:
+                corpus.id2doc[titre].texte
+            duree_lectures = time.perf_counter() - debut
+            del corpus
+
+            CACHE_TEXTES.vider()
+            tracemalloc.start()
+            corpus_ouverts = [Corpus.load(chemin, paresseux=paresseux) for _ in range(nombre_corpus)]
+            for corpus in corpus_ouverts:
+                ' '.join(str(doc.texte) for doc in corpus.id2doc.values())
+            memoire = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del corpus_ouverts
+
+            resultats[paresseux] = (duree_chargement, duree_lectures, memoire)
+            print(f"  {'paresseux' if paresseux else 'complet  '} : chargement {duree_chargement * 1000:7.1f} ms, "
+                  f"{lectures} textes lus en {duree_lectures * 1000:6.1f} ms, "
+                  f"{nombre_corpus} corpus ouverts et parcourus : {memoire / 1024 ** 2:6.1f} Mo")
+    print(f"  budget du cache des textes : {CACHE_TEXTES.budget / 1024 ** 2:.0f} Mo")
+    return resultats
+
+
+class Chronometre:
+    """
+    Classe cumulant le temps passé dans chaque étape d'un traitement.
+
+    Les étapes peuvent s'imbriquer (la lecture d'un flux déclenche son téléchargement) :
+    le temps d'une étape imbriquée n'est compté que pour elle, et non pour l'étape englobante.
+    Les temps des différents threads s'additionnent.
+    """
+
+    def __init__(self):
+        self.durees = defaultdict(float)
+        self._local = threading.local()
+        self._verrou = threading.Lock()
+
+    @contextmanager
+    def etape(self, nom):
+        pile = self._local.__dict__.setdefault('pile', [])
+        pile.append(0.0)  # temps des étapes imbriquées
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = time.perf_counter() - debut
+            duree_imbriquee = pile.pop()
+            with self._verrou:
+                self.durees[nom] += duree - duree_imbriquee
+            if pile:
+                pile[-1] += duree
+
+    def fonction(self, nom, fonction):
+        """
+        Renvoie la fonction dont chaque appel est compté dans l'étape 'nom'.
+        """
+        @wraps(fonction)
+        def chronometree(*args, **kwargs):
+            with self.etape(nom):
+                return fonction(*args, **kwargs)
+        return chronometree
+
+    def generateur(self, nom, fonction):
+        """
+        Renvoie la fonction génératrice dont la production de chaque élément est comptée dans l'étape 'nom'.
+        """
+        @wraps(fonction)
+        def chronometree(*args, **kwargs):
+            elements = fonction(*args, **kwargs)
+            while True:
+                with self.etape(nom):
+                    try:
+                        element = next(elements)
+                    except StopIteration:
+                        return
+                yield element
+        return chronometree
+
+
+@contextmanager
+def acquisition_simulee(serveur_arxiv, reddit, chronometre=None):
+    """
+    Redirige l'acquisition vers le serveur arXiv simulé et le client praw factice, sans cache ni délai
+    entre requêtes, et instrumente les étapes de appliquer_recherche si un chronomètre est fourni.
+
+    Les étapes mesurées sont le téléchargement, la lecture des réponses, la création du DataFrame
+    et l'écriture du fichier de l'export, la construction du corpus et sa sauvegarde. L'export étant écrit
+    au fil de la construction du corpus, la durée de celle-ci inclut l'attente des blocs de l'export.
+    """
+    module = Fonctions_Acquisition_Donnees
+    config = {'REDDIT': {'client_id': 'simule', 'client_secret': 'simule', 'user_agent': 'benchmark'}}
+    with ExitStack() as pile:
+        pile.enter_context(patch.object(module, 'URL_API_ARXIV', serveur_arxiv.url))
+        pile.enter_context(patch.object(module, 'DELAI_ENTRE_REQUETES_ARXIV', 0))
+        pile.enter_context(patch.object(module.praw, 'Reddit', reddit))
+        pile.enter_context(patch.object(module, 'charger_config_json', return_value=config))
+        if chronometre is not None:
+            pile.enter_context(patch.object(reddit, 'search', chronometre.generateur('téléchargement', reddit.search)))
+            for nom, etape, instrumenter in (
+                    ('telecharger_url', 'téléchargement', chronometre.fonction),
+                    ('lire_entrees_arxiv', 'lecture', chronometre.generateur),
+                    ('extraire_lignes_reddit', 'lecture', chronometre.generateur),
+                    ('exporter_tsv', 'DataFrame', chronometre.fonction)):
+                pile.enter_context(patch.object(module, nom, instrumenter(etape, getattr(module, nom))))
+            pile.enter_context(patch.object(pd.DataFrame, 'to_csv', chronometre.fonction('CSV', pd.DataFrame.to_csv)))
+            pile.enter_context(patch.object(Corpus, 'add_documents',
+                                            chronometre.fonction('construction du corpus', Corpus.add_documents)))
+            pile.enter_context(patch.object(Corpus, 'save', chronometre.fonction('sauvegarde', Corpus.save)))
+        yield
+
+
+def benchmark_appliquer_recherche(nombre_documents=1000, latence_arxiv=0.05, latence_reddit=0.05,
+                                  parallele=True):
+    """
+    Mesure appliquer_recherche de bout en bout contre un serveur arXiv local et un client praw factice :
+    débit (documents par seconde), temps cumulé par étape et pic de mémoire.
+
+    Le pic de mémoire est mesuré lors d'une seconde exécution, tracemalloc ralentissant le traitement.
+    """
+    print(f"Acquisition simulée : appliquer_recherche, {nombre_documents} documents par source, "
+          f"latence par page arXiv {latence_arxiv} s et Reddit {latence_reddit} s, "
+          f"{'parallèle' if parallele else 'séquentiel'}")
+    reddit = RedditSimule(nombre_posts=nombre_documents, latence=latence_reddit)
+    with ServeurArxivSimule(nombre_articles=nombre_documents, latence=latence_arxiv) as serveur_arxiv, \
+            repertoire_de_travail_temporaire():
+        chronometre = Chronometre()
+        with acquisition_simulee(serveur_arxiv, reddit, chronometre):
+            debut = time.perf_counter()
+            corpus = Fonctions_Acquisition_Donnees.appliquer_recherche("benchmark", "python", nombre_documents,
+                                                                       parallele=parallele)
+            duree = time.perf_counter() - debut
+
+        with acquisition_simulee(serveur_arxiv, reddit):
+            tracemalloc.start()
+            Fonctions_Acquisition_Donnees.appliquer_recherche("benchmark", "python", nombre_documents,
+                                                              parallele=parallele)
+            pic_memoire = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    print(f"  {corpus.ndoc} documents en {duree:.2f} s : {corpus.ndoc / duree:,.0f} documents/s, "
+          f"pic de mémoire {pic_memoire / 1024 ** 2:.1f} Mo")
+    print(f"  requêtes : arXiv {serveur_arxiv.nombre_requetes // 2}, Reddit {reddit.nombre_requetes // 2}")
+    for etape, duree_etape in chronometre.durees.items():
+        print(f"    {etape:<24} {duree_etape:7.3f} s")
+    return {'duree': duree, 'debit': corpus.ndoc / duree, 'pic_memoire': pic_memoire,
+            'etapes': dict(chronometre.durees)}
+
+
+def benchmark_session_http(nombre_pages=200, taille_page=100, connexions=4, latence_connexion=0.03):
+    """
+    Compare le téléchargement de pages du serveur arXiv simulé avec une connexion par requête (urlopen)
+    et avec la session HTTP partagée, en séquence puis depuis plusieurs threads.
+
+    Le serveur simulé attend 'latence_connexion' secondes à chaque nouvelle connexion, ce que coûtent
+    les poignées de main TCP et TLS avec un serveur distant.
+    """
+    module = Fonctions_Acquisition_Donnees
+    print(f"Téléchargement de {nombre_pages} pages arXiv simulées : urlopen contre session HTTP partagée")
+    resultats = {}
+    with ServeurArxivSimule(nombre_articles=nombre_pages * taille_page, longueur_resume=500,
+                            latence_connexion=latence_connexion) as serveur:
+        urls = [module.construire_requete_arxiv("python", debut, taille_page).replace(module.URL_API_ARXIV,
+                                                                                      serveur.url)
+                for debut in range(0, nombre_pages * taille_page, taille_page)]
+
+        def urlopen(url):
+            with urllib.request.urlopen(url) as reponse:
+                return reponse.read()
+
+        session = module.creer_session_http(connexions_max=connexions)
+        for nom, telecharger, nombre_threads in (('urlopen', urlopen, 1),
+                                                 ('session', module.telecharger_url, 1),
+                                                 (f'urlopen, {connexions} threads', urlopen, connexions),
+                                                 (f'session, {connexions} threads', module.telecharger_url,
+                                                  connexions)):
+            connexions_avant, octets_avant = serveur.nombre_connexions, serveur.octets_envoyes
+            with patch.object(module, '_session_http', session):
+                debut = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=nombre_threads) as executeur:
+                    list(executeur.map(telecharger, urls))
+                duree = time.perf_counter() - debut
+            resultats[nom] = duree
+            print(f"  {nom:<20} : {duree:6.2f} s, {nombre_pages / duree:6.0f} pages/s, "
+                  f"{serveur.nombre_connexions - connexions_avant:3} connexions ouvertes, "
+                  f"{(serveur.octets_envoyes - octets_avant) / 1024 ** 2:5.1f} Mo transférés")
+    return resultats
+
+
+def creer_corpus_textes_reels(repetitions=10, fichier=os.path.join("data", "corpus_1.pkl")):
+    """
+    Crée un corpus synthétique dont les textes sont ceux d'un corpus de data/, répétés sous d'autres titres
+    et à d'autres dates, afin de mesurer les analyses textuelles sur un vocabulaire réaliste.
+    """
+    with open(fichier, 'rb') as file:
+        docs_reels = list(pickle.load(file).id2doc.values())
+    docs = creer_dataframe_synthetique(len(docs_reels) * repetitions)
+    docs['texte'] = [docs_reels[i % len(docs_reels)].texte for i in range(len(docs))]
+    return Corpus.from_dataframe(docs, "textes réels")
+
+
+def benchmark_cache_jetons(repetitions=10):
+    """
+    Mesure le scénario vision d'ensemble puis comparaison avant / après une date, en nettoyant les textes
+    à chaque analyse (comportement historique) puis en réutilisant les jetons conservés par les documents.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    date_limite = sorted(doc.date for doc in corpus.id2doc.values())[corpus.ndoc // 2]
+    print(f"Analyses successives sur {corpus.ndoc} documents : nettoyage à chaque analyse contre jetons conservés")
+
+    def oublier_jetons(*corpus_analyses):
+        for corpus_analyse in corpus_analyses:
+            for doc in corpus_analyse.id2doc.values():
+                doc._jetons = None
+
+    resultats = {}
+    for conserver in (False, True):
+        oublier_jetons(corpus)
+        debut = time.perf_counter()
+        corpus.nombre_mots_uniques()
+        avant = corpus.copier_et_filtrer_avant_date(date_limite)
+        apres = corpus.copier_et_filtrer_apres_date(date_limite)
+        for sous_corpus in (avant, apres):
+            for _ in range(2):  # la comparaison construit le vocabulaire puis compte les mots
+                if not conserver:
+                    oublier_jetons(sous_corpus)
+                sous_corpus.construire_vocabulaire()
+        resultats[conserver] = time.perf_counter() - debut
+        print(f"  {'jetons conservés' if conserver else 'nettoyage répété'} : {resultats[conserver]:.2f} s")
+    return resultats
+
+
+def benchmark_matrice_documents_termes(repetitions=(1, 10, 50)):
+    """
+    Compare le DataFrame dense de calculer_frequences (une cellule par document et par mot)
+    et la matrice creuse de matrice_documents_termes : durée de construction et mémoire occupée.
+    Les jetons des documents sont calculés au préalable, pour ne mesurer que le comptage.
+    """
+    print("Fréquences par document : DataFrame dense contre matrice creuse (CSR)")
+    resultats = {}
+    for repetition in repetitions:
+        corpus = creer_corpus_textes_reels(repetition)
+        corpus.nombre_mots_uniques()
+
+        debut = time.perf_counter()
+        matrice = corpus.matrice_documents_termes()
+        duree_creuse = time.perf_counter() - debut
+        memoire_creuse = matrice.matrice.data.nbytes + matrice.matrice.indices.nbytes + matrice.matrice.indptr.nbytes
+
+        cellules = matrice.shape[0] * matrice.shape[1]
+        ligne = (f"  {matrice.shape[0]:>6} documents × {matrice.shape[1]} termes : "
+                 f"creuse {duree_creuse * 1000:7.1f} ms, {memoire_creuse / 1024 ** 2:6.1f} Mo")
+        if cellules <= 50_000_000:
+            debut = time.perf_counter()
+            frequences = corpus.calculer_frequences(corpus.construire_vocabulaire())
+            duree_dense = time.perf_counter() - debut
+            memoire_dense = frequences.memory_usage(index=False).sum()
+            ligne += f" | dense {duree_dense * 1000:8.1f} ms, {memoire_dense / 1024 ** 2:7.1f} Mo"
+        else:
+            duree_dense = memoire_dense = None
+            ligne += f" | dense non mesuré ({cellules * 8 / 1024 ** 3:.1f} Go)"
+        resultats[matrice.shape[0]] = (duree_creuse, memoire_creuse, duree_dense, memoire_dense)
+        print(ligne)
+    return resultats
+
+
+def benchmark_nettoyage_par_lot(repetitions=(1, 10, 50)):
+    """
+    Compare le nettoyage des textes document par document (nettoyer_texte) et en un seul traitement
+    (nettoyer_textes), après avoir vérifié que les deux donnent le même résultat.
+    """
+    print("Nettoyage des textes : document par document contre traitement par lot")
+    resultats = {}
+    for repetition in repetitions:
+        corpus = creer_corpus_textes_reels(repetition)
+        textes = [doc.texte for doc in corpus.id2doc.values()]
+
+        debut = time.perf_counter()
+        par_document = [nettoyer_texte(texte) for texte in textes]
+        duree_par_document = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        par_lot = nettoyer_textes(textes)
+        duree_par_lot = time.perf_counter() - debut
+
+        assert par_lot == par_document, "le nettoyage par lot diffère de nettoyer_texte"
+        resultats[len(textes)] = (duree_par_document, duree_par_lot)
+        print(f"  {len(textes):>6} textes : par document {duree_par_document:6.2f} s, "
+              f"par lot {duree_par_lot:6.2f} s (x{duree_par_document / duree_par_lot:.1f})")
+    return resultats
+
+
+def benchmark_index_inverse(repetitions=100, requetes=("data", "learn*", '"machine learning"',
+                                                       "(neural OR deep) AND network* NOT survey")):
+    """
+    Compare la recherche par expression régulière sur le texte concaténé et la recherche par l'index inversé :
+    construction de l'index, puis durée de chaque requête (moyenne sur plusieurs appels).
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    debut = time.perf_counter()
+    index = corpus.index_inverse()
+    duree_construction = time.perf_counter() - debut
+    corpus.concatener_textes()
+    print(f"Recherche dans {corpus.ndoc} documents ({index.nombre_mots} mots) : "
+          f"expression régulière contre index inversé (construit en {duree_construction:.2f} s)")
+
+    resultats = {'construction': duree_construction}
+    for requete in requetes:
+        debut = time.perf_counter()
+        for _ in range(10):
+            documents = corpus.search(requete, mode='index')
+        duree_index = (time.perf_counter() - debut) / 10
+        ligne = f"  {requete:<45} index {duree_index * 1000:7.2f} ms ({len(documents)} documents)"
+        duree_regex = None
+        if ' ' not in requete and '"' not in requete:  # un terme ou un préfixe : équivalent regex
+            motif = r'(?i)\b' + requete.replace('*', r'\w*') + r'\b'
+            debut = time.perf_counter()
+            corpus.search(motif)
+            duree_regex = time.perf_counter() - debut
+            ligne += f" | regex {duree_regex * 1000:8.2f} ms"
+        resultats[requete] = (duree_index, duree_regex)
+        print(ligne)
+    return resultats
+
+
+def concorde_texte_concatene(corpus, expression, taille_contexte):
+    """
+    Concordancier historique : une expression régulière appliquée au texte concaténé de tout le corpus,
+    dont toutes les occurrences sont rassemblées dans un DataFrame.
+    """
+    corpus.concatener_textes()
+    motif = re.compile(r'(.{{0,{}}})({})(.{{0,{}}})'.format(taille_contexte, re.escape(expression), taille_contexte))
+    return pd.DataFrame([{'contexte gauche': m.group(1), 'motif trouvé': m.group(2), 'contexte droit': m.group(3)}
+                         for m in motif.finditer(corpus.texte_concatene)])
+
+
+def benchmark_concordancier(repetitions=100, expression="data", taille_contexte=30, resultats_par_page=10):
+    """
+    Mesure l'affichage de la première page de concordances d'un mot fréquent : concordancier historique
+    (toutes les occurrences calculées sur le texte concaténé) contre parcours à la demande, par les textes
+    ou par l'index inversé, arrêté après une page.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    print(f"Première page de concordances de '{expression}' dans {corpus.ndoc} documents")
+    resultats = {}
+
+    tracemalloc.start()
+    debut = time.perf_counter()
+    concordances = concorde_texte_concatene(corpus, expression, taille_contexte)
+    resultats['historique'] = (time.perf_counter() - debut, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    print(f"  historique (texte concaténé) : {resultats['historique'][0] * 1000:8.1f} ms, "
+          f"{resultats['historique'][1] / 1024 ** 2:6.1f} Mo, {len(concordances)} occurrences calculées")
+    corpus.texte_concatene = None
+
+    corpus.index_inverse()  # l'index est construit une fois pour toutes les recherches
+    for mode in ('regex', 'index'):
+        tracemalloc.start()
+        debut = time.perf_counter()
+        corpus.page_concordances(expression, taille_contexte, 1, resultats_par_page, mode)
+        resultats[mode] = (time.perf_counter() - debut, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        print(f"  à la demande, mode {mode:<5}       : {resultats[mode][0] * 1000:8.1f} ms, "
+              f"{resultats[mode][1] / 1024 ** 2:6.1f} Mo")
+    return resultats
+
+
+def benchmark_ajouts_incrementaux(repetitions=50, tours=20, documents_par_tour=10):
+    """
+    Simule un corpus alimenté en continu : à chaque tour, quelques documents sont ajoutés puis le corpus
+    est interrogé (expression régulière et index inversé). Compare la reconstruction complète
+    des structures dérivées après chaque ajout et leur mise à jour incrémentale.
+    """
+    print(f"{tours} tours d'ajout de {documents_par_tour} documents suivis d'une recherche : "
+          f"reconstruction contre mise à jour incrémentale")
+    resultats = {}
+    for incremental in (False, True):
+        corpus = creer_corpus_textes_reels(repetitions)
+        nouveaux = creer_corpus_textes_reels(1)
+        nouveaux = iter(list(nouveaux.id2doc.values()))
+        corpus.search("data")
+        corpus.search("data", mode='index')
+
+        debut = time.perf_counter()
+        for tour in range(tours):
+            for i in range(documents_par_tour):
+                doc = next(nouveaux)
+                corpus.add_document("arxiv", f"ajout {tour} {i}", doc.auteur, dt(2024, 1, 1), doc.url, doc.texte, None)
+            if not incremental:
+                corpus.texte_concatene = None
+                corpus._index_inverse = None
+            corpus.search("data")
+            corpus.search("data", mode='index')
+        resultats[incremental] = time.perf_counter() - debut
+        print(f"  {'incrémental' if incremental else 'reconstruction'} : {resultats[incremental]:.2f} s "
+              f"pour {corpus.ndoc} documents")
+    return resultats
+
+
+def benchmark_tfidf_incremental(repetitions=100, tours=10, documents_par_tour=100):
+    """
+    Simule l'actualisation continue d'un corpus : à chaque tour, des documents sont ajoutés puis une recherche
+    par similarité (rechercher_documents) est lancée. Compare le réajustement d'un TfidfVectorizer sur tout
+    le corpus et le modèle incrémental, puis l'écart entre leurs classements.
+    """
+    print(f"{tours} tours d'ajout de {documents_par_tour} documents suivis d'une recherche TF-IDF : "
+          f"réajustement complet contre modèle incrémental")
+    resultats = {}
+    classements = {}
+    for incremental in (False, True):
+        corpus = creer_corpus_textes_reels(repetitions)
+        nouveaux = iter(list(creer_corpus_textes_reels(tours * documents_par_tour // 380 + 1).id2doc.values()))
+        corpus.vectoriser_documents(incremental=incremental)
+
+        debut = time.perf_counter()
+        for tour in range(tours):
+            for i in range(documents_par_tour):
+                doc = next(nouveaux)
+                corpus.add_document("arxiv", f"ajout {tour} {i}", doc.auteur, dt(2024, 1, 1), doc.url, doc.texte, None)
+            classement = corpus.rechercher_documents("deep neural network")
+        resultats[incremental] = time.perf_counter() - debut
+        classements[incremental] = classement['Document'].head(100).tolist()
+        print(f"  {'incrémental' if incremental else 'réajustement'} : {resultats[incremental]:.2f} s "
+              f"pour {corpus.ndoc} documents")
+    communs = len(set(classements[False]) & set(classements[True]))
+    print(f"  documents communs aux 100 premiers résultats : {communs}")
+    return resultats
+
+
+def creer_requetes(corpus, nombre, mots_par_requete=3, graine=0):
+    """
+    Crée des requêtes synthétiques, formées de mots tirés au hasard dans les textes du corpus.
+    """
+    generateur = np.random.default_rng(graine)
+    textes = [doc.texte for doc in corpus.id2doc.values() if isinstance(doc.texte, str) and doc.texte.split()]
+    requetes = []
+    for i in generateur.integers(len(textes), size=nombre):
+        mots = textes[i].split()
+        requetes.append(' '.join(mots[j] for j in generateur.integers(len(mots), size=mots_par_requete)))
+    return requetes
+
+
+def benchmark_recherche_par_lot(repetitions=100, nombre_requetes=1000, k=10):
+    """
+    Rejoue un journal de requêtes : recherche complète suivie de head(k) pour chaque requête (comportement
+    historique), recherche des k meilleurs pour chaque requête, puis traitement de toutes les requêtes par lot.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    corpus.vectoriser_documents()
+    requetes = creer_requetes(corpus, nombre_requetes)
+    print(f"{nombre_requetes} requêtes sur {corpus.ndoc} documents (durée par requête)")
+    resultats = {}
+
+    echantillon = requetes[:100]  # la méthode historique est mesurée sur un échantillon
+    debut = time.perf_counter()
+    for requete in echantillon:
+        corpus.rechercher_documents(requete).head(k)
+    resultats['historique'] = (time.perf_counter() - debut) / len(echantillon)
+
+    debut = time.perf_counter()
+    for requete in requetes:
+        corpus.rechercher_documents(requete, k=k)
+    resultats['k meilleurs'] = (time.perf_counter() - debut) / len(requetes)
+
+    debut = time.perf_counter()
+    corpus.rechercher_documents_par_lot(requetes, k=k)
+    resultats['par lot'] = (time.perf_counter() - debut) / len(requetes)
+
+    for methode, duree in resultats.items():
+        print(f"  {methode:<12} : {duree * 1000:7.3f} ms")
+    return resultats
+
+
+def benchmark_index_semantique(repetitions=100, nombre_requetes=200, k=10, dimensions=200, nombre_groupes=200):
+    """
+    Compare, pour des requêtes traitées une à une, la recherche TF-IDF exacte, la recherche sémantique
+    exhaustive et la recherche sémantique approchée (groupes), ainsi que le rappel de cette dernière
+    par rapport à la recherche sémantique exhaustive.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    corpus.vectoriser_documents()
+    requetes = creer_requetes(corpus, nombre_requetes)
+    print(f"Recherche des {k} meilleurs documents parmi {corpus.ndoc} : TF-IDF exact contre index sémantique "
+          f"({dimensions} dimensions)")
+    resultats = {}
+
+    def mesurer(nom, **parametres):
+        debut = time.perf_counter()
+        trouves = [corpus.rechercher_documents(requete, k=k, **parametres)['Score'].to_numpy() for requete in requetes]
+        resultats[nom] = (time.perf_counter() - debut) / len(requetes)
+        return trouves
+
+    mesurer('TF-IDF exact')
+    for nom, groupes in (('sémantique exhaustif', None), ('sémantique approché', nombre_groupes)):
+        debut = time.perf_counter()
+        corpus.construire_index_semantique(dimensions, groupes)
+        construction = time.perf_counter() - debut
+        trouves = mesurer(nom, semantique=True)
+        if groupes is None:
+            exhaustifs = trouves
+        print(f"  construction de l'index {nom} : {construction:.1f} s")
+    # les textes étant répétés, plusieurs documents ont le même score : le rappel compte les documents trouvés
+    # dont le score atteint celui du k-ième document de la recherche exhaustive
+    rappel = np.mean([np.sum(approches >= exacts[-1] - 1e-6) / len(exacts)
+                      for approches, exacts in zip(trouves, exhaustifs) if len(exacts)])
+
+    for nom, duree in resultats.items():
+        print(f"  {nom:<22} : {duree * 1000:7.2f} ms par requête")
+    print(f"  rappel de la recherche approchée : {rappel:.2f}")
+    return resultats
+
+
+def benchmark_bm25(repetitions=100, nombre_requetes=1000, k=10):
+    """
+    Compare la recherche des k meilleurs documents par similarité cosinus TF-IDF et par BM25
+    (construction du modèle, requêtes une à une et par lot).
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    corpus.vectoriser_documents()
+    requetes = creer_requetes(corpus, nombre_requetes)
+    print(f"{nombre_requetes} requêtes sur {corpus.ndoc} documents : TF-IDF contre BM25 (durée par requête)")
+
+    debut = time.perf_counter()
+    corpus.construire_bm25()
+    print(f"  construction du modèle BM25 : {time.perf_counter() - debut:.2f} s")
+
+    resultats = {}
+    for classement in ('tfidf', 'bm25'):
+        corpus.rechercher_documents(requetes[0], k=k, classement=classement)  # structures construites hors mesure
+        debut = time.perf_counter()
+        for requete in requetes:
+            corpus.rechercher_documents(requete, k=k, classement=classement)
+        resultats[f"{classement} une à une"] = (time.perf_counter() - debut) / len(requetes)
+        debut = time.perf_counter()
+        corpus.rechercher_documents_par_lot(requetes, k=k, classement=classement)
+        resultats[f"{classement} par lot"] = (time.perf_counter() - debut) / len(requetes)
+
+    for nom, duree in resultats.items():
+        print(f"  {nom:<16} : {duree * 1000:7.3f} ms")
+    return resultats
+
+
+def benchmark_cache_recherches(repetitions=100, nombre_requetes=50, rejeux=10, k=5):
+    """
+    Simule une session interactive où chaque requête est relancée plusieurs fois (pagination, retouches
+    de casse ou d'espaces), sans puis avec le cache des résultats de rechercher_documents.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    corpus.vectoriser_documents()
+    requetes = creer_requetes(corpus, nombre_requetes)
+    session = [requete.upper() if i % 2 else f" {requete} " for requete in requetes for i in range(rejeux)]
+    print(f"Session de {len(session)} recherches ({nombre_requetes} requêtes distinctes) sur {corpus.ndoc} documents")
+
+    resultats = {}
+    for nom, taille_max in (('sans cache', 0), ('avec cache', 256)):
+        corpus.cache_recherches = CacheResultats(taille_max=taille_max)
+        debut = time.perf_counter()
+        for requete in session:
+            corpus.rechercher_documents(requete, k=k)
+        resultats[nom] = (time.perf_counter() - debut) / len(session)
+        print(f"  {nom:<10} : {resultats[nom] * 1000:7.3f} ms par recherche "
+              f"({corpus.cache_recherches.succes} succès, {corpus.cache_recherches.echecs} échecs)")
+    return resultats
+
+
+def benchmark_tfidf_enregistre(repetitions=100, requete="neural network"):
+    """
+    Mesure le chargement d'un corpus au format en colonnes suivi d'une première recherche, selon que
+    le modèle TF-IDF a été enregistré avec le corpus ou doit être réajusté.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    print(f"Chargement puis première recherche sur {corpus.ndoc} documents")
+    with tempfile.TemporaryDirectory() as repertoire:
+        for nom, vectoriser in (('sans modèle', False), ('modèle enregistré', True)):
+            chemin = os.path.join(repertoire, f"{vectoriser}.corpus")
+            if vectoriser:
+                corpus.vectoriser_documents()
+            corpus.save(chemin)
+            debut = time.perf_counter()
+            charge = Corpus.load(chemin)
+            chargement = time.perf_counter() - debut
+            charge.rechercher_documents(requete, k=10)
+            total = time.perf_counter() - debut
+            print(f"  {nom:<18} : chargement {chargement:.2f} s, première recherche {total - chargement:.2f} s")
+
+
+def calculer_cooccurrences_historique(documents, mots):
+    """
+    Comptage des co-occurrences tel qu'il était réalisé par Interface.calculer_cooccurrences : pour chaque
+    document et chaque couple de mots, recherche des deux mots dans la liste des mots du texte.
+    """
+    cooccurrences = defaultdict(int)
+    for doc in documents:
+        texte = str(doc.texte).split() if doc.texte is not None else []
+        for combinaison in itertools.combinations(mots, 2):
+            if all(mot in texte for mot in combinaison):
+                cooccurrences[combinaison] += 1
+    return cooccurrences
+
+
+def benchmark_cooccurrences(repetitions=100, nombre_mots=50):
+    """
+    Compare le comptage historique des co-occurrences et Corpus.cooccurrences (premier appel, qui construit
+    la matrice documents × termes, puis appel suivant avec d'autres mots).
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    frequences = corpus.matrice_documents_termes().frequences_totales().sort_values(ascending=False)
+    mots = frequences.index[:nombre_mots].tolist()
+    print(f"Co-occurrences de {nombre_mots} mots sur {corpus.ndoc} documents")
+
+    echantillon = list(corpus.id2doc.values())[::10]  # la méthode historique est mesurée sur un dixième du corpus
+    debut = time.perf_counter()
+    calculer_cooccurrences_historique(echantillon, mots)
+    print(f"  historique (extrapolé) : {(time.perf_counter() - debut) * 10:.1f} s")
+
+    for nom, selection in (('premier appel', mots), ('appel suivant', frequences.index[nombre_mots:2 * nombre_mots])):
+        debut = time.perf_counter()
+        corpus.cooccurrences(selection)
+        print(f"  {nom:<22} : {time.perf_counter() - debut:.3f} s")
+
+
+def benchmark_collocations(repetitions=100, fenetre=5, tailles_blocs=(20, 100, 1000),
+                           requetes=("learning", "network", "data")):
+    """
+    Mesure la construction de la matrice des collocations (fenêtre de ±'fenetre' mots) selon la taille
+    des blocs et selon le nombre de threads, puis les requêtes des meilleurs collocats par PMI et par
+    rapport de vraisemblance.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    corpus.matrice_documents_termes()  # les textes sont nettoyés hors mesure
+    jetons = [doc.jetons() for doc in corpus.id2doc.values()]
+    print(f"Collocations (fenêtre ±{fenetre}) sur {corpus.ndoc} documents, {sum(map(len, jetons))} mots")
+
+    for taille_bloc in tailles_blocs:
+        debut = time.perf_counter()
+        MatriceCollocations(fenetre).ajouter(jetons, taille_bloc=taille_bloc, nombre_threads=1)
+        print(f"  construction, blocs de {taille_bloc} documents : {time.perf_counter() - debut:.2f} s")
+
+    for nombre_threads in (1, 4):
+        debut = time.perf_counter()
+        matrice = MatriceCollocations(fenetre).ajouter(jetons, nombre_threads=nombre_threads)
+        print(f"  construction, {nombre_threads} thread(s) : {time.perf_counter() - debut:.2f} s "
+              f"({matrice.matrice.nnz} couples distincts)")
+
+    for mesure in ('pmi', 'llr'):
+        debut = time.perf_counter()
+        for mot in requetes:
+            matrice.collocats(mot, n=10, mesure=mesure, minimum=5)
+        print(f"  10 meilleurs collocats ({mesure}) : {(time.perf_counter() - debut) / len(requetes) * 1000:.2f} ms")
+
+
+def diviser_par_copie_profonde(corpus, date_limite):
+    """
+    Division d'un corpus selon une date telle qu'elle était réalisée par copier_et_filtrer_avant_date et
+    copier_et_filtrer_apres_date : copie profonde de tout le corpus pour chaque moitié, puis filtrage.
+    """
+    moities = []
+    for garder in (lambda doc: doc.date < date_limite, lambda doc: doc.date >= date_limite):
+        copie = copy.deepcopy(corpus)
+        copie.id2doc = {titre: doc for titre, doc in copie.id2doc.items() if garder(doc)}
+        copie.ndoc = len(copie.id2doc)
+        copie.naut = len({doc.auteur for doc in copie.id2doc.values()})
+        moities.append(copie)
+    return moities
+
+
+def benchmark_vues_par_dates(repetitions=100):
+    """
+    Compare, pour diviser un corpus en deux selon une date (diviser_et_presenter_selon_date), les copies
+    profondes historiques, les vues (CorpusView) et les vues matérialisées : durée et mémoire allouée.
+    """
+    corpus = creer_corpus_textes_reels(repetitions)
+    dates = sorted(doc.date for doc in corpus.id2doc.values())
+    date_limite = dates[len(dates) // 2]
+    print(f"Division de {corpus.ndoc} documents selon une date")
+    corpus.vue_avant_date(date_limite)  # l'index des dates est construit hors mesure
+
+    methodes = {
+        'copies profondes': lambda: diviser_par_copie_profonde(corpus, date_limite),
+        'vues': lambda: (corpus.vue_avant_date(date_limite), corpus.vue_apres_date(date_limite)),
+        'vues matérialisées': lambda: (corpus.copier_et_filtrer_avant_date(date_limite),
+                                       corpus.copier_et_filtrer_apres_date(date_limite)),
+    }
+    for nom, diviser in methodes.items():
+        debut = time.perf_counter()
+        diviser()
+        duree = time.perf_counter() - debut
+        tracemalloc.start()
+        moities = diviser()
+        memoire = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del moities
+        print(f"  {nom:<20} : {duree:7.3f} s, {memoire / 1e6:8.1f} Mo")
+
+
+if __name__ == "__main__":
+    benchmark_acquisition_parallele()
+    benchmark_construction_corpus()
+    benchmark_format_colonnes()
+    benchmark_chargement_paresseux()
+    benchmark_appliquer_recherche()
+    benchmark_session_http()
+    benchmark_cache_jetons()
+    benchmark_matrice_documents_termes()
+    benchmark_nettoyage_par_lot()
+    benchmark_index_inverse()
+    benchmark_concordancier()
+    benchmark_ajouts_incrementaux()
+    benchmark_tfidf_incremental()
+    benchmark_recherche_par_lot()
+    benchmark_index_semantique()
+    benchmark_bm25()
+    benchmark_cache_recherches()
+    benchmark_tfidf_enregistre()
+    benchmark_cooccurrences()
+    benchmark_collocations()
+    benchmark_vues_par_dates()
@@ -3,10 +3,28 @@ from Classes_Data import *
 import Fonctions_Acquisition_Donnees
 from unittest.mock import mock_open, patch, MagicMock
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import xmltodict
+import requests
+import time
+import io
+import threading
+import tempfile
+import shutil
+import copy
+import pickle
+import sys
+import os
+from Classe_Cache import CacheHTTP, CacheTextes, CacheResultats
+from Classes_Simulation import ServeurArxivSimule
+from Classes_Indexation import nettoyer_textes, MatriceCollocations
 
 
+def attributs_document(doc):
+    # attributs d'un document, hors référence au corpus qui le contient
+    return {attribut: valeur for attribut, valeur in doc.__dict__.items() if attribut != '_proprietaire'}
+
 
 
 class TestCorpus(unittest.TestCase):
@@ -58,6 +76,193 @@ class TestCorpus(unittest.TestCase):
         # Test si le compteur d'auteurs est correct
         self.assertEqual(self.corpus.naut, naut_avant + 1)
 
+    def test_from_dataframe(self):
+        docs = pd.DataFrame({
+            'source': ['arxiv', 'reddit', 'arxiv'],
+            'titre': ['Titre1', 'Titre2', 'Titre3'],
+            'auteur': ['Auteur1', 'Auteur2', 'Auteur1'],
+            'date': ['2020-03-03 02:29:11', '2020-03-04 02:29:11', '2020-03-05 02:29:11'],
+            'url': ['http://example1.com', 'http://example2.com', 'http://example3.com'],
+            'texte': ['Texte1', 'Texte2', 'Texte3'],
+            'co_auteurs': ['Co-auteurs1', 'Aucun', 'Aucun'],
+            'nombre_commentaires': [0, 12, 0]
+        })
+
+        # Construction en masse et construction document par document
+        corpus_masse = Corpus.from_dataframe(docs, "Test Masse")
+        corpus_unitaire = Corpus("Test Unitaire")
+        for ligne in docs.to_dict('records'):
+            corpus_unitaire.add_document(ligne['source'], ligne['titre'], ligne['auteur'], ligne['date'],
+                                         ligne['url'], ligne['texte'], ligne['co_auteurs'],
+                                         ligne['nombre_commentaires'])
+
+        # Les deux corpus doivent être identiques
+        self.assertEqual(corpus_masse.ndoc, corpus_unitaire.ndoc)
+        self.assertEqual(corpus_masse.naut, corpus_unitaire.naut)
+        self.assertEqual(list(corpus_masse.id2doc), list(corpus_unitaire.id2doc))
+        for titre, doc in corpus_unitaire.id2doc.items():
+            doc_masse = corpus_masse.id2doc[titre]
+            self.assertEqual(type(doc_masse), type(doc))
+            self.assertEqual(attributs_document(doc_masse), attributs_document(doc))
+        self.assertEqual(list(corpus_masse.authors), ['Auteur1', 'Auteur2'])
+        self.assertEqual(corpus_masse.authors['Auteur1'].ndoc, 2)
+        self.assertEqual(list(corpus_masse.authors['Auteur1'].production), ['Titre1', 'Titre3'])
+        self.assertEqual(corpus_masse.id2doc['Titre2'].get_nb_commentaires(), 12)
+
+    def test_save_load_colonnes(self):
+        corpus = Corpus("Test Colonnes", "python")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com", "Texte1",
+                            "Co-auteurs1")
+        corpus.add_document("reddit", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com", None,
+                            "Aucun", 12)
+        corpus.id2doc['Titre1'].ajouter_annotation(1, "Remarque", position=3, auteur="Lecteur")
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, "test.corpus")
+            corpus.save(chemin)
+            corpus_charge = Corpus.load(chemin)
+
+            # Lecture partielle : seules les colonnes demandées sont renvoyées
+            colonnes = Corpus.lire_colonnes(chemin, ['titre', 'date'])
+            self.assertEqual(list(colonnes.columns), ['titre', 'date'])
+            self.assertEqual(colonnes['titre'].tolist(), ['Titre1', 'Titre2'])
+
+        self.assertEqual(corpus_charge.nom, "Test Colonnes")
+        self.assertEqual(corpus_charge.mot_de_recherche, "python")
+        self.assertEqual((corpus_charge.ndoc, corpus_charge.naut), (2, 2))
+        self.assertEqual(attributs_document(corpus_charge.id2doc['Titre1']), attributs_document(corpus.id2doc['Titre1']))
+        self.assertEqual(corpus_charge.id2doc['Titre2'].get_nb_commentaires(), 12)
+        self.assertEqual(corpus_charge.id2doc['Titre1'].annotations[1]['position'], 3)
+        self.assertEqual(list(corpus_charge.authors['Auteur1'].production), ['Titre1'])
+
+    def test_save_load_tfidf(self):
+        corpus = Corpus("Test TF-IDF Enregistré")
+        for i, texte in enumerate(["machine learning", "data science", None, "deep learning network"]):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+        corpus.vectoriser_documents()
+        attendus = corpus.rechercher_documents("learning network")
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, "test.corpus")
+            corpus.save(chemin)
+            self.assertTrue(os.path.exists(os.path.join(chemin, 'tfidf.npz')))
+
+            # Le modèle enregistré est chargé avec le corpus, même paresseux : la recherche ne le réajuste pas
+            for paresseux in (False, True):
+                corpus_charge = Corpus.load(chemin, paresseux=paresseux)
+                with patch.object(TfidfVectorizer, 'fit_transform') as ajuster:
+                    resultats = corpus_charge.rechercher_documents("learning network")
+                    ajuster.assert_not_called()
+                pd.testing.assert_frame_equal(resultats, attendus)
+
+            # Les textes ne sont pas lus pour vérifier le modèle lors d'un chargement paresseux
+            with patch('Classes_Data.open', side_effect=open) as ouvrir:
+                self.assertTrue(hasattr(Corpus.load(chemin, paresseux=True), 'tfidf_matrix'))
+            self.assertFalse([appel for appel in ouvrir.call_args_list
+                              if os.path.basename(appel.args[0]).startswith('textes')])
+
+            # Un modèle ne correspondant pas au contenu du corpus est ignoré
+            autre = os.path.join(repertoire, "autre.corpus")
+            corpus.id2doc['Titre1'].texte = "data mining"
+            corpus.save(autre)
+            for fichier in ('tfidf.npz', 'vocabulaire.json'):
+                shutil.copy(os.path.join(chemin, fichier), autre)
+            self.assertFalse(hasattr(Corpus.load(autre), 'tfidf_matrix'))
+
+            # Un modèle périmé n'est pas enregistré, et remplace le précédent
+            corpus.id2doc['Titre0'].texte = "machine translation"
+            corpus.save(chemin)
+            self.assertFalse(os.path.exists(os.path.join(chemin, 'tfidf.npz')))
+
+    def test_load_paresseux(self):
+        corpus = Corpus("Test Paresseux")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com", "Texte1",
+                            "Co-auteurs1")
+        corpus.add_document("reddit", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com", None,
+                            "Aucun", 12)
+        cache = CacheTextes()
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, "test.corpus")
+            corpus.save(chemin)
+            with patch('Classes_Data.CACHE_TEXTES', cache):
+                corpus_charge = Corpus.load(chemin, paresseux=True)
+
+            # Les métadonnées sont chargées, les textes pas encore
+            self.assertEqual(corpus_charge.id2doc['Titre1'].date, corpus.id2doc['Titre1'].date)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(corpus_charge.id2doc['Titre1'].texte, "Texte1")
+            self.assertIsNone(corpus_charge.id2doc['Titre2'].texte)
+            self.assertEqual(len(cache), 1)
+
+            # Une nouvelle sauvegarde au même endroit garde les textes différés lisibles
+            corpus_charge.add_document("arxiv", "Titre0", "Auteur3", "2020-03-05 02:29:11", "http://example3.com",
+                                       "Texte0", "Aucun")
+            corpus_charge.id2doc = dict(sorted(corpus_charge.id2doc.items()))
+            corpus_charge.save(chemin)
+            self.assertEqual([doc.texte for doc in corpus_charge.id2doc.values()], ["Texte0", "Texte1", None])
+
+            # Une copie profonde reste paresseuse, une copie enregistrée en pickle ne dépend plus du fichier
+            copie = copy.deepcopy(corpus_charge)
+            self.assertIs(copie.id2doc['Titre1']._emplacement_texte, corpus_charge.id2doc['Titre1']._emplacement_texte)
+            copie_pickle = pickle.loads(pickle.dumps(corpus_charge))
+        cache.vider()
+        self.assertEqual(copie_pickle.id2doc['Titre1'].texte, "Texte1")
+
+    def test_sauvegarde_pendant_lecture_paresseuse(self):
+        corpus = Corpus("Test Lecteurs")
+        for i, texte in enumerate(["Texte A", "Texte B", "Texte C"]):
+            corpus.add_document("arxiv", "ABC"[i], "Auteur", f"2021-01-0{i + 1} 00:00:00", "http://example.com", texte,
+                                None)
+        cache = CacheTextes()
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, "test.corpus")
+            corpus.save(chemin)
+            with patch('Classes_Data.CACHE_TEXTES', cache):
+                l1 = Corpus.load(chemin, paresseux=True)
+                l2 = Corpus.load(chemin, paresseux=True)
+
+            # Une sauvegarde au même endroit n'écrase pas le fichier que lisent les autres corpus paresseux
+            l1.copier_et_filtrer_apres_date(datetime(2021, 1, 2).date()).save(chemin)
+            cache.vider()
+            self.assertEqual([doc.texte for doc in l2.id2doc.values()], ["Texte A", "Texte B", "Texte C"])
+            self.assertEqual(l1.id2doc['A'].texte, "Texte A")
+            self.assertEqual([doc.texte for doc in Corpus.load(chemin, paresseux=True).id2doc.values()],
+                             ["Texte B", "Texte C"])
+            self.assertEqual(len([f for f in os.listdir(chemin) if f.startswith('textes')]), 2)
+
+            # L'ancien fichier est supprimé à la sauvegarde suivante, lorsque plus aucun corpus ne le lit
+            del l1, l2
+            Corpus.load(chemin).save(chemin)
+            self.assertEqual(len([f for f in os.listdir(chemin) if f.startswith('textes')]), 1)
+
+    def test_jetons(self):
+        corpus = Corpus("Test Jetons")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com",
+                            "The 2 cats, the dog!", "Aucun")
+        corpus.add_document("arxiv", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com",
+                            "Dog and cats", "Aucun")
+        doc = corpus.id2doc['Titre1']
+        self.assertEqual(VOCABULAIRE.termes(doc.jetons()), ['cats', 'dog'])
+
+        # Chaque texte n'est nettoyé qu'une fois, quelles que soient les analyses effectuées
+        jetons = doc.jetons()
+        corpus.nombre_mots_uniques()
+        jetons2 = corpus.id2doc['Titre2'].jetons()
+        corpus.calculer_frequences(corpus.construire_vocabulaire())
+        copy.deepcopy(corpus).nombre_mots_uniques()
+        self.assertIs(doc.jetons(), jetons)
+        self.assertIs(corpus.id2doc['Titre2'].jetons(), jetons2)
+        self.assertEqual(VOCABULAIRE.termes(jetons2), ['dog', 'cats'])
+
+        # Modifier le texte invalide les jetons
+        doc.texte = "Birds"
+        self.assertEqual(VOCABULAIRE.termes(doc.jetons()), ['birds'])
+
+        # Les jetons, propres au vocabulaire du processus, ne sont pas enregistrés
+        self.assertIsNone(pickle.loads(pickle.dumps(doc))._jetons)
+
     def test_corpus_repr(self):
         # Initialisation de valeurs d'attributs
         self.corpus.nom = "Test Corpus"
@@ -208,6 +413,43 @@ class TestCorpus(unittest.TestCase):
         results_absent = self.corpus_search.search("NonExistant")
         self.assertEqual(len(results_absent), 0)
 
+    def test_search_index(self):
+        corpus = Corpus("Test Index")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com",
+                            "Machine learning and deep-learning for data science.", "Co-auteurs1")
+        corpus.add_document("arxiv", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com",
+                            "Big DATA, machine learnings", "Co-auteurs2")
+        corpus.add_document("arxiv", "Titre3", "Auteur3", "2020-03-05 02:29:11", "http://example3.com",
+                            None, "Co-auteurs3")
+
+        # Terme (insensible à la casse) : occurrences par document, positions en mots et en caractères
+        resultats = corpus.search("data", mode='index')
+        self.assertEqual(resultats['titre'].tolist(), ['Titre1', 'Titre2'])
+        self.assertEqual(resultats['occurrences'].tolist(), [1, 1])
+        self.assertEqual(resultats['positions'].tolist(), [[6], [1]])
+        self.assertEqual(resultats['debuts'].tolist(), [[39], [4]])
+
+        def titres(requete):
+            return corpus.search(requete, mode='index')['titre'].tolist()
+
+        self.assertEqual(titres("learn*"), ['Titre1', 'Titre2'])  # préfixe
+        self.assertEqual(titres('"machine learning"'), ['Titre1'])  # expression exacte
+        self.assertEqual(titres("deep-learning"), ['Titre1'])  # mot coupé par la ponctuation
+        self.assertEqual(titres("data AND NOT big"), ['Titre1'])
+        self.assertEqual(titres("(big OR deep) data"), ['Titre1', 'Titre2'])  # AND implicite
+        self.assertEqual(titres("NOT machine"), ['Titre3'])
+        self.assertEqual(titres("absent OR science"), ['Titre1'])
+        with self.assertRaises(ValueError):
+            corpus.search("(data", mode='index')
+        with self.assertRaises(ValueError):
+            corpus.search("data", mode='inconnu')
+
+        # L'index est reconstruit après l'ajout d'un document, et n'est pas enregistré avec le corpus
+        corpus.add_document("reddit", "Titre4", "Auteur4", "2020-03-06 02:29:11", "http://example4.com",
+                            "data", "Co-auteurs4", 0)
+        self.assertEqual(titres("data"), ['Titre1', 'Titre2', 'Titre4'])
+        self.assertIsNone(pickle.loads(pickle.dumps(corpus))._index_inverse)
+
     def test_concorde(self):
         # Initialisation d'un corpus de test et ajout de documents
         self.corpus_concorde = Corpus("Test Concorde Corpus")
@@ -228,6 +470,32 @@ class TestCorpus(unittest.TestCase):
         concordances_absent = self.corpus_concorde.concorde("NonExistant", 6)
         self.assertEqual(len(concordances_absent), 0)
 
+    def test_iterer_concordances(self):
+        corpus = Corpus("Test Concordances")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com",
+                            "data mining and data", "Co-auteurs1")
+        corpus.add_document("arxiv", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com",
+                            "Big data", "Co-auteurs2")
+        corpus.add_document("arxiv", "Titre3", "Auteur3", "2020-03-05 02:29:11", "http://example3.com",
+                            "data", "Co-auteurs3")
+
+        # Chaque occurrence est attribuée à son document, et les contextes ne débordent pas sur les autres
+        concordances = corpus.iterer_concordances("data", 6)
+        self.assertEqual(next(concordances), ("Titre1", 0, "", "data", " minin"))
+        self.assertEqual(next(concordances), ("Titre1", 16, "g and ", "data", ""))
+
+        # Les documents ne sont lus qu'au fur et à mesure du parcours
+        corpus.id2doc["Titre2"].texte = "Small data sets"
+        self.assertEqual(next(concordances), ("Titre2", 6, "Small ", "data", " sets"))
+
+        # Une page ne cherche que les occurrences nécessaires ; le mode 'index' ignore la casse
+        page, suite = corpus.page_concordances("data", 6, page=2, resultats_par_page=2)
+        self.assertEqual(page['document'].tolist(), ["Titre2", "Titre3"])
+        self.assertFalse(suite)
+        page, suite = corpus.page_concordances("DATA NOT small", 6, page=1, resultats_par_page=2, mode='index')
+        self.assertEqual(page['position'].tolist(), [0, 16])
+        self.assertTrue(suite)
+
     def test_nettoyer_texte(self):
         # Nettoyage d'un texte normal
         texte = "Test 123! Lorem ipsum, dolor sit 2 amet."
@@ -255,6 +523,18 @@ class TestCorpus(unittest.TestCase):
         for word in ['test', 'stopwords', 'removal']:
             self.assertIn(word, texte_nettoye_stopwords)
 
+    def test_nettoyer_textes(self):
+        textes = ["Test 123! Lorem ipsum, dolor sit 2 amet.", None, float('nan'), 'NaN', "",
+                  "C'est l'été : ΣΟΦΟΣ, 3D-printing & co_workers", "The cat... the CAT, the cat2"]
+        # Avec les options par défaut, le résultat est celui de nettoyer_texte
+        self.assertEqual(nettoyer_textes(textes), [nettoyer_texte(texte) for texte in textes])
+
+        # Options : conserver les chiffres, ignorer les mots trop courts
+        self.assertEqual(nettoyer_textes(["Python 3 and R in 2024"], garder_nombres=True),
+                         ["python 3 r 2024"])
+        self.assertEqual(nettoyer_textes(["Python 3 and R in 2024"], garder_nombres=True, longueur_min=2),
+                         ["python 2024"])
+
     def test_construire_vocabulaire(self):
         # Initialisation d'un corpus de test et ajout de documents
         self.corpus_vocab = Corpus("Test Vocab Corpus")
@@ -321,6 +601,32 @@ class TestCorpus(unittest.TestCase):
         freq_df_vide = self.corpus_vide.calculer_frequences({})
         self.assertTrue(freq_df_vide.empty)
 
+    def test_matrice_documents_termes(self):
+        corpus = Corpus("Test Matrice Corpus")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com",
+                            "Lorem ipsum lorem dolor", "Co-auteurs1")
+        corpus.add_document("arxiv", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com", "Ipsum",
+                            "Co-auteurs2")
+
+        matrice = corpus.matrice_documents_termes()
+
+        # Une ligne par document, une colonne par terme présent dans le corpus
+        self.assertEqual(matrice.shape, (2, 3))
+        self.assertEqual(sorted(matrice.termes), ['dolor', 'ipsum', 'lorem'])
+        self.assertEqual(matrice.titres, ['Titre1', 'Titre2'])
+        self.assertEqual(matrice.matrice[0, matrice.terme2indice['lorem']], 2)
+        self.assertEqual(matrice.matrice[1, matrice.terme2indice['lorem']], 0)
+        self.assertEqual(matrice.matrice.nnz, 4)
+
+        # Fréquences totales et adaptateur DataFrame (un mot absent donne une colonne de zéros)
+        self.assertEqual(corpus.frequences_mots().to_dict(), {'lorem': 2, 'ipsum': 2, 'dolor': 1})
+        freq_df = matrice.vers_dataframe(['ipsum', 'absent'])
+        self.assertEqual(freq_df.loc['Titre1'].tolist(), [1, 0])
+        self.assertEqual(freq_df.loc['Titre2'].tolist(), [1, 0])
+
+        # Corpus vide
+        self.assertEqual(Corpus("Test Empty Corpus").matrice_documents_termes().shape, (0, 0))
+
     def test_vectoriser_documents(self):
         # Initialisation d'un corpus de test et ajout de documents
         self.corpus_vectorisation = Corpus("Test Vectorisation Corpus")
@@ -342,6 +648,31 @@ class TestCorpus(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.corpus_vide.vectoriser_documents()
 
+    def test_vectoriser_documents_incremental(self):
+        textes = ["machine machine learning", "data science", "big data and machine learning"]
+        corpus = Corpus("Test Vectorisation Incrementale")
+        for i, texte in enumerate(textes[:2]):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+        corpus.vectoriser_documents(incremental=True)
+        modele = corpus.vectorizer
+        self.assertEqual(corpus.tfidf_matrix.shape[0], 2)
+
+        # Le document ajouté est vectorisé seul, par le même modèle
+        corpus.add_document("arxiv", "Titre2", "Auteur", "2020-03-03 02:29:11", "http://example.com", textes[2], None)
+        incrementaux = corpus.rechercher_documents("machine data")
+        self.assertIs(corpus.vectorizer, modele)
+        self.assertEqual(modele.nombre_documents, 3)
+
+        # Le corpus ayant beaucoup grandi, tous les documents ont été repondérés : les scores sont ceux
+        # d'un TfidfVectorizer ajusté sur tous les documents
+        corpus.vectoriser_documents()
+        exacts = corpus.rechercher_documents("machine data")
+        self.assertEqual(incrementaux['Document'].tolist(), exacts['Document'].tolist())
+        self.assertTrue(np.allclose(incrementaux['Score'], exacts['Score']))
+
+        with self.assertRaises(ValueError):
+            Corpus("Vide").vectoriser_documents(incremental=True)
+
     def test_rechercher_documents(self):
         # Initialisation d'un corpus de test et ajout de documents
         self.corpus_recherche = Corpus("Test Recherche Corpus")
@@ -366,8 +697,261 @@ class TestCorpus(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.corpus_vide.rechercher_documents("mot")
 
-
-
+    def test_rechercher_documents_k_et_par_lot(self):
+        corpus = Corpus("Test Top-k")
+        textes = ["machine learning", "deep learning network", "data science", "big data machine",
+                  "neural network", "science fiction"]
+        for i, texte in enumerate(textes):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+
+        # Les k meilleurs documents sont ceux de la recherche complète, indexés par leur position
+        complets = corpus.rechercher_documents("machine learning network")
+        meilleurs = corpus.rechercher_documents("machine learning network", k=3)
+        self.assertEqual(len(meilleurs), 3)
+        self.assertTrue(np.allclose(meilleurs['Score'], complets['Score'].head(3)))
+        self.assertEqual(meilleurs.index[0], 0)
+        self.assertEqual(meilleurs.iloc[0]['Document'], "Titre0")
+
+        # Le traitement par lot donne, pour chaque requête, le même résultat que la recherche individuelle
+        requetes = ["machine learning network", "data science", "inconnu"]
+        lot = corpus.rechercher_documents_par_lot(requetes, k=2, taille_bloc=len(textes))  # une requête par bloc
+        self.assertEqual(lot['Requête'].tolist(), [requete for requete in requetes for _ in range(2)])
+        self.assertEqual(lot['Rang'].tolist(), [1, 2] * 3)
+        for requete in requetes:
+            individuel = corpus.rechercher_documents(requete, k=2)
+            du_lot = lot[lot['Requête'] == requete]
+            self.assertEqual(du_lot['Indice'].tolist(), individuel.index.tolist())
+            self.assertTrue(np.allclose(du_lot['Score'], individuel['Score']))
+
+    def test_index_semantique(self):
+        corpus = Corpus("Test Index Sémantique")
+        textes = ["car engine wheel", "automobile engine wheel", "car road traffic",
+                  "apple banana fruit", "banana fruit juice", "apple fruit tree"]
+        for i, texte in enumerate(textes):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+
+        # 'automobile' n'apparaît que dans Titre1, mais l'espace sémantique le rapproche des autres textes automobiles
+        self.assertEqual(corpus.rechercher_documents("automobile", k=3)['Score'].tolist()[1:], [0, 0])
+        corpus.construire_index_semantique(dimensions=2)
+        resultats = corpus.rechercher_documents("automobile", k=3, semantique=True)
+        self.assertEqual(sorted(resultats.index), [0, 1, 2])
+        self.assertTrue(all(resultats['Score'] > 0.9))
+
+        # Recherche approchée : seuls les documents du groupe le plus proche sont examinés
+        corpus.construire_index_semantique(dimensions=2, nombre_groupes=2, groupes_sondes=1)
+        resultats = corpus.rechercher_documents("juice", k=6, semantique=True)
+        self.assertEqual(sorted(resultats.index), [3, 4, 5])
+        lot = corpus.rechercher_documents_par_lot(["automobile", "juice"], k=6, semantique=True)
+        self.assertEqual(lot.groupby('Requête')['Indice'].apply(sorted).to_dict(),
+                         {"automobile": [0, 1, 2], "juice": [3, 4, 5]})
+
+        # L'index est enregistré avec le corpus au format en colonnes, et rechargé sans être recalculé
+        attendus = corpus.rechercher_documents_par_lot(["automobile", "juice"], k=6, semantique=True)
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, "test.corpus")
+            corpus.save(chemin)
+            corpus_charge = Corpus.load(chemin, paresseux=True)
+        self.assertEqual((len(corpus_charge.index_semantique), corpus_charge.index_semantique.groupes_sondes), (6, 1))
+        with patch.object(IndexSemantique, 'ajuster') as ajuster:
+            resultats = corpus_charge.rechercher_documents_par_lot(["automobile", "juice"], k=6, semantique=True)
+            ajuster.assert_not_called()
+        pd.testing.assert_frame_equal(resultats, attendus)
+
+        # L'index est enregistré avec le corpus, et suit les ajouts de documents
+        rechargee = pickle.loads(pickle.dumps(corpus))
+        self.assertEqual(len(rechargee.index_semantique), 6)
+        self.assertEqual(rechargee.index_semantique.nombre_groupes, 2)
+        rechargee.add_document("arxiv", "Titre6", "Auteur", "2020-03-03 02:29:11", "http://example.com",
+                               "fruit salad", None)
+        self.assertIn(6, rechargee.rechercher_documents("fruit", k=7, semantique=True).index)
+        self.assertEqual(len(rechargee.index_semantique), 7)
+
+    def test_rechercher_documents_bm25(self):
+        corpus = Corpus("Test BM25")
+        textes = ["data science", "data " + "long abstract about statistics " * 10, "", "machine learning"]
+        for i, texte in enumerate(textes):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+
+        # Score d'un document : idf × tf × (k1 + 1) / (tf + k1 × (1 - b + b × longueur / longueur moyenne))
+        resultats = corpus.rechercher_documents("data", classement='bm25')
+        self.assertEqual(resultats.index.tolist()[:2], [0, 1])  # à fréquence égale, le document court l'emporte
+        idf = np.log1p((4 - 2 + 0.5) / (2 + 0.5))
+        longueur_moyenne = (2 + 41 + 0 + 2) / 4
+        self.assertAlmostEqual(resultats.loc[0, 'Score'], idf * 2.2 / (1 + 1.2 * (0.25 + 0.75 * 2 / longueur_moyenne)))
+        self.assertEqual(resultats.loc[2, 'Score'], 0)  # un texte vide n'a aucun score
+
+        # Sans normalisation de la longueur (b=0), les deux documents ont le même score
+        corpus.construire_bm25(k1=1.5, b=0)
+        meilleurs = corpus.rechercher_documents("data", k=2, classement='bm25')
+        self.assertAlmostEqual(meilleurs['Score'].iloc[0], meilleurs['Score'].iloc[1])
+
+        # Le traitement par lot donne le même résultat, et le modèle suit les ajouts avec ses paramètres
+        lot = corpus.rechercher_documents_par_lot(["data", "machine"], k=1, classement='bm25')
+        self.assertEqual(lot['Indice'].tolist(), [0, 3])
+        corpus.add_document("arxiv", "Titre4", "Auteur", "2020-03-03 02:29:11", "http://example.com",
+                            "machine machine", None)
+        self.assertEqual(corpus.rechercher_documents("machine", k=1, classement='bm25').index.tolist(), [4])
+        self.assertEqual((len(corpus.bm25), corpus.bm25.b), (5, 0))
+        with self.assertRaises(ValueError):
+            corpus.rechercher_documents("data", classement='inconnu')
+
+    def test_cache_recherches(self):
+        corpus = Corpus("Test Cache Recherches")
+        for i, texte in enumerate(["machine learning", "data science", "deep learning"]):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+
+        # Une requête répétée (aux casse et espaces près) est servie par le cache
+        premier = corpus.rechercher_documents("learning", k=2)
+        with patch.object(Corpus, '_rechercher_documents') as rechercher:
+            repete = corpus.rechercher_documents("  LEARNING ", k=2)
+            rechercher.assert_not_called()
+        pd.testing.assert_frame_equal(repete, premier)
+        self.assertEqual((corpus.cache_recherches.succes, corpus.cache_recherches.echecs), (1, 1))
+
+        # Un autre classement est une autre entrée, et le résultat renvoyé peut être modifié sans altérer le cache
+        corpus.rechercher_documents("learning", k=2, classement='bm25')
+        repete.drop(repete.index, inplace=True)
+        self.assertEqual(len(corpus.rechercher_documents("learning", k=2)), 2)
+        self.assertEqual(len(corpus.cache_recherches), 2)
+
+        # Toute modification du corpus rend les résultats conservés obsolètes
+        corpus.id2doc["Titre1"].texte = "learning again"
+        self.assertIn(1, corpus.rechercher_documents("learning", k=2).index)
+        corpus.add_document("arxiv", "Titre3", "Auteur", "2020-03-03 02:29:11", "http://example.com",
+                            "learning learning learning", None)
+        self.assertEqual(corpus.rechercher_documents("learning", k=1, classement='bm25').index.tolist(), [3])
+
+    def test_cooccurrences(self):
+        corpus = Corpus("Test Co-occurrences")
+        textes = ["Machine learning, data and science.", "data science", "machine data", None, "learning machine"]
+        for i, texte in enumerate(textes):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+
+        # Nombre de documents contenant chaque couple ; les mots sont nettoyés comme les textes
+        mots = ["machine", "Data", "learning", "absent"]
+        attendu = pd.DataFrame([[0, 2, 2, 0], [2, 0, 1, 0], [2, 1, 0, 0], [0, 0, 0, 0]], index=mots, columns=mots)
+        pd.testing.assert_frame_equal(corpus.cooccurrences(mots), attendu)
+        self.assertIsNone(corpus.id2doc["Titre3"].texte)  # les textes ne sont pas modifiés
+
+        # La matrice documents × termes suit les modifications du corpus
+        corpus.add_document("arxiv", "Titre5", "Auteur", "2020-03-03 02:29:11", "http://example.com", "data learning", None)
+        self.assertEqual(corpus.cooccurrences(mots).loc["Data", "learning"], 2)
+
+    def test_collocations(self):
+        corpus = Corpus("Test Collocations")
+        textes = ["New York city is big", "new york times", "the city of New York", "big apple city"]
+        for i, texte in enumerate(textes):
+            corpus.add_document("arxiv", f"Titre{i}", "Auteur", "2020-03-03 02:29:11", "http://example.com", texte, None)
+
+        # Fenêtre de ±2 mots nettoyés : 14 couples, comptés dans les deux sens
+        matrice = corpus.collocations(fenetre=2)
+        self.assertEqual(matrice.total, 28)
+        self.assertEqual((matrice.cooccurrences("new", "york"), matrice.cooccurrences("york", "new")), (3, 3))
+        self.assertEqual(matrice.cooccurrences("new", "big"), 0)  # d'un document à l'autre, pas de couple
+
+        # PMI : log(c(new, times) × N / (c(new) × c(times))), avec c(new) = 6 et c(times) = 2
+        collocats = corpus.collocats("New", mesure='pmi', fenetre=2, minimum=1)
+        self.assertEqual(collocats['collocat'].tolist(), ["times", "york", "city"])
+        self.assertAlmostEqual(collocats['score'].iloc[0], np.log(28 / 12))
+        self.assertEqual(corpus.collocats("new", fenetre=2, minimum=2)['collocat'].tolist(), ["york", "city"])
+        llr = corpus.collocats("apple", mesure='llr', fenetre=2, minimum=1)
+        self.assertTrue((llr['score'] > 0).all())
+        self.assertTrue(corpus.collocats("inconnu", fenetre=2).empty)
+        with self.assertRaises(ValueError):
+            corpus.collocats("new", mesure='inconnue', fenetre=2)
+
+        # Les ajouts sont comptés sans tout recompter, avec le même résultat qu'un calcul par petits blocs
+        corpus.add_document("arxiv", "Titre4", "Auteur", "2020-03-03 02:29:11", "http://example.com", "new york", None)
+        self.assertIs(corpus.collocations(fenetre=2), matrice)
+        self.assertEqual(matrice.cooccurrences("new", "york"), 4)
+        complete = MatriceCollocations(2).ajouter([doc.jetons() for doc in corpus.id2doc.values()], taille_bloc=1,
+                                                  nombre_threads=3)
+        self.assertEqual((complete.matrice != matrice.matrice).nnz, 0)
+
+    def test_version_structures_derivees(self):
+        corpus = Corpus("Test Versions")
+        corpus.add_document("arxiv", "Titre1", "Auteur1", "2020-03-03 02:29:11", "http://example1.com",
+                            "data mining", "Co-auteurs1")
+        self.assertEqual(corpus.search("data"), ["data"])
+        self.assertEqual(corpus.search("data", mode='index')['titre'].tolist(), ["Titre1"])
+        self.assertEqual(corpus.rechercher_documents("data")['Document'].tolist(), ["Titre1"])
+        version = corpus.version
+
+        # Un ajout est pris en compte par toutes les structures, qui sont complétées sans être reconstruites
+        index = corpus.index_inverse()
+        corpus.add_document("arxiv", "Titre2", "Auteur2", "2020-03-04 02:29:11", "http://example2.com",
+                            "big data", "Co-auteurs2")
+        self.assertGreater(corpus.version, version)
+        self.assertEqual(corpus.search("data"), ["data", "data"])
+        self.assertEqual(corpus.texte_concatene, "data mining big data")
+        self.assertEqual(corpus.search("data", mode='index')['titre'].tolist(), ["Titre1", "Titre2"])
+        self.assertIs(corpus.index_inverse(), index)
+        self.assertEqual(corpus.rechercher_documents("big").iloc[0]['Document'], "Titre2")
+
+        # La modification d'un texte impose une reconstruction
+        corpus.id2doc["Titre1"].texte = "text mining"
+        self.assertEqual(corpus.search("data"), ["data"])
+        self.assertEqual(corpus.search("data", mode='index')['titre'].tolist(), ["Titre2"])
+        self.assertIsNot(corpus.index_inverse(), index)
+
+        # Une copie filtrée, ou rechargée, suit ses propres modifications
+        copie = corpus.copier_et_filtrer_apres_date(datetime(2020, 3, 4).date())
+        version = corpus.version
+        copie.id2doc["Titre2"].texte = "small data"
+        self.assertEqual(corpus.version, version)
+        self.assertEqual(copie.search("small"), ["small"])
+        rechargee = pickle.loads(pickle.dumps(corpus))
+        rechargee.search("data")
+        rechargee.id2doc["Titre2"].texte = "small data"
+        self.assertEqual(rechargee.search("small"), ["small"])
+
+
+
+
+    def test_vues_par_dates(self):
+        corpus = Corpus("Test Vues")
+        dates = ["2021-04-04 02:29:11", "2020-03-03 02:29:11", "2022-05-05 02:29:11", "2021-01-01 00:00:00"]
+        for i, date in enumerate(dates):
+            corpus.add_document("arxiv", f"Titre{i}", f"Auteur{i % 2}", date, "http://example.com",
+                                f"data texte{i}", None)
+        date_limite = datetime(2021, 1, 1).date()
+
+        # Les vues partagent les documents du corpus, dans l'ordre de id2doc ; la date limite est dans la seconde
+        avant, apres = corpus.vue_avant_date(date_limite), corpus.vue_apres_date(date_limite)
+        self.assertIsInstance(avant, CorpusView)
+        self.assertEqual(list(avant.id2doc), ["Titre1"])
+        self.assertEqual(list(apres.id2doc), ["Titre0", "Titre2", "Titre3"])
+        self.assertIs(apres.id2doc["Titre0"], corpus.id2doc["Titre0"])
+        self.assertEqual((apres.ndoc, apres.naut), (3, 2))
+        self.assertEqual(list(apres.authors["Auteur0"].production), ["Titre0", "Titre2"])
+        self.assertEqual(list(corpus.vue_par_dates(date_limite, datetime(2022, 1, 1).date()).id2doc),
+                         ["Titre0", "Titre3"])
+
+        # Les méthodes de lecture portent sur les seuls documents de la vue, et suivent les modifications des textes
+        self.assertEqual(apres.rechercher_documents("texte2", k=1)['Document'].tolist(), ["Titre2"])
+        self.assertEqual(apres.search("data"), ["data"] * 3)
+        corpus.id2doc["Titre2"].texte = "autre"
+        self.assertEqual(apres.search("data"), ["data"] * 2)
+        self.assertEqual(apres.rechercher_documents("autre", k=1)['Document'].tolist(), ["Titre2"])
+        with self.assertRaises(TypeError):
+            apres.add_document("arxiv", "Titre4", "Auteur", "2023-01-01 00:00:00", "http://example.com", "", None)
+
+        # Une vue matérialisée (ou copiée) est un corpus indépendant
+        copie = apres.materialiser()
+        self.assertIs(type(copie), Corpus)
+        self.assertIsNot(copie.id2doc["Titre0"], corpus.id2doc["Titre0"])
+        copie.id2doc["Titre0"].texte = "modifie"
+        self.assertEqual(corpus.id2doc["Titre0"].texte, "data texte0")
+        self.assertIs(type(pickle.loads(pickle.dumps(avant))), Corpus)
+
+    def test_vues_corpus_enregistre(self):
+        # Les corpus enregistrés avant l'ajout de mot_de_recherche peuvent être divisés selon une date
+        self.assertIsNone(self.corpus.mot_de_recherche)
+        date_limite = sorted(doc.date for doc in self.corpus.id2doc.values())[len(self.corpus.id2doc) // 2]
+        vue = self.corpus.vue_avant_date(date_limite)
+        copie = self.corpus.copier_et_filtrer_apres_date(date_limite)
+        self.assertEqual(vue.ndoc + copie.ndoc, len(self.corpus.id2doc))
+        self.assertIsNone(copie.mot_de_recherche)
 
     def test_copier_et_filtrer_avant_date(self):
         # Initialisation d'un corpus de test et ajout de documents
@@ -630,23 +1214,93 @@ class TestFonctionsAcquisitionDonnees(unittest.TestCase):
                             ['id_post_reddit', 'titre', 'auteur', 'date', 'texte', 'url', 'subreddit', 'upvotes',
                              'score', 'nombre_commentaires', 'flairs', 'source']))
 
-    @patch('Fonctions_Acquisition_Donnees.libreq.urlopen')
-    def test_recuperer_articles_arxiv(self, mock_urlopen):
+    @patch('Fonctions_Acquisition_Donnees.obtenir_session_http')
+    def test_recuperer_articles_arxiv(self, mock_session):
         # Données simulées pour une réponse de test
         reponse_xml_simulee = '<xml>Contenu simule</xml>'
-        mock_urlopen.return_value.__enter__.return_value.read.return_value = reponse_xml_simulee.encode()
+        mock_session.return_value.get.return_value.content = reponse_xml_simulee.encode()
 
         # Appel de la fonction recuperer_articles_arxiv
         sequence_de_recherche = "test"
         taille = 5
         resultat = Fonctions_Acquisition_Donnees.recuperer_articles_arxiv(sequence_de_recherche, taille)
 
-        # Vérification que libreq.urlopen a été appelé correctement
-        mock_urlopen.assert_called()
+        # Vérification que la session HTTP a été utilisée
+        mock_session.return_value.get.assert_called()
 
         # Vérification des résultats
         self.assertEqual(resultat, xmltodict.parse(reponse_xml_simulee))
 
+    @patch('Fonctions_Acquisition_Donnees.obtenir_session_http')
+    def test_moissonner_articles_arxiv(self, mock_session):
+        # Deux pages simulées : une page complète de 2 articles puis une page incomplète
+        def page_atom(numeros):
+            entrees = ''.join(f"""
+                <entry>
+                    <title>Titre{n}</title>
+                    <published>2021-01-0{n}T10:00:00Z</published>
+                    <summary>Résumé{n}</summary>
+                    <author><name>Auteur{n}</name></author>
+                    <author><name>CoAuteur{n}</name></author>
+                    <link href="http://exemple{n}.com"/>
+                </entry>""" for n in numeros)
+            return f'<feed xmlns="http://www.w3.org/2005/Atom">{entrees}</feed>'.encode()
+
+        pages = [page_atom([1, 2]), page_atom([3])]
+        mock_get = mock_session.return_value.get
+        mock_get.side_effect = lambda url, timeout: MagicMock(content=pages.pop(0))
+
+        # Moisson de 5 articles par pages de 2, sans délai entre les requêtes
+        lignes = list(Fonctions_Acquisition_Donnees.moissonner_articles_arxiv("test", 5, taille_page=2, delai=0))
+
+        # Vérification de la pagination : arrêt après la page incomplète
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertIn("start=0&max_results=2", mock_get.call_args_list[0][0][0])
+        self.assertIn("start=2&max_results=2", mock_get.call_args_list[1][0][0])
+
+        # Vérification des articles produits
+        self.assertEqual([ligne['titre'] for ligne in lignes], ['Titre1', 'Titre2', 'Titre3'])
+        self.assertEqual(lignes[0]['auteur'], 'Auteur1')
+        self.assertEqual(lignes[0]['co_auteurs'], 'CoAuteur1')
+        self.assertEqual(lignes[0]['date'], '2021-01-01 10:00:00')
+        self.assertEqual(lignes[0]['url'], 'http://exemple1.com')
+
+    def test_moissonner_articles_arxiv_serveur_simule(self):
+        # Moisson réelle, en HTTP, contre le serveur arXiv local : 25 articles disponibles par pages de 10
+        with ServeurArxivSimule(nombre_articles=25, longueur_resume=50) as serveur, \
+                patch('Fonctions_Acquisition_Donnees.URL_API_ARXIV', serveur.url), \
+                patch('Fonctions_Acquisition_Donnees._session_http', None):
+            lignes = list(Fonctions_Acquisition_Donnees.moissonner_articles_arxiv("test", 100, taille_page=10,
+                                                                                  delai=0))
+
+        self.assertEqual(serveur.nombre_requetes, 3)
+        self.assertEqual([ligne['titre'] for ligne in lignes], [f"Article {i}" for i in range(25)])
+        self.assertEqual(len(lignes[0]['texte']), 50)
+
+        # Les trois pages ont été demandées sur la même connexion
+        self.assertEqual(serveur.nombre_connexions, 1)
+
+    @patch('urllib3.util.retry.time.sleep')
+    def test_telecharger_url_nouvelles_tentatives(self, mock_sleep):
+        # Deux réponses 503 demandant d'attendre 2 s, puis une réponse normale
+        with ServeurArxivSimule(nombre_articles=3, erreurs=[503, 503], retry_after=2) as serveur, \
+                patch('Fonctions_Acquisition_Donnees.URL_API_ARXIV', serveur.url), \
+                patch('Fonctions_Acquisition_Donnees._session_http', None):
+            lignes = list(Fonctions_Acquisition_Donnees.moissonner_articles_arxiv("test", 3, delai=0))
+
+            self.assertEqual(len(lignes), 3)
+            self.assertEqual(serveur.nombre_requetes, 3)
+            # time.sleep est partagé avec le serveur simulé, qui attend sa latence (nulle) à chaque requête
+            attentes = [appel.args[0] for appel in mock_sleep.call_args_list if appel.args[0]]
+            self.assertEqual(attentes, [2, 2])
+
+        # Après épuisement des tentatives, l'erreur est signalée
+        with ServeurArxivSimule(erreurs=[503] * 3) as serveur, \
+                patch('Fonctions_Acquisition_Donnees._session_http',
+                      Fonctions_Acquisition_Donnees.creer_session_http(tentatives=2)):
+            with self.assertRaises(requests.HTTPError):
+                Fonctions_Acquisition_Donnees.telecharger_url(serveur.url)
+
     def test_creer_dataframe_arxiv(self):
         # Création de données arXiv simulées
         parsed_xml_simule = {
@@ -680,28 +1334,25 @@ class TestFonctionsAcquisitionDonnees(unittest.TestCase):
     @patch('Fonctions_Acquisition_Donnees.charger_config_json')
     @patch('Fonctions_Acquisition_Donnees.initialiser_reddit')
     @patch('Fonctions_Acquisition_Donnees.recuperer_posts_reddit')
-    @patch('Fonctions_Acquisition_Donnees.creer_dataframe_reddit')
-    @patch('Fonctions_Acquisition_Donnees.recuperer_articles_arxiv')
-    @patch('Fonctions_Acquisition_Donnees.creer_dataframe_arxiv')
-    @patch('pandas.DataFrame.to_csv')
-    @patch('Classes_Data.DocumentFactory.create_corpus')
-    def test_appliquer_recherche(self, mock_create_corpus, mock_to_csv, mock_creer_dataframe_arxiv,
-                                 mock_recuperer_articles_arxiv, mock_creer_dataframe_reddit,
+    @patch('Fonctions_Acquisition_Donnees.extraire_lignes_reddit')
+    @patch('Fonctions_Acquisition_Donnees.moissonner_articles_arxiv')
+    @patch('Fonctions_Acquisition_Donnees.exporter_tsv')
+    @patch('Classes_Data.Corpus.save')
+    def test_appliquer_recherche(self, mock_save, mock_exporter_tsv, mock_moissonner_articles_arxiv,
+                                 mock_extraire_lignes_reddit,
                                  mock_recuperer_posts_reddit, mock_initialiser_reddit, mock_charger_config_json):
-        # Création d'une instance factice de Corpus
-        fake_corpus = Corpus("TestCorpus")
-        mock_create_corpus.return_value = fake_corpus
-
-        # Configuration des mocks pour retourner des DataFrames avec une colonne 'texte'
-        mock_creer_dataframe_reddit.return_value = pd.DataFrame({'texte': ['Texte Reddit']})
-        mock_creer_dataframe_arxiv.return_value = pd.DataFrame({'texte': ['Texte Arxiv']})
+        # Configuration des mocks pour retourner une ligne par source
+        mock_extraire_lignes_reddit.return_value = iter([{
+            'titre': 'Titre Reddit', 'auteur': 'Auteur Reddit', 'date': '2021-01-01 10:00:00',
+            'texte': 'Texte\nReddit ', 'url': 'http://reddit.com/1', 'nombre_commentaires': 3, 'source': 'reddit'}])
+        mock_moissonner_articles_arxiv.return_value = iter([{
+            'titre': 'Titre Arxiv', 'auteur': 'Auteur Arxiv', 'co_auteurs': None, 'date': '2021-01-02 10:00:00',
+            'texte': 'Texte Arxiv', 'url': 'http://arxiv.org/1', 'source': 'arxiv'}])
 
         # Configuration des autres mocks
         mock_charger_config_json.return_value = {}
         mock_initialiser_reddit.return_value = MagicMock()
         mock_recuperer_posts_reddit.return_value = [MagicMock()]
-        mock_recuperer_articles_arxiv.return_value = {'feed': {'entry': [{}]}}
-        mock_to_csv.return_value = None
 
         # Appel de la fonction appliquer_recherche
         resultat = Fonctions_Acquisition_Donnees.appliquer_recherche("TestCorpus", "test", 10)
@@ -710,14 +1361,278 @@ class TestFonctionsAcquisitionDonnees(unittest.TestCase):
         mock_charger_config_json.assert_called_once()
         mock_initialiser_reddit.assert_called_once()
         mock_recuperer_posts_reddit.assert_called_once()
-        mock_creer_dataframe_reddit.assert_called_once()
-        mock_recuperer_articles_arxiv.assert_called_once()
-        mock_creer_dataframe_arxiv.assert_called_once()
-        mock_to_csv.assert_called_once()
-        mock_create_corpus.assert_called_once()
+        mock_extraire_lignes_reddit.assert_called_once()
+        mock_moissonner_articles_arxiv.assert_called_once()
+        mock_save.assert_called_once()
         self.assertIsInstance(resultat, Corpus)
 
+        # Les lignes acquises sont ajoutées directement au corpus, arXiv en premier
+        self.assertEqual(list(resultat.id2doc.keys()), ['Titre Arxiv', 'Titre Reddit'])
+        self.assertEqual(resultat.id2doc['Titre Arxiv'].co_auteurs, 'Aucun')
+        self.assertEqual(resultat.id2doc['Titre Reddit'].texte, 'Texte Reddit')
+        self.assertEqual(resultat.id2doc['Titre Reddit'].nb_commentaires, 3)
+
+        # L'export TSV reçoit les mêmes lignes, en arrière-plan
+        for thread in threading.enumerate():
+            if thread.name.startswith("export"):
+                thread.join()
+        lignes_exportees, chemin = mock_exporter_tsv.call_args[0]
+        self.assertEqual(chemin, "data/TestCorpus.csv")
+        self.assertEqual(len(lignes_exportees), 2)
+
+    @patch('Fonctions_Acquisition_Donnees.charger_config_json', return_value={})
+    def test_actualiser_corpus(self, mock_charger_config_json):
+        repertoire_initial = os.getcwd()
+        with tempfile.TemporaryDirectory() as repertoire:
+            os.chdir(repertoire)
+            os.makedirs('data')
+            try:
+                # Corpus existant : un document du 2021-01-02
+                corpus = Corpus("Actualise", "python")
+                corpus.add_document("arxiv", "Ancien", "Auteur1", "2021-01-02 10:00:00", "http://arxiv.org/1",
+                                    "Texte ancien", "Aucun")
+                corpus.save("data/Actualise.pkl")
+                taille_initiale = os.path.getsize("data/Actualise.pkl")
+
+                # La source renvoie le document déjà connu et un nouveau document
+                dates_demandees = []
+
+                def source_arxiv(mot, taille, config, depuis=None):
+                    dates_demandees.append(depuis)
+                    return [
+                        {'titre': 'Nouveau', 'auteur': 'Auteur2', 'date': '2021-01-03 10:00:00',
+                         'texte': 'Texte nouveau', 'url': 'http://arxiv.org/2', 'source': 'arxiv'},
+                        {'titre': 'Ancien', 'auteur': 'Auteur1', 'date': '2021-01-02 10:00:00',
+                         'texte': 'Texte ancien', 'url': 'http://arxiv.org/1', 'source': 'arxiv'},
+                    ]
+
+                with patch.dict(Fonctions_Acquisition_Donnees.SOURCES, {'arxiv': source_arxiv}, clear=True):
+                    corpus_actualise = Fonctions_Acquisition_Donnees.actualiser_corpus("Actualise")
+
+                # Seuls les documents postérieurs au plus récent sont demandés, sans doublon
+                self.assertEqual(dates_demandees, [datetime(2021, 1, 2).date()])
+                self.assertEqual(corpus_actualise.ndoc, 2)
+                self.assertIn("Nouveau", corpus_actualise.id2doc)
+
+                # Seul le complément est écrit : le fichier du corpus est inchangé, le journal est rejoué au chargement
+                self.assertEqual(os.path.getsize("data/Actualise.pkl"), taille_initiale)
+                self.assertTrue(os.path.exists("data/Actualise.pkl.journal"))
+                corpus_recharge = Corpus.load("data/Actualise.pkl")
+                self.assertEqual(list(corpus_recharge.id2doc), ["Ancien", "Nouveau"])
+
+                # Une sauvegarde complète intègre le journal
+                corpus_recharge.save("data/Actualise.pkl")
+                self.assertFalse(os.path.exists("data/Actualise.pkl.journal"))
+            finally:
+                os.chdir(repertoire_initial)
+
+    def test_acquerir_sources_en_parallele(self):
+        # Trois sources simulées : une qui répond, une qui échoue, une trop lente
+        def source_ok(mot, taille, config):
+            return iter([{'texte': 'Texte OK'}])
+
+        def source_en_erreur(mot, taille, config):
+            raise ConnectionError("API indisponible")
+
+        def source_lente(mot, taille, config):
+            time.sleep(1)
+            return [{'texte': 'Trop tard'}]
+
+        sources = {'ok': source_ok, 'erreur': source_en_erreur, 'lente': source_lente}
+        with patch('builtins.print'):
+            debut = time.monotonic()
+            resultats = Fonctions_Acquisition_Donnees.acquerir_sources_en_parallele(sources, "test", 10, {},
+                                                                                   delais={'lente': 0.1})
+            duree = time.monotonic() - debut
+
+        # Seule la source qui a répondu est conservée, sans attendre la source lente
+        self.assertEqual(list(resultats.keys()), ['ok'])
+        self.assertEqual(resultats['ok'], [{'texte': 'Texte OK'}])
+        self.assertLess(duree, 0.9)
+
+    def test_acquerir_sources_en_flux(self):
+        premiere_lue = threading.Event()
+
+        # La première source renvoie une ligne, puis attend qu'elle ait été lue avant de continuer
+        def source_progressive(mot, taille, config):
+            yield {'texte': 'Premier'}
+            premiere_lue.wait(1)
+            yield {'texte': 'Second'}
+
+        def source_interrompue(mot, taille, config):
+            yield {'texte': 'Avant erreur'}
+            raise ConnectionError("API indisponible")
+
+        def source_lente(mot, taille, config):
+            yield {'texte': 'À temps'}
+            time.sleep(1)
+            yield {'texte': 'Trop tard'}
+
+        sources = {'progressive': source_progressive, 'interrompue': source_interrompue, 'lente': source_lente}
+        with patch('builtins.print'):
+            lignes = Fonctions_Acquisition_Donnees.acquerir_sources_en_flux(sources, "test", 10, {},
+                                                                             delais={'lente': 0.2})
+            # Les lignes sont renvoyées avant la fin de la source
+            self.assertEqual(next(lignes), {'texte': 'Premier'})
+            premiere_lue.set()
+            debut = time.monotonic()
+            restantes = list(lignes)
+            duree = time.monotonic() - debut
+
+        # Les lignes restent dans l'ordre des sources ; celles reçues avant un échec ou le délai sont conservées
+        self.assertEqual([ligne['texte'] for ligne in restantes], ['Second', 'Avant erreur', 'À temps'])
+        self.assertLess(duree, 0.9)
+
+        # Sans aucune source aboutie, une erreur est levée
+        with patch('builtins.print'), self.assertRaises(ValueError):
+            list(Fonctions_Acquisition_Donnees.acquerir_sources_en_flux({'interrompue': source_interrompue},
+                                                                        "test", 10, {}))
+
+    def test_exporter_tsv_en_flux(self):
+        lignes = [{'titre': f'Titre{i}', 'texte': f'Texte {i}', 'source': 'arxiv'} for i in range(5)]
+        lignes[4]['subreddit'] = 'python'
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, "export.csv")
+            with patch('Fonctions_Acquisition_Donnees.exporter_tsv',
+                       side_effect=Fonctions_Acquisition_Donnees.exporter_tsv) as exporter:
+                flux = Fonctions_Acquisition_Donnees.exporter_tsv_en_flux(iter(lignes), chemin, taille_bloc=2)
+                self.assertEqual(list(flux), lignes)
+
+            # Les lignes sont écrites par blocs, dans l'ordre, sous les colonnes de l'export
+            self.assertEqual([len(appel.args[0]) for appel in exporter.call_args_list], [2, 2, 1])
+            export = pd.read_csv(chemin, sep='\t')
+        self.assertEqual(list(export.columns), Fonctions_Acquisition_Donnees.COLONNES_TSV)
+        self.assertEqual(export['titre'].tolist(), [ligne['titre'] for ligne in lignes])
+        self.assertEqual(export['subreddit'].isna().tolist(), [True] * 4 + [False])
+
+
+
+
+class TestCacheHTTP(unittest.TestCase):
+    """
+    Classe de test pour le cache disque des réponses des API
+
+    """
+
+    def setUp(self):
+        self.repertoire = tempfile.TemporaryDirectory()
+        self.cache = CacheHTTP(self.repertoire.name, duree_de_vie=60, taille_max=10)
+
+    def tearDown(self):
+        self.repertoire.cleanup()
+
+    def test_lire_et_ecrire(self):
+        self.cache.ecrire('arxiv', 'Machine  Learning', '0:10', b'abc')
+
+        # La requête est normalisée : casse et espaces sont ignorés
+        self.assertEqual(self.cache.lire('arxiv', 'machine learning', '0:10'), b'abc')
+        self.assertIsNone(self.cache.lire('arxiv', 'machine learning', '10:10'))
+        self.assertIsNone(self.cache.lire('reddit', 'machine learning', '0:10'))
+
+    def test_expiration(self):
+        self.cache.ecrire('arxiv', 'python', '0:10', b'abc')
+        with patch('Classe_Cache.time.time', return_value=time.time() + 120):
+            self.assertIsNone(self.cache.lire('arxiv', 'python', '0:10'))
+
+    def test_eviction_lru(self):
+        self.cache.ecrire('arxiv', 'a', 0, b'1234')
+        self.cache.ecrire('arxiv', 'b', 0, b'1234')
+        time.sleep(0.01)
+        self.cache.lire('arxiv', 'a', 0)  # 'a' devient la plus récemment utilisée
+        self.cache.ecrire('arxiv', 'c', 0, b'1234')  # 12 octets > 10 : 'b' est supprimée
+
+        self.assertIsNotNone(self.cache.lire('arxiv', 'a', 0))
+        self.assertIsNone(self.cache.lire('arxiv', 'b', 0))
+        self.assertIsNotNone(self.cache.lire('arxiv', 'c', 0))
+
+    def test_lecture_sans_reecriture_index(self):
+        self.cache.ecrire('arxiv', 'a', 0, b'1234')
+
+        # Une lecture met à jour la date d'utilisation de la réponse sans réécrire l'index
+        with patch.object(CacheHTTP, '_ecrire_index') as ecrire_index:
+            for _ in range(3):
+                self.assertEqual(self.cache.lire('arxiv', 'a', 0), b'1234')
+        ecrire_index.assert_not_called()
+
+    def test_mode_hors_ligne(self):
+        self.cache.ecrire('arxiv', 'python', '0:10', b'abc')
+        cache_hors_ligne = CacheHTTP(self.repertoire.name, duree_de_vie=60, hors_ligne=True)
+        telecharger = MagicMock(return_value=b'reseau')
+
+        # Une réponse expirée est rejouée sans accès au réseau
+        with patch('Classe_Cache.time.time', return_value=time.time() + 120):
+            self.assertEqual(cache_hors_ligne.obtenir('arxiv', 'python', '0:10', telecharger), b'abc')
+
+        # Une réponse absente lève une erreur
+        with self.assertRaises(LookupError):
+            cache_hors_ligne.obtenir('arxiv', 'java', '0:10', telecharger)
+        telecharger.assert_not_called()
+
+    @patch('Fonctions_Acquisition_Donnees.obtenir_session_http')
+    def test_moissonner_articles_arxiv_depuis_le_cache(self, mock_session):
+        page = b'<feed xmlns="http://www.w3.org/2005/Atom"></feed>'
+        mock_session.return_value.get.return_value.content = page
+
+        # La deuxième moisson est servie par le cache, sans requête réseau
+        cache = CacheHTTP(self.repertoire.name)
+        for _ in range(2):
+            list(Fonctions_Acquisition_Donnees.moissonner_articles_arxiv("test", 5, cache=cache))
+        self.assertEqual(mock_session.return_value.get.call_count, 1)
+
+
+class TestCacheTextes(unittest.TestCase):
+    """
+    Classe de test pour le cache mémoire des textes des corpus chargés paresseusement
+    """
+
+    def test_obtenir_et_budget(self):
+        texte = "x" * 1000
+        cache = CacheTextes(budget=2.5 * sys.getsizeof(texte))
+        lire = MagicMock(return_value=texte)
+
+        # Un texte lu une fois est ensuite servi par le cache
+        cache.obtenir('a', lire)
+        cache.obtenir('a', lire)
+        self.assertEqual(lire.call_count, 1)
+
+        # Au-delà du budget, le texte le moins récemment lu est oublié
+        cache.obtenir('b', lire)
+        cache.obtenir('a', lire)
+        cache.obtenir('c', lire)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.taille, cache.budget)
+        cache.obtenir('a', lire)
+        self.assertEqual(lire.call_count, 3)
+        cache.obtenir('b', lire)
+        self.assertEqual(lire.call_count, 4)
+
+
+class TestCacheResultats(unittest.TestCase):
+    """
+    Classe de test pour le cache mémoire des résultats de recherche
+    """
 
+    def test_obtenir_et_taille_max(self):
+        cache = CacheResultats(taille_max=2)
+        calculer = MagicMock(side_effect=lambda: calculer.call_count)
+
+        # Un résultat calculé une fois est ensuite servi par le cache, et les compteurs en tiennent compte
+        self.assertEqual(cache.obtenir('a', calculer), 1)
+        self.assertEqual(cache.obtenir('a', calculer), 1)
+        self.assertEqual((cache.succes, cache.echecs), (1, 1))
+
+        # Au-delà de la taille maximale, le résultat le moins récemment demandé est oublié
+        cache.obtenir('b', calculer)
+        cache.obtenir('a', calculer)
+        cache.obtenir('c', calculer)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.obtenir('a', calculer), 1)
+        self.assertEqual(cache.obtenir('b', calculer), 4)
+
+        # Les résultats ne sont pas copiés avec le cache
+        copie = copy.deepcopy(cache)
+        self.assertEqual((len(copie), copie.taille_max), (0, 2))
 
 
 if __name__ == '__main__':